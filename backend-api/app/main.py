@@ -67,7 +67,12 @@ def update_predictions_state(data):
     
     predictions_state["wear_state"] = data.get("wear_state", {})
     predictions_state["alert_summary"] = data.get("alert_summary", {})
-    predictions_state["active_alerts"] = data.get("active_alerts", [])
+    # Con incidentes activados el cerebro publica los abiertos en lugar de las
+    # alertas sueltas (mismo formato que los que llegan por handle_new_alert)
+    if "incidents" in data:
+        predictions_state["active_alerts"] = data["incidents"]
+    else:
+        predictions_state["active_alerts"] = data.get("active_alerts", [])
     predictions_state["last_update"] = datetime.now().isoformat()
     # Notificar a clientes WebSocket
     broadcast_to_websockets({"type": "predictions", "data": predictions_state})
@@ -84,11 +89,17 @@ def update_forecasts_state(data):
     broadcast_to_websockets({"type": "forecast", "data": forecasts_state})
 
 def handle_new_alert(alert_data):
-    # Añadir alerta a la lista si no existe
+    if alert_data.get("type") == "alert_summary":
+        # Resumen de alertas suprimidas por el límite: solo se notifica
+        broadcast_to_websockets({"type": "alert_summary", "data": alert_data})
+        return
+    # Añadir alerta a la lista si no existe; un incidente se publica varias
+    # veces con el mismo id: se sustituye y se quita al resolverse
     alert_id = alert_data.get("id")
-    existing_ids = [a.get("id") for a in predictions_state["active_alerts"]]
-    if alert_id and alert_id not in existing_ids:
-        predictions_state["active_alerts"].append(alert_data)
+    alerts = [a for a in predictions_state["active_alerts"] if a.get("id") != alert_id]
+    if alert_data.get("status") != "resolved":
+        alerts.append(alert_data)
+    predictions_state["active_alerts"] = alerts
     # Notificar inmediatamente a clientes WebSocket
     broadcast_to_websockets({"type": "alert", "data": alert_data})
 
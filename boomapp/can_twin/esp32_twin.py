@@ -29,9 +29,9 @@ class ESP32DigitalTwin:
                         int(sensor_data["pressure"]) & 0xFF]
             self.can_bus.send_message(0x100, temp_data)
             
-            # Publicar datos de sensores por MQTT
+            # Publicar datos de sensores por MQTT (con timestamp de origen)
             if self.mqtt_bridge:
-                self.mqtt_bridge.publish_sensor_data(sensor_data)
+                self.mqtt_bridge.publish_sensor_data({**sensor_data, "timestamp": time.time()})
             
             # Procesar mensajes CAN recibidos
             msg = self.can_bus.receive_message()
@@ -57,7 +57,8 @@ class ESP32DigitalTwin:
                     "speed": self.obd.speed,
                     "coolant_temp": self.obd.coolant_temp,
                     "throttle": self.obd.throttle,
-                    "fuel_level": self.obd.fuel_level
+                    "fuel_level": self.obd.fuel_level,
+                    "timestamp": time.time()
                 }
                 self.mqtt_bridge.publish_obd_data(obd_data)
             
@@ -3,18 +3,75 @@
 
 from .predictor import PredictiveEngine
 from .wear_models import WearAnalyzer
+from .stream_join import StreamJoiner, FusedRecord
+from .fleet_wear import FleetWearKernel
+from .what_if import DrivingProfile, WhatIfResult, project_wear
 from .alert_manager import AlertManager
+from .alert_rules import AlertRule, RuleSet
+from .threshold_profiles import ThresholdProfile, ThresholdProfiles
+from .hysteresis import SignalBank, SignalSpec
+from .incidents import Incident, IncidentCorrelator
+from .alert_store import AlertStore
+from .timing_wheel import TimingWheel
+from .rollups import RollupSeries, RollupTier
+from .rul import MonteCarloRUL, RULEstimate
+from .anomaly import StreamingAnomalyDetector
+from .vibration import VibrationAnalyzer
 from .future_predictor import FuturePredictor, FuturePrediction, ComponentForecast
 from .cost_estimator import CostEstimator, CostSummary, RepairCost
+from .backfill import WearBackfill, BackfillResult, load_telemetry_columns
+from .checkpoint import VehicleSnapshot, save_checkpoint, load_checkpoint
+from .vehicle_registry import VehicleRegistry, VehicleState
+from .ingest import IngestPool
+from .cluster import ClusterMembership, HashRing
+from .instrumentation import StageProfiler
+from .publish_scheduler import PublishScheduler
+from .overload import OverloadController
 
 __all__ = [
     'PredictiveEngine', 
     'WearAnalyzer', 
+    'StreamJoiner',
+    'FusedRecord',
+    'FleetWearKernel',
+    'DrivingProfile',
+    'WhatIfResult',
+    'project_wear',
     'AlertManager', 
+    'AlertRule',
+    'RuleSet',
+    'ThresholdProfile',
+    'ThresholdProfiles',
+    'SignalBank',
+    'SignalSpec',
+    'Incident',
+    'IncidentCorrelator',
+    'AlertStore',
+    'TimingWheel',
+    'RollupSeries',
+    'RollupTier',
+    'MonteCarloRUL',
+    'RULEstimate',
+    'StreamingAnomalyDetector',
+    'VibrationAnalyzer',
     'FuturePredictor', 
     'FuturePrediction', 
     'ComponentForecast',
     'CostEstimator',
     'CostSummary',
-    'RepairCost'
+    'RepairCost',
+    'WearBackfill',
+    'BackfillResult',
+    'load_telemetry_columns',
+    'VehicleSnapshot',
+    'save_checkpoint',
+    'load_checkpoint',
+    'VehicleRegistry',
+    'VehicleState',
+    'IngestPool',
+    'ClusterMembership',
+    'HashRing',
+    'StageProfiler',
+    'PublishScheduler',
+    'OverloadController'
 ]
@@ -7,7 +7,13 @@ import time
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Callable
 from enum import Enum
-from .config import THRESHOLDS, ALERT_LEVELS
+from .config import ALERTS, HYSTERESIS
+from .event_clock import resolve_event_time
+from .alert_rules import RuleSet, AlertRule, DEFAULT_RULES
+from .hysteresis import SignalBank, build_signal_specs
+from .alert_store import AlertStore
+from .rate_limit import AlertRateLimiter
+from .timing_wheel import TimingWheel
 
 
 class AlertLevel(Enum):
@@ -27,10 +33,12 @@ class Alert:
     timestamp: float = field(default_factory=time.time)
     data: Dict = field(default_factory=dict)
     acknowledged: bool = False
+    vehicle_id: Optional[str] = None
     
     def to_dict(self) -> dict:
         return {
             "id": self.id,
+            "vehicle_id": self.vehicle_id,
             "level": self.level.value,
             "component": self.component,
             "message": self.message,
@@ -38,196 +46,295 @@ class Alert:
             "data": self.data,
             "acknowledged": self.acknowledged
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Alert":
+        return cls(
+            id=data["id"],
+            level=AlertLevel(data["level"]),
+            component=data["component"],
+            message=data["message"],
+            timestamp=data["timestamp"],
+            data=data.get("data", {}),
+            acknowledged=data.get("acknowledged", False),
+            vehicle_id=data.get("vehicle_id")
+        )
 
 
 class AlertManager:
     """
     Gestor de alertas de mantenimiento predictivo.
     Evalúa condiciones y genera alertas cuando se superan umbrales.
+    Las condiciones vienen de una tabla de reglas compilada (alert_rules).
+    Cooldowns, caducidad y recordatorios son temporizadores de una rueda
+    jerárquica guiada por el tiempo de evento; si el vehículo deja de enviar
+    datos, advance_idle() avanza ese reloj con el tiempo real transcurrido.
+    Las reglas OBD y de sensores se disparan al empezar (o escalar) el
+    episodio de su señal con histéresis, no en cada lectura que cruza el
+    umbral. El banco de señales puede ser compartido (lo actualiza su dueño)
+    o propio (se actualiza en cada evaluate_*).
+    Tras el cooldown, cada alerta gasta un token de los cubos de su componente
+    y del vehículo (rate_limit); las que no caben se resumen periódicamente
+    en on_alert_summary.
     """
     
-    def __init__(self):
-        self.active_alerts: Dict[str, Alert] = {}
-        self.alert_history: List[Alert] = []
+    def __init__(self, vehicle_id: Optional[str] = None, rules: Optional[RuleSet] = None,
+                 signals: Optional[SignalBank] = None):
+        self.vehicle_id = vehicle_id
+        self._owns_signals = signals is None
+        self.set_rules(rules or DEFAULT_RULES, signals)
+        self.store = AlertStore()  # alertas activas indexadas e historial acotado
+        self.limiter = AlertRateLimiter()
         self.alert_counter = 0
-        self.cooldown_times: Dict[str, float] = {}  # Evitar spam de alertas
-        self.cooldown_duration = 30  # segundos entre alertas del mismo tipo
+        self.cooldown_duration = ALERTS["cooldown_seconds"]  # segundos entre alertas del mismo tipo
+        self.alert_ttl = ALERTS["ttl_seconds"]
+        self.reminder_interval = ALERTS["reminder_seconds"]
+        self.reminder_levels = set(ALERTS["reminder_levels"])
+        self.event_time: Optional[float] = None  # mayor tiempo de evento evaluado
+        self.event_wall: Optional[float] = None  # hora local del último avance de event_time
+        self.idle_advance = ALERTS["idle_advance_seconds"]
+        
+        # Temporizadores: ("cooldown", clave), ("expire", id), ("remind", clave)
+        # y ("summary", None) para el resumen de alertas suprimidas.
+        # El recordatorio es por componente y nivel: una alerta nueva sustituye
+        # al de la anterior en lugar de acumular recordatorios.
+        self.timers = TimingWheel(tick=ALERTS["timer_tick_seconds"], start=time.time())
         
         # Callbacks para notificaciones
         self.on_new_alert: Optional[Callable[[Alert], None]] = None
         self.on_alert_cleared: Optional[Callable[[str], None]] = None
-    
+        self.on_alert_reminder: Optional[Callable[[Alert], None]] = None
+        self.on_alert_summary: Optional[Callable[[Dict], None]] = None
+
+    def set_rules(self, rules: RuleSet, signals: Optional[SignalBank] = None) -> None:
+        """
+        Cambia la tabla de reglas (p. ej. al cambiar el perfil de umbrales del
+        vehículo). Un banco de señales propio se reconstruye con las nuevas
+        reglas conservando el estado de las señales que siguen existiendo.
+        """
+        self.rules = rules
+        if signals is None and self._owns_signals and HYSTERESIS["enabled"]:
+            previous = getattr(self, "signals", None)
+            signals = SignalBank(build_signal_specs(rules.rules))
+            if previous is not None:
+                signals.restore_checkpoint_state(previous.get_checkpoint_state())
+        self.signals = signals
+        # Grupos de reglas excluyentes con señal, en orden de severidad
+        self._signal_groups: Dict[str, List[List[AlertRule]]] = {}
+        if signals is not None:
+            for source in ("obd", "sensors"):
+                groups: Dict[str, List[AlertRule]] = {}
+                for _, rule in rules.by_source[source]:
+                    groups.setdefault(rule.group, []).append(rule)
+                self._signal_groups[source] = list(groups.values())
+
     def _generate_alert_id(self) -> str:
         self.alert_counter += 1
         return f"ALT-{int(time.time())}-{self.alert_counter:04d}"
     
+    def _observe_event_time(self, payload: Dict, timestamp: Optional[float]) -> float:
+        """Avanza el reloj de alertas con el tiempo de evento del mensaje"""
+        event_time = resolve_event_time(payload, timestamp)
+        if self.event_time is None or event_time > self.event_time:
+            if self.event_time is None:
+                self._reset_timers(event_time)
+            self.event_time = event_time
+            self.event_wall = time.time()
+            self._run_timers()
+        return event_time
+    
+    def advance_idle(self, wall: float = None) -> bool:
+        """
+        Avanza el tiempo de evento con el tiempo real transcurrido si el
+        vehículo lleva idle_advance segundos sin mensajes, para que caducidades
+        y recordatorios venzan aunque no lleguen datos. Retorna si avanzó.
+        """
+        wall = time.time() if wall is None else wall
+        if self.event_time is None or self.event_wall is None:
+            # Sin eventos todavía, o recién restaurado: se empieza a contar ahora
+            self.event_wall = wall
+            return False
+        elapsed = wall - self.event_wall
+        if elapsed < self.idle_advance:
+            return False
+        self.event_time += elapsed
+        self.event_wall = wall
+        self._run_timers()
+        return True
+    
+    def next_deadline(self) -> Optional[float]:
+        """
+        Tiempo de evento del próximo temporizador que notifica algo
+        (caducidad, recordatorio o resumen de alertas suprimidas)
+        """
+        deadlines = [timer.deadline for timer in self.timers.timers()
+                     if timer.key[0] in ("expire", "remind", "summary")]
+        return min(deadlines) if deadlines else None
+    
+    def idle_delay(self, deadline: float, wall: float = None) -> float:
+        """Segundos de tiempo real hasta que advance_idle() alcance `deadline`"""
+        wall = time.time() if wall is None else wall
+        since = wall - self.event_wall if self.event_wall is not None else 0.0
+        pending = deadline - self._now() + self.timers.tick
+        return max(pending - since, self.idle_advance - since, self.timers.tick)
+    
+    def _reset_timers(self, start: float) -> None:
+        """Reinicia la rueda en otro instante conservando los temporizadores"""
+        pending = self.timers.timers()
+        self.timers = TimingWheel(tick=self.timers.tick, start=start)
+        for timer in pending:
+            self.timers.schedule(timer.key, timer.deadline, timer.kind, timer.payload)
+    
+    def _run_timers(self) -> None:
+        """Procesa los temporizadores vencidos hasta el tiempo de evento actual"""
+        for timer in self.timers.advance(self._now()):
+            kind, key = timer.key
+            if kind == "expire":
+                self.clear_alert(key)
+            elif kind == "remind":
+                alert = self.store.get(timer.payload)
+                if alert is not None and not alert.acknowledged:
+                    if self.on_alert_reminder:
+                        self.on_alert_reminder(alert)
+                    self.timers.schedule(timer.key, self._now() + self.reminder_interval,
+                                         payload=alert.id)
+            elif kind == "summary":
+                self._emit_summary()
+    
+    def _schedule_alert_timers(self, alert: Alert) -> None:
+        if self.alert_ttl:
+            self.timers.schedule(("expire", alert.id), alert.timestamp + self.alert_ttl)
+        if self.reminder_interval and alert.level.value in self.reminder_levels and not alert.acknowledged:
+            self.timers.schedule(("remind", self._alert_key(alert)), alert.timestamp + self.reminder_interval,
+                                 payload=alert.id)
+    
+    def _cancel_alert_timers(self, alert: Alert, keep_expiry: bool = False) -> None:
+        if not keep_expiry:
+            self.timers.cancel(("expire", alert.id))
+        reminder = self.timers.get(("remind", self._alert_key(alert)))
+        if reminder is not None and reminder.payload == alert.id:
+            self.timers.cancel(reminder.key)
+    
+    @staticmethod
+    def _alert_key(alert: Alert) -> str:
+        return f"{alert.component}:{alert.level.value}"
+    
+    def _now(self) -> float:
+        """Tiempo de evento actual (hora local si aún no hay eventos)"""
+        return self.event_time if self.event_time is not None else time.time()
+    
     def _can_send_alert(self, alert_key: str) -> bool:
         """Verifica si se puede enviar alerta (cooldown)"""
-        if alert_key not in self.cooldown_times:
+        timer = self.timers.get(("cooldown", alert_key))
+        if timer is None:
             return True
-        return time.time() - self.cooldown_times[alert_key] > self.cooldown_duration
+        return self._now() - timer.payload > self.cooldown_duration
+    
+    def _start_cooldown(self, alert_key: str, sent_at: float) -> None:
+        # El temporizador solo libera memoria: la comprobación usa la hora exacta
+        # del envío, así que se programa un tick más tarde para no adelantarse
+        deadline = sent_at + self.cooldown_duration + self.timers.tick
+        self.timers.schedule(("cooldown", alert_key), deadline, payload=sent_at)
     
-    def _create_alert(self, level: AlertLevel, component: str, message: str, data: Dict = None) -> Optional[Alert]:
-        """Crea una nueva alerta si no está en cooldown"""
+    def _admit(self, component: str, level: AlertLevel, rule: str = None) -> bool:
+        """
+        Cooldown y cubos de tokens. Una alerta que no cabe en los cubos cuenta
+        como enviada para el cooldown y se anota en el resumen de suprimidas.
+        """
         alert_key = f"{component}:{level.value}"
-        
         if not self._can_send_alert(alert_key):
-            return None
-        
+            return False
+        now = self._now()
+        if self.limiter.allow(component, level.value, now, rule):
+            return True
+        self._start_cooldown(alert_key, now)
+        if self.timers.get(("summary", None)) is None:
+            self.timers.schedule(("summary", None), now + self.limiter.summary_interval)
+        return False
+    
+    def _emit_summary(self) -> None:
+        summary = self.limiter.take_summary(self._now())
+        if summary is not None and self.on_alert_summary:
+            self.on_alert_summary({"type": "alert_summary", "vehicle_id": self.vehicle_id, **summary})
+    
+    def _emit_alert(self, level: AlertLevel, component: str, message: str, data: Dict = None) -> Alert:
+        """Registra y notifica una alerta (cooldown y límite ya comprobados)"""
         alert = Alert(
             id=self._generate_alert_id(),
             level=level,
             component=component,
             message=message,
-            data=data or {}
+            timestamp=self._now(),
+            data=data or {},
+            vehicle_id=self.vehicle_id
         )
         
-        self.active_alerts[alert.id] = alert
-        self.alert_history.append(alert)
-        self.cooldown_times[alert_key] = time.time()
+        evicted = self.store.add(alert)
+        self._schedule_alert_timers(alert)
+        if evicted:
+            self._cancel_alert_timers(evicted)
+            if self.on_alert_cleared:
+                self.on_alert_cleared(evicted.id)
+        self._start_cooldown(f"{component}:{level.value}", alert.timestamp)
         
         if self.on_new_alert:
             self.on_new_alert(alert)
         
         return alert
     
-    def evaluate_obd_data(self, obd_data: Dict) -> List[Alert]:
-        """Evalúa datos OBD y genera alertas si es necesario"""
-        alerts = []
-        
-        rpm = obd_data.get("rpm", 0)
-        coolant_temp = obd_data.get("coolant_temp", 90)
-        throttle = obd_data.get("throttle", 0)
-        fuel_level = obd_data.get("fuel_level", 100)
-        speed = obd_data.get("speed", 0)
-        
-        engine_thresholds = THRESHOLDS["engine"]
-        
-        # Alertas de motor - RPM
-        if rpm > engine_thresholds["rpm_critical"]:
-            alert = self._create_alert(
-                AlertLevel.EMERGENCY,
-                "engine",
-                f"RPM crítico: {rpm:.0f} RPM. Riesgo de daño al motor.",
-                {"rpm": rpm, "threshold": engine_thresholds["rpm_critical"]}
-            )
-            if alert:
-                alerts.append(alert)
-        elif rpm > engine_thresholds["rpm_max"]:
-            alert = self._create_alert(
-                AlertLevel.WARNING,
-                "engine",
-                f"RPM elevado: {rpm:.0f} RPM. Reducir revoluciones.",
-                {"rpm": rpm, "threshold": engine_thresholds["rpm_max"]}
-            )
-            if alert:
-                alerts.append(alert)
-        
-        # Alertas de temperatura
-        if coolant_temp > engine_thresholds["coolant_temp_critical"]:
-            alert = self._create_alert(
-                AlertLevel.EMERGENCY,
-                "engine",
-                f"¡SOBRECALENTAMIENTO! Temperatura: {coolant_temp:.1f}°C. Detener vehículo.",
-                {"coolant_temp": coolant_temp, "threshold": engine_thresholds["coolant_temp_critical"]}
-            )
-            if alert:
-                alerts.append(alert)
-        elif coolant_temp > engine_thresholds["coolant_temp_warning"]:
-            alert = self._create_alert(
-                AlertLevel.WARNING,
-                "engine",
-                f"Temperatura elevada: {coolant_temp:.1f}°C. Monitorear.",
-                {"coolant_temp": coolant_temp, "threshold": engine_thresholds["coolant_temp_warning"]}
-            )
-            if alert:
-                alerts.append(alert)
-        
-        # Alerta de combustible bajo
-        if fuel_level < 15:
-            alert = self._create_alert(
-                AlertLevel.WARNING,
-                "fuel",
-                f"Combustible bajo: {fuel_level:.0f}%. Repostar pronto.",
-                {"fuel_level": fuel_level}
-            )
-            if alert:
-                alerts.append(alert)
-        elif fuel_level < 5:
-            alert = self._create_alert(
-                AlertLevel.CRITICAL,
-                "fuel",
-                f"¡Combustible crítico! {fuel_level:.0f}%. Riesgo de quedarse sin combustible.",
-                {"fuel_level": fuel_level}
-            )
-            if alert:
-                alerts.append(alert)
+    def _fire_rules(self, source: str, reading: Dict, component: str = None) -> List[Alert]:
+        """
+        Evalúa las reglas de una fuente y crea las alertas disparadas.
+        El mensaje solo se formatea si la alerta supera el cooldown y el límite.
+        """
+        if source in self._signal_groups:
+            fired = self._episode_rules(source)
+        else:
+            fired = self.rules.evaluate(source, reading)
+        if not fired:
+            return fired
         
+        alerts = []
+        for rule in fired:
+            comp = component if rule.component == "*" else rule.component
+            level = AlertLevel(rule.level)
+            if not self._admit(comp, level, rule.name):
+                continue
+            ctx = rule.context(reading, reading.get(rule.metric, rule.default), comp)
+            alerts.append(self._emit_alert(level, comp, rule.message(ctx), rule.payload(ctx)))
         return alerts
     
-    def evaluate_sensor_data(self, sensor_data: Dict) -> List[Alert]:
+    def _episode_rules(self, source: str) -> List[AlertRule]:
+        """
+        Reglas cuya señal acaba de empezar episodio. En cada grupo solo cuenta
+        la señal activa más grave: si ya estaba en episodio no se repite la
+        alerta, y una menos grave no alerta mientras la más grave siga activa.
+        """
+        rising = self.signals.rising
+        if not rising:
+            return rising
+        fired = []
+        for group in self._signal_groups[source]:
+            for rule in group:
+                if self.signals.is_active(rule.name):
+                    if rule.name in rising:
+                        fired.append(rule)
+                    break
+        return fired
+    
+    def evaluate_obd_data(self, obd_data: Dict, timestamp: float = None) -> List[Alert]:
+        """Evalúa datos OBD y genera alertas si es necesario"""
+        event_time = self._observe_event_time(obd_data, timestamp)
+        if self._owns_signals and self.signals is not None:
+            self.signals.update("obd", obd_data, event_time)
+        return self._fire_rules("obd", obd_data)
+    
+    def evaluate_sensor_data(self, sensor_data: Dict, timestamp: float = None) -> List[Alert]:
         """Evalúa datos de sensores y genera alertas"""
-        alerts = []
-        
-        vibration = sensor_data.get("vibration", 0)
-        pressure = sensor_data.get("pressure", 101)
-        temperature = sensor_data.get("temperature", 25)
-        
-        # Alertas de vibración (frenos/neumáticos)
-        brake_thresholds = THRESHOLDS["brakes"]
-        if vibration > brake_thresholds["vibration_critical"]:
-            alert = self._create_alert(
-                AlertLevel.CRITICAL,
-                "brakes",
-                f"Vibración crítica: {vibration:.1f}. Revisar frenos y neumáticos.",
-                {"vibration": vibration, "threshold": brake_thresholds["vibration_critical"]}
-            )
-            if alert:
-                alerts.append(alert)
-        elif vibration > brake_thresholds["vibration_warning"]:
-            alert = self._create_alert(
-                AlertLevel.WARNING,
-                "brakes",
-                f"Vibración elevada: {vibration:.1f}. Posible desgaste.",
-                {"vibration": vibration, "threshold": brake_thresholds["vibration_warning"]}
-            )
-            if alert:
-                alerts.append(alert)
-        
-        # Alertas de presión (neumáticos)
-        tire_thresholds = THRESHOLDS["tires"]
-        if pressure < tire_thresholds["pressure_min"]:
-            alert = self._create_alert(
-                AlertLevel.WARNING,
-                "tires",
-                f"Presión baja: {pressure:.1f} kPa. Revisar neumáticos.",
-                {"pressure": pressure, "threshold": tire_thresholds["pressure_min"]}
-            )
-            if alert:
-                alerts.append(alert)
-        elif pressure > tire_thresholds["pressure_max"]:
-            alert = self._create_alert(
-                AlertLevel.WARNING,
-                "tires",
-                f"Presión alta: {pressure:.1f} kPa. Ajustar presión.",
-                {"pressure": pressure, "threshold": tire_thresholds["pressure_max"]}
-            )
-            if alert:
-                alerts.append(alert)
-        
-        # Alertas de temperatura ambiente (batería)
-        battery_thresholds = THRESHOLDS["battery"]
-        if temperature > battery_thresholds["temp_max"]:
-            alert = self._create_alert(
-                AlertLevel.INFO,
-                "battery",
-                f"Temperatura ambiente alta: {temperature:.1f}°C. Puede afectar batería.",
-                {"temperature": temperature}
-            )
-            if alert:
-                alerts.append(alert)
-        
-        return alerts
+        event_time = self._observe_event_time(sensor_data, timestamp)
+        if self._owns_signals and self.signals is not None:
+            self.signals.update("sensors", sensor_data, event_time)
+        return self._fire_rules("sensors", sensor_data)
     
     def evaluate_wear_state(self, wear_state: Dict) -> List[Alert]:
         """Evalúa estado de desgaste y genera alertas de mantenimiento"""
@@ -235,105 +342,77 @@ class AlertManager:
         components = wear_state.get("components", {})
         
         for comp_name, comp_data in components.items():
-            health = comp_data.get("health_score", 100)
-            hours_until = comp_data.get("hours_until_maintenance", 999)
-            status = comp_data.get("status", "good")
-            
-            # Alerta por salud baja
-            if status == "failure":
-                alert = self._create_alert(
-                    AlertLevel.EMERGENCY,
-                    comp_name,
-                    f"¡FALLO EN {comp_name.upper()}! Salud: {health:.0f}%. Servicio inmediato requerido.",
-                    {"health_score": health, "component": comp_name}
-                )
-                if alert:
-                    alerts.append(alert)
-            elif status == "critical":
-                alert = self._create_alert(
-                    AlertLevel.CRITICAL,
-                    comp_name,
-                    f"{comp_name.capitalize()} en estado crítico. Salud: {health:.0f}%. Programar servicio.",
-                    {"health_score": health, "component": comp_name}
-                )
-                if alert:
-                    alerts.append(alert)
-            elif status == "warning":
-                alert = self._create_alert(
-                    AlertLevel.WARNING,
-                    comp_name,
-                    f"{comp_name.capitalize()} requiere atención. Salud: {health:.0f}%.",
-                    {"health_score": health, "component": comp_name}
-                )
-                if alert:
-                    alerts.append(alert)
-            
-            # Alerta por mantenimiento próximo
-            if hours_until <= 0:
-                alert = self._create_alert(
-                    AlertLevel.CRITICAL,
-                    comp_name,
-                    f"Mantenimiento de {comp_name} VENCIDO. Programar servicio inmediatamente.",
-                    {"hours_overdue": abs(hours_until), "component": comp_name}
-                )
-                if alert:
-                    alerts.append(alert)
-            elif hours_until < 10:
-                alert = self._create_alert(
-                    AlertLevel.WARNING,
-                    comp_name,
-                    f"Mantenimiento de {comp_name} próximo: {hours_until:.1f} horas restantes.",
-                    {"hours_until_maintenance": hours_until, "component": comp_name}
-                )
-                if alert:
-                    alerts.append(alert)
+            reading = {"health_score": 100, **comp_data}
+            alerts.extend(self._fire_rules("wear", reading, comp_name))
         
         return alerts
     
+    def get_checkpoint_state(self) -> Dict:
+        """Estado interno (alertas activas y cooldowns) para checkpoints"""
+        return {
+            "active_alerts": self.get_active_alerts(),
+            "alert_counter": self.alert_counter,
+            "cooldown_times": {
+                timer.key[1]: timer.payload
+                for timer in self.timers.timers() if timer.key[0] == "cooldown"
+            },
+            "event_time": self.event_time,
+            "rate_limit": self.limiter.get_checkpoint_state(),
+            **({"signals": self.signals.get_checkpoint_state()}
+               if self._owns_signals and self.signals is not None else {}),
+        }
+    
+    def restore_checkpoint_state(self, data: Dict) -> None:
+        """Restaura el estado guardado con get_checkpoint_state"""
+        self.event_time = data["event_time"]
+        self.event_wall = None
+        self.timers = TimingWheel(tick=self.timers.tick, start=self._now())
+        self.store.replace_active([Alert.from_dict(alert) for alert in data["active_alerts"]])
+        self.alert_counter = data["alert_counter"]
+        if self._owns_signals and self.signals is not None:
+            self.signals.restore_checkpoint_state(data.get("signals"))
+        for alert_key, sent_at in data["cooldown_times"].items():
+            self._start_cooldown(alert_key, sent_at)
+        self.limiter.restore_checkpoint_state(data.get("rate_limit"))
+        if self.limiter.pending:
+            self.timers.schedule(("summary", None), self.limiter.suppressed_since + self.limiter.summary_interval)
+        for alert in list(self.store.active()):
+            self._schedule_alert_timers(alert)
+        self._run_timers()
+    
     def acknowledge_alert(self, alert_id: str) -> bool:
         """Marca una alerta como reconocida"""
-        if alert_id in self.active_alerts:
-            self.active_alerts[alert_id].acknowledged = True
-            return True
-        return False
+        if not self.store.acknowledge(alert_id):
+            return False
+        self._cancel_alert_timers(self.store.get(alert_id), keep_expiry=True)
+        return True
     
     def clear_alert(self, alert_id: str) -> bool:
         """Elimina una alerta activa"""
-        if alert_id in self.active_alerts:
-            del self.active_alerts[alert_id]
-            if self.on_alert_cleared:
-                self.on_alert_cleared(alert_id)
-            return True
-        return False
+        alert = self.store.remove(alert_id)
+        if alert is None:
+            return False
+        self._cancel_alert_timers(alert)
+        if self.on_alert_cleared:
+            self.on_alert_cleared(alert_id)
+        return True
     
     def get_active_alerts(self) -> List[Dict]:
         """Retorna todas las alertas activas"""
-        return [alert.to_dict() for alert in self.active_alerts.values()]
+        return [alert.to_dict() for alert in self.store.active()]
     
     def get_alerts_by_level(self, level: AlertLevel) -> List[Dict]:
         """Retorna alertas filtradas por nivel"""
-        return [
-            alert.to_dict() 
-            for alert in self.active_alerts.values() 
-            if alert.level == level
-        ]
+        return [alert.to_dict() for alert in self.store.by_level(level.value)]
+    
+    def get_alerts_by_component(self, component: str) -> List[Dict]:
+        """Retorna alertas activas de un componente"""
+        return [alert.to_dict() for alert in self.store.by_component(component)]
+    
+    def get_alert_history(self) -> List[Dict]:
+        """Retorna las últimas alertas generadas (activas o no)"""
+        return [alert.to_dict() for alert in self.store.history]
     
     def get_alert_summary(self) -> Dict:
         """Retorna resumen de alertas activas"""
-        summary = {
-            "total": len(self.active_alerts),
-            "by_level": {
-                "emergency": 0,
-                "critical": 0,
-                "warning": 0,
-                "info": 0
-            },
-            "unacknowledged": 0
-        }
-        
-        for alert in self.active_alerts.values():
-            summary["by_level"][alert.level.value] += 1
-            if not alert.acknowledged:
-                summary["unacknowledged"] += 1
-        
-        return summary
+        return self.store.summary()
@@ -0,0 +1,225 @@
+"""
+Reglas de alerta declarativas.
+Cada regla es una fila (fuente, métrica, operador, umbral, nivel, componente,
+plantilla) derivada de THRESHOLDS. Las reglas de un mismo grupo son
+excluyentes y se evalúan por orden de severidad: solo se dispara la primera
+que se cumple (como una cadena if/elif).
+
+RuleSet compila las reglas de cada fuente en una función Python generada con
+las comparaciones y los umbrales en línea, y también las evalúa vectorizadas
+sobre columnas de varios vehículos.
+"""
+
+import operator
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .config import THRESHOLDS, ALERT_LEVELS
+
+SOURCES = ("obd", "sensors", "wear")
+
+OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+}
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """Regla de alerta: se dispara si `metric op threshold`"""
+    name: str
+    source: str                 # "obd", "sensors" o "wear" (por componente)
+    metric: str
+    op: str
+    threshold: Any
+    level: str                  # clave de ALERT_LEVELS
+    component: str              # "*" = el componente evaluado (reglas de desgaste)
+    template: str               # str.format con el contexto de la regla
+    group: str                  # reglas excluyentes entre sí
+    default: Any = 0            # valor si la métrica no viene en la lectura
+    data: Tuple[Tuple[str, str], ...] = (("value", "value"), ("threshold", "threshold"))
+
+    def context(self, reading: Mapping, value: Any, component: str) -> Dict:
+        """Valores disponibles para la plantilla y los datos de la alerta"""
+        ctx = dict(reading)
+        ctx.update(
+            value=value,
+            abs_value=abs(value) if isinstance(value, (int, float)) else value,
+            threshold=self.threshold,
+            component=component,
+            Component=component.capitalize(),
+            COMPONENT=component.upper(),
+        )
+        return ctx
+
+    def message(self, ctx: Dict) -> str:
+        return self.template.format(**ctx)
+
+    def payload(self, ctx: Dict) -> Dict:
+        return {key: ctx[source] for key, source in self.data}
+
+
+@dataclass
+class RuleHit:
+    """Regla disparada en una evaluación por lotes"""
+    rule: AlertRule
+    rows: np.ndarray            # índices de los vehículos (filas) que la disparan
+    values: np.ndarray          # valor de la métrica en esas filas
+
+
+def _metric_data(metric: str, threshold: bool = True) -> Tuple[Tuple[str, str], ...]:
+    fields = ((metric, "value"),)
+    return fields + (("threshold", "threshold"),) if threshold else fields
+
+
+def build_default_rules(thresholds: Dict = None) -> List[AlertRule]:
+    """Tabla de reglas por defecto a partir de THRESHOLDS (o de los umbrales de un perfil)"""
+    t = thresholds or THRESHOLDS
+    engine, brakes, tires = t["engine"], t["brakes"], t["tires"]
+    battery, fuel = t["battery"], t["fuel"]
+    E, C, W, I = "emergency", "critical", "warning", "info"
+    health_data = (("health_score", "health_score"), ("component", "component"))
+
+    return [
+        # OBD
+        AlertRule("rpm_critical", "obd", "rpm", ">", engine["rpm_critical"], E, "engine",
+                  "RPM crítico: {value:.0f} RPM. Riesgo de daño al motor.",
+                  "rpm", 0, _metric_data("rpm")),
+        AlertRule("rpm_high", "obd", "rpm", ">", engine["rpm_max"], W, "engine",
+                  "RPM elevado: {value:.0f} RPM. Reducir revoluciones.",
+                  "rpm", 0, _metric_data("rpm")),
+        AlertRule("overheating", "obd", "coolant_temp", ">", engine["coolant_temp_critical"], E, "engine",
+                  "¡SOBRECALENTAMIENTO! Temperatura: {value:.1f}°C. Detener vehículo.",
+                  "coolant_temp", 90, _metric_data("coolant_temp")),
+        AlertRule("coolant_high", "obd", "coolant_temp", ">", engine["coolant_temp_warning"], W, "engine",
+                  "Temperatura elevada: {value:.1f}°C. Monitorear.",
+                  "coolant_temp", 90, _metric_data("coolant_temp")),
+        AlertRule("fuel_critical", "obd", "fuel_level", "<", fuel["level_critical"], C, "fuel",
+                  "¡Combustible crítico! {value:.0f}%. Riesgo de quedarse sin combustible.",
+                  "fuel", 100, _metric_data("fuel_level", threshold=False)),
+        AlertRule("fuel_low", "obd", "fuel_level", "<", fuel["level_warning"], W, "fuel",
+                  "Combustible bajo: {value:.0f}%. Repostar pronto.",
+                  "fuel", 100, _metric_data("fuel_level", threshold=False)),
+
+        # Sensores
+        AlertRule("vibration_critical", "sensors", "vibration", ">", brakes["vibration_critical"], C, "brakes",
+                  "Vibración crítica: {value:.1f}. Revisar frenos y neumáticos.",
+                  "vibration", 0, _metric_data("vibration")),
+        AlertRule("vibration_high", "sensors", "vibration", ">", brakes["vibration_warning"], W, "brakes",
+                  "Vibración elevada: {value:.1f}. Posible desgaste.",
+                  "vibration", 0, _metric_data("vibration")),
+        AlertRule("pressure_low", "sensors", "pressure", "<", tires["pressure_min"], W, "tires",
+                  "Presión baja: {value:.1f} kPa. Revisar neumáticos.",
+                  "pressure", 101, _metric_data("pressure")),
+        AlertRule("pressure_high", "sensors", "pressure", ">", tires["pressure_max"], W, "tires",
+                  "Presión alta: {value:.1f} kPa. Ajustar presión.",
+                  "pressure", 101, _metric_data("pressure")),
+        AlertRule("ambient_hot", "sensors", "temperature", ">", battery["temp_max"], I, "battery",
+                  "Temperatura ambiente alta: {value:.1f}°C. Puede afectar batería.",
+                  "temperature", 25, _metric_data("temperature", threshold=False)),
+
+        # Desgaste (por componente)
+        AlertRule("component_failure", "wear", "status", "==", "failure", E, "*",
+                  "¡FALLO EN {COMPONENT}! Salud: {health_score:.0f}%. Servicio inmediato requerido.",
+                  "health", "good", health_data),
+        AlertRule("component_critical", "wear", "status", "==", "critical", C, "*",
+                  "{Component} en estado crítico. Salud: {health_score:.0f}%. Programar servicio.",
+                  "health", "good", health_data),
+        AlertRule("component_warning", "wear", "status", "==", "warning", W, "*",
+                  "{Component} requiere atención. Salud: {health_score:.0f}%.",
+                  "health", "good", health_data),
+        AlertRule("maintenance_overdue", "wear", "hours_until_maintenance", "<=", 0, C, "*",
+                  "Mantenimiento de {component} VENCIDO. Programar servicio inmediatamente.",
+                  "maintenance", 999, (("hours_overdue", "abs_value"), ("component", "component"))),
+        AlertRule("maintenance_due", "wear", "hours_until_maintenance", "<", 10, W, "*",
+                  "Mantenimiento de {component} próximo: {value:.1f} horas restantes.",
+                  "maintenance", 999, (("hours_until_maintenance", "value"), ("component", "component"))),
+    ]
+
+
+def _compile_source(rules: List[Tuple[int, AlertRule]]) -> Callable[[Mapping], List[int]]:
+    """
+    Genera una función que evalúa las reglas de una fuente sobre una lectura
+    y retorna los índices de las reglas disparadas.
+    """
+    groups: Dict[str, List[Tuple[int, AlertRule]]] = {}
+    for index, rule in rules:
+        groups.setdefault(rule.group, []).append((index, rule))
+
+    lines = ["def evaluate(reading):", "    fired = []"]
+    for group in groups.values():
+        metric, default = group[0][1].metric, group[0][1].default
+        lines.append(f"    value = reading.get({metric!r}, {default!r})")
+        for position, (index, rule) in enumerate(group):
+            keyword = "if" if position == 0 else "elif"
+            lines.append(f"    {keyword} value {rule.op} {rule.threshold!r}:")
+            lines.append(f"        fired.append({index})")
+    lines.append("    return fired")
+
+    namespace: Dict[str, Any] = {}
+    exec(compile("\n".join(lines), "<alert_rules>", "exec"), namespace)
+    return namespace["evaluate"]
+
+
+class RuleSet:
+    """Conjunto de reglas compilado por fuente"""
+
+    def __init__(self, rules: List[AlertRule] = None):
+        self.rules = list(rules) if rules is not None else build_default_rules()
+        for rule in self.rules:
+            if rule.op not in OPERATORS:
+                raise ValueError(f"Operador no soportado en la regla {rule.name}: {rule.op}")
+            if rule.level not in ALERT_LEVELS:
+                raise ValueError(f"Nivel desconocido en la regla {rule.name}: {rule.level}")
+            if rule.source not in SOURCES:
+                raise ValueError(f"Fuente desconocida en la regla {rule.name}: {rule.source}")
+            if rule.group and any(r.group == rule.group and r.metric != rule.metric
+                                  for r in self.rules):
+                raise ValueError(f"El grupo {rule.group} mezcla métricas distintas")
+
+        self.by_source: Dict[str, List[Tuple[int, AlertRule]]] = {
+            source: [(i, rule) for i, rule in enumerate(self.rules) if rule.source == source]
+            for source in SOURCES
+        }
+        self._evaluators = {source: _compile_source(rules) for source, rules in self.by_source.items()}
+
+    def evaluate(self, source: str, reading: Mapping) -> List[AlertRule]:
+        """Reglas disparadas por una lectura, en orden de la tabla"""
+        fired = self._evaluators[source](reading)
+        return [self.rules[i] for i in fired] if fired else fired
+
+    def evaluate_batch(self, source: str, columns: Mapping[str, Any], size: Optional[int] = None) -> List[RuleHit]:
+        """
+        Evalúa las reglas de una fuente sobre columnas de varios vehículos
+        (una fila por vehículo). Retorna solo las reglas que se disparan.
+        """
+        if size is None:
+            size = len(next(iter(columns.values()))) if columns else 0
+
+        hits: List[RuleHit] = []
+        groups: Dict[str, List[AlertRule]] = {}
+        for _, rule in self.by_source[source]:
+            groups.setdefault(rule.group, []).append(rule)
+
+        for group in groups.values():
+            metric, default = group[0].metric, group[0].default
+            if metric in columns:
+                values = np.asarray(columns[metric])
+            else:
+                values = np.full(size, default, dtype=object if isinstance(default, str) else float)
+            pending = np.ones(size, dtype=bool)
+            for rule in group:
+                fired = OPERATORS[rule.op](values, rule.threshold) & pending
+                if fired.any():
+                    pending &= ~fired
+                    rows = np.flatnonzero(fired)
+                    hits.append(RuleHit(rule, rows, values[rows]))
+        return hits
+
+
+DEFAULT_RULES = RuleSet()
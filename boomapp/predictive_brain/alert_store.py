@@ -0,0 +1,115 @@
+"""
+Almacén de alertas del AlertManager.
+- Historial acotado (buffer circular)
+- Alertas activas acotadas, con índices por componente, nivel y reconocimiento
+- Contadores del resumen mantenidos al insertar, reconocer y eliminar, de
+  modo que get_alert_summary() es O(1)
+"""
+
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Dict, Iterator, List, Optional
+
+from .config import ALERTS, ALERT_LEVELS
+
+if TYPE_CHECKING:
+    from .alert_manager import Alert
+
+
+class AlertStore:
+    """Alertas activas indexadas e historial acotado"""
+
+    def __init__(self, history_size: int = None, max_active: int = None):
+        self.history_size = history_size or ALERTS["history_size"]
+        self.max_active = max_active or ALERTS["max_active"]
+
+        self.history: Deque["Alert"] = deque(maxlen=self.history_size)
+        # Los dicts conservan el orden de inserción: el primero es el más antiguo
+        self._active: Dict[str, "Alert"] = {}
+        self._by_component: Dict[str, Dict[str, "Alert"]] = {}
+        self._by_level: Dict[str, Dict[str, "Alert"]] = {level: {} for level in ALERT_LEVELS}
+        self._unacknowledged: Dict[str, "Alert"] = {}
+        self.evicted = 0
+
+    # Escritura
+    def add(self, alert: "Alert") -> Optional["Alert"]:
+        """Registra una alerta activa; retorna la más antigua si hubo que desalojarla"""
+        self.history.append(alert)
+        self._index(alert)
+
+        if len(self._active) > self.max_active:
+            oldest = next(iter(self._active.values()))
+            self.remove(oldest.id)
+            self.evicted += 1
+            return oldest
+        return None
+
+    def _index(self, alert: "Alert") -> None:
+        self._active[alert.id] = alert
+        self._by_component.setdefault(alert.component, {})[alert.id] = alert
+        self._by_level[alert.level.value][alert.id] = alert
+        if not alert.acknowledged:
+            self._unacknowledged[alert.id] = alert
+
+    def acknowledge(self, alert_id: str) -> bool:
+        alert = self._active.get(alert_id)
+        if alert is None:
+            return False
+        alert.acknowledged = True
+        self._unacknowledged.pop(alert_id, None)
+        return True
+
+    def remove(self, alert_id: str) -> Optional["Alert"]:
+        alert = self._active.pop(alert_id, None)
+        if alert is None:
+            return None
+        component_alerts = self._by_component[alert.component]
+        del component_alerts[alert_id]
+        if not component_alerts:
+            del self._by_component[alert.component]
+        del self._by_level[alert.level.value][alert_id]
+        self._unacknowledged.pop(alert_id, None)
+        return alert
+
+    def replace_active(self, alerts: List["Alert"]) -> None:
+        """Sustituye las alertas activas (restauración de checkpoints)"""
+        self._active.clear()
+        self._by_component.clear()
+        for index in self._by_level.values():
+            index.clear()
+        self._unacknowledged.clear()
+        for alert in alerts[-self.max_active:]:
+            self._index(alert)
+
+    # Lectura
+    def get(self, alert_id: str) -> Optional["Alert"]:
+        return self._active.get(alert_id)
+
+    def active(self) -> Iterator["Alert"]:
+        return iter(self._active.values())
+
+    def by_component(self, component: str) -> List["Alert"]:
+        return list(self._by_component.get(component, {}).values())
+
+    def by_level(self, level: str) -> List["Alert"]:
+        return list(self._by_level.get(level, {}).values())
+
+    def unacknowledged(self) -> List["Alert"]:
+        return list(self._unacknowledged.values())
+
+    def summary(self) -> Dict:
+        return {
+            "total": len(self._active),
+            "by_level": {
+                "emergency": len(self._by_level["emergency"]),
+                "critical": len(self._by_level["critical"]),
+                "warning": len(self._by_level["warning"]),
+                "info": len(self._by_level["info"]),
+            },
+            "unacknowledged": len(self._unacknowledged),
+        }
+
+    def __contains__(self, alert_id: str) -> bool:
+        return alert_id in self._active
+
+    def __len__(self) -> int:
+        return len(self._active)
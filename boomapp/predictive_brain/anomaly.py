@@ -0,0 +1,158 @@
+"""
+Detección de anomalías en streaming sobre las métricas de FuturePredictor.
+Por cada métrica se mantiene una media y una varianza con media móvil
+exponencial (EWMA) y dos sumas CUSUM sobre el z-score:
+
+- Un pico aislado se detecta cuando |z| supera `z_threshold`.
+- Una deriva lenta se detecta cuando la suma acumulada de desviaciones
+  (menos la holgura `cusum_k`) supera `cusum_h`, mucho antes de que el valor
+  llegue a los umbrales fijos de THRESHOLDS.
+
+El estado es una fila fija de números por métrica (memoria constante) y cada
+mensaje actualiza en una sola pasada todas las métricas que trae. Con 5-9
+métricas por vehículo y mensaje, operar con arrays de NumPy cuesta más en
+llamadas que el cálculo en sí, así que la pasada es un bucle escalar.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence
+
+from .config import ANOMALY
+
+# Estado por métrica; se guarda en el checkpoint
+STATE_FIELDS = ("mean", "var", "count", "cusum_pos", "cusum_neg", "active", "quiet",
+                "since", "peak_z", "last_value", "last_z")
+(MEAN, VAR, COUNT, CUSUM_POS, CUSUM_NEG, ACTIVE, QUIET,
+ SINCE, PEAK_Z, LAST_VALUE, LAST_Z) = range(len(STATE_FIELDS))
+
+KINDS = {1: "spike", 2: "drift_up", 3: "drift_down"}
+
+
+class StreamingAnomalyDetector:
+    """EWMA + CUSUM por métrica con actualización en una pasada por mensaje"""
+
+    def __init__(self, metrics: Sequence[str], config: Dict = None):
+        config = config or ANOMALY
+        self.metrics = list(metrics)
+        self.index = {metric: i for i, metric in enumerate(self.metrics)}
+        self.alpha = config["alpha"]
+        self.active_alpha = config["alpha"] * config["active_alpha_factor"]
+        self.z_threshold = config["z_threshold"]
+        self.cusum_k = config["cusum_k"]
+        self.cusum_h = config["cusum_h"]
+        self.warmup = config["warmup_samples"]
+        self.clear_samples = config["clear_samples"]
+        self.min_std = [config["min_std"].get(m, 1e-6) for m in self.metrics]
+
+        # Una fila de STATE_FIELDS por métrica.
+        # ACTIVE: 0 = normal, 1 = pico, 2 = deriva al alza, 3 = deriva a la baja
+        self.state = [[0.0] * len(STATE_FIELDS) for _ in self.metrics]
+
+    def update(self, values: Dict[str, float], timestamp: float) -> List[str]:
+        """
+        Aplica un mensaje. Retorna las métricas cuyo estado de anomalía cambió
+        (detectada o despejada).
+        """
+        changed = []
+        for metric, x in values.items():
+            i = self.index.get(metric)
+            if i is None or x is None:
+                continue
+            row = self.state[i]
+            mean, var, count = row[MEAN], row[VAR], row[COUNT]
+
+            # z-score contra la línea base previa a la muestra (varianza EWMA sin sesgo inicial)
+            if count:
+                std = math.sqrt(var / (1.0 - (1.0 - self.alpha) ** count))
+                z = (x - mean) / (std if std > self.min_std[i] else self.min_std[i])
+            else:
+                z = 0.0
+
+            active = row[ACTIVE]
+            if count >= self.warmup:
+                cusum_pos = max(0.0, row[CUSUM_POS] + z - self.cusum_k)
+                cusum_neg = max(0.0, row[CUSUM_NEG] - z - self.cusum_k)
+                kind = 2.0 if cusum_pos > self.cusum_h else 3.0 if cusum_neg > self.cusum_h else 0.0
+                if kind:
+                    # La suma de una deriva señalada se mantiene en el umbral: cada
+                    # muestra que sigue desviada la vuelve a señalar, y baja de él
+                    # en cuanto la deriva cesa. Reiniciarla a cero hacía contar como
+                    # tranquilas las muestras de una deriva en curso y la anomalía
+                    # oscilaba entre alta y baja.
+                    cusum_pos, cusum_neg = (self.cusum_h, cusum_neg) if kind == 2.0 else (cusum_pos, self.cusum_h)
+                elif abs(z) > self.z_threshold:
+                    kind = 1.0
+                row[CUSUM_POS], row[CUSUM_NEG] = cusum_pos, cusum_neg
+                if kind or active:
+                    if self._track(row, kind, z, timestamp):
+                        changed.append(metric)
+
+            # EWMA de media y varianza; con anomalía vigente la línea base se adapta
+            # más despacio para que una deriva no se absorba antes de señalarse
+            if count:
+                alpha = self.active_alpha if active else self.alpha
+                diff = x - mean
+                increment = alpha * diff
+                row[MEAN] = mean + increment
+                row[VAR] = (1.0 - alpha) * (var + diff * increment)
+            else:
+                row[MEAN] = x
+            row[COUNT] = count + 1
+            row[LAST_VALUE] = x
+            row[LAST_Z] = z
+        return changed
+
+    def _track(self, row: List[float], kind: float, z: float, timestamp: float) -> bool:
+        """Altas y bajas de una anomalía; retorna si cambió su estado"""
+        if kind:
+            if not row[ACTIVE]:
+                row[ACTIVE], row[SINCE], row[PEAK_Z], row[QUIET] = kind, timestamp, abs(z), 0.0
+                return True
+            row[ACTIVE] = max(row[ACTIVE], kind)
+            row[PEAK_Z] = max(row[PEAK_Z], abs(z))
+            row[QUIET] = 0.0
+            return False
+        # Una deriva no cuenta muestras tranquilas mientras su suma siga por
+        # encima de la mitad del umbral (histéresis)
+        if row[ACTIVE] == 2.0 and row[CUSUM_POS] > self.cusum_h / 2:
+            return False
+        if row[ACTIVE] == 3.0 and row[CUSUM_NEG] > self.cusum_h / 2:
+            return False
+        row[QUIET] += 1
+        if row[QUIET] >= self.clear_samples:
+            row[ACTIVE] = row[QUIET] = 0.0
+            return True
+        return False
+
+    def active_anomalies(self) -> List[Dict]:
+        """Anomalías vigentes con su contexto"""
+        return [
+            {
+                "metric": self.metrics[i],
+                "kind": KINDS[int(row[ACTIVE])],
+                "value": row[LAST_VALUE],
+                "baseline_mean": row[MEAN],
+                "baseline_std": max(math.sqrt(row[VAR]), self.min_std[i]),
+                "z_score": row[LAST_Z],
+                "peak_z_score": row[PEAK_Z],
+                "since": row[SINCE],
+            }
+            for i, row in enumerate(self.state) if row[ACTIVE]
+        ]
+
+    def get_checkpoint_state(self) -> Dict:
+        return {
+            "metrics": self.metrics,
+            **{name: [row[field] for row in self.state] for field, name in enumerate(STATE_FIELDS)},
+        }
+
+    def restore_checkpoint_state(self, state: Optional[Dict]) -> None:
+        """Restaura por nombre de métrica (las que no estén empiezan de cero)"""
+        if not state:
+            return
+        for j, metric in enumerate(state["metrics"]):
+            i = self.index.get(metric)
+            if i is None:
+                continue
+            for field, name in enumerate(STATE_FIELDS):
+                self.state[i][field] = float(state[name][j])
@@ -0,0 +1,279 @@
+"""
+Recalculo offline (backfill) del desgaste y los pronósticos.
+Procesa la telemetría almacenada de un vehículo en forma columnar con
+operaciones vectorizadas de NumPy y produce los mismos resultados que el
+camino de streaming (WearAnalyzer + FuturePredictor), por ejemplo tras
+cambiar los umbrales de config.THRESHOLDS o el perfil de umbrales del
+vehículo (threshold_profiles).
+"""
+
+import csv
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from .threshold_profiles import ThresholdProfile, DEFAULT_PROFILE
+from .fleet_wear import obd_row_stress, sensor_row_stress, HARD_BRAKING_DROP, BRAKING_STRESS, WEAR_SCALE
+from .wear_models import WearAnalyzer, VehicleWearState
+from .future_predictor import FuturePredictor, ComponentForecast, FEATURE_WINDOWS, TREND_WINDOW, SIGNAL_COUNTERS
+
+OBD_COLUMNS = ["rpm", "speed", "coolant_temp", "throttle", "fuel_level"]
+SENSOR_COLUMNS = ["temperature", "pressure", "vibration", "humidity"]
+
+# Valores por defecto equivalentes a los .get() del camino de streaming
+COLUMN_DEFAULTS = {
+    "rpm": 0.0,
+    "speed": 0.0,
+    "coolant_temp": 90.0,
+    "throttle": 0.0,
+    "temperature": 25.0,
+    "pressure": 101.0,
+    "vibration": 0.0,
+}
+
+COMPONENTS = ["engine", "brakes", "transmission", "tires", "battery"]  # orden de fleet_wear.COMPONENTS
+
+
+def load_telemetry_columns(source: Union[str, Dict], sample_interval: float = 2.0,
+                           start_time: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    Carga telemetría columnar desde un CSV, un Parquet o un dict de arrays.
+    Si no hay columna "timestamp" se genera con un intervalo fijo entre filas
+    (los escenarios de data/*.csv avanzan un paso cada 2 segundos).
+    """
+    if isinstance(source, dict):
+        columns = {key: np.asarray(values, dtype=float) for key, values in source.items()}
+    elif str(source).endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Se requiere pyarrow para leer ficheros Parquet") from e
+        table = pq.read_table(source)
+        columns = {name: table.column(name).to_numpy().astype(float) for name in table.column_names}
+    else:
+        with open(source, "r") as f:
+            rows = list(csv.DictReader(f))
+        names = rows[0].keys() if rows else []
+        columns = {name: np.array([float(row[name]) for row in rows]) for name in names}
+
+    length = len(next(iter(columns.values()))) if columns else 0
+    if "timestamp" not in columns:
+        columns["timestamp"] = start_time + np.arange(length) * sample_interval
+    return columns
+
+
+@dataclass
+class BackfillResult:
+    """Resultado de un backfill de vehículo"""
+    wear_state: VehicleWearState
+    forecasts: Dict[str, ComponentForecast]
+    wear_analyzer: WearAnalyzer
+    future_predictor: FuturePredictor
+
+
+class WearBackfill:
+    """
+    Motor de backfill vectorizado.
+    Cada fila representa un mensaje OBD seguido del mensaje de sensores con el
+    mismo tiempo de evento, es decir, ya alineados como los emite
+    StreamJoiner; las filas se ordenan por tiempo de evento.
+    """
+
+    def __init__(self, history_size: int = 1000, thresholds: ThresholdProfile = None):
+        self.history_size = history_size
+        self.thresholds = thresholds or DEFAULT_PROFILE
+
+    def _prepare(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Ordena por tiempo de evento y completa columnas ausentes"""
+        timestamps = np.asarray(columns["timestamp"], dtype=float)
+        order = np.argsort(timestamps, kind="stable")
+        prepared = {"timestamp": timestamps[order]}
+        for name, values in columns.items():
+            if name != "timestamp":
+                prepared[name] = np.asarray(values, dtype=float)[order]
+        for name, default in COLUMN_DEFAULTS.items():
+            if name not in prepared:
+                prepared[name] = np.full(len(timestamps), default)
+        return prepared
+
+    def compute_wear(self, columns: Dict[str, np.ndarray]) -> WearAnalyzer:
+        """Integra el estrés de todos los componentes con operaciones sobre arrays"""
+        raw_names = set(columns)
+        data = self._prepare(columns)
+        ts = data["timestamp"]
+        rpm, speed = data["rpm"], data["speed"]
+        coolant, throttle = data["coolant_temp"], data["throttle"]
+        temperature, pressure, vibration = data["temperature"], data["pressure"], data["vibration"]
+        # Una fila solo genera el mensaje de cada tipo si trae alguna de sus columnas
+        has_obd = float(bool(raw_names.intersection(OBD_COLUMNS)))
+        has_sensor = float(bool(raw_names.intersection(SENSOR_COLUMNS)))
+
+        analyzer = WearAnalyzer(thresholds=self.thresholds)
+        state = analyzer.state
+        if len(ts) == 0:
+            return analyzer
+
+        # Delta de tiempo de evento de cada mensaje respecto al anterior de su
+        # flujo (el primero no avanza); OBD y sensores comparten filas
+        row_dt = np.diff(ts, prepend=ts[0])
+        obd_dt = row_dt * has_obd
+        sensor_dt = row_dt * has_sensor
+
+        # Mismas fórmulas de estrés por fila que FleetWearKernel y what-if;
+        # la fila fusionada trae la velocidad del OBD de su mismo tiempo de evento
+        obd = obd_row_stress(rpm, speed, coolant, throttle, self.thresholds)
+        sensor = sensor_row_stress(temperature, pressure, vibration, speed, self.thresholds)
+
+        hard_braking = np.zeros(len(ts), dtype=bool)
+        if has_obd:
+            hard_braking[1:] = speed[:-1] - speed[1:] > HARD_BRAKING_DROP
+        hard_braking_cum = np.cumsum(hard_braking)
+
+        runtime_hours = float(obd_dt.sum()) / 3600
+        state.total_runtime_hours = runtime_hours
+        state.start_time = float(ts[0])
+        state.high_rpm_seconds = float(np.sum(obd_dt * obd["high_rpm"]))
+        state.overheating_seconds = float(np.sum(obd_dt * obd["overheating"]))
+        state.hard_braking_count = int(hard_braking_cum[-1])
+        state.high_vibration_seconds = float(np.sum(sensor_dt * sensor["high_vibration"]))
+        state.pressure_anomaly_seconds = float(np.sum(sensor_dt * sensor["pressure_anomaly"]))
+
+        accumulated = {
+            "engine": float(np.sum(obd["engine"] * obd_dt)),
+            "transmission": float(np.sum(obd["transmission"] * obd_dt)),
+            "brakes": float(np.sum(sensor["brakes"] * sensor_dt)
+                            + BRAKING_STRESS * np.sum(hard_braking_cum) * has_sensor),
+            "tires": float(np.sum(sensor["tires"] * sensor_dt)),
+            "battery": float(np.sum(sensor["battery"]) * has_sensor),
+        }
+        for name, scale in zip(COMPONENTS, WEAR_SCALE):
+            component = getattr(state, name)
+            component.accumulated_stress = accumulated[name]
+            component.wear_percentage = min(100, accumulated[name] / scale)
+            component.health_score = max(0, 100 - component.wear_percentage)
+            component.hours_until_maintenance = max(0, component.hours_until_maintenance - runtime_hours)
+
+        # Dejar el analizador listo para continuar en streaming
+        analyzer.clock.advance(float(ts[-1]))
+        if has_sensor:
+            analyzer.sensor_clock.advance(float(ts[-1]))
+        analyzer.last_update = analyzer.clock.watermark
+        analyzer.last_obd_data = {name: float(data[name][-1]) for name in OBD_COLUMNS if name in raw_names}
+        analyzer.last_sensor_data = {name: float(data[name][-1]) for name in SENSOR_COLUMNS if name in raw_names}
+        return analyzer
+
+    def compute_predictor(self, columns: Dict[str, np.ndarray]) -> FuturePredictor:
+        """Construye el historial, los contadores y el almacén de características"""
+        raw_names = set(columns)
+        data = self._prepare(columns)
+        ts = data["timestamp"]
+        predictor = FuturePredictor(history_size=self.history_size, thresholds=self.thresholds)
+        if len(ts) == 0:
+            return predictor
+
+        rpm, speed = data["rpm"], data["speed"]
+        coolant, throttle = data["coolant_temp"], data["throttle"]
+        pressure, vibration = data["pressure"], data["vibration"]
+
+        # Historial: solo las métricas presentes en la telemetría. Los agregados
+        # cubren toda la telemetría, no solo la cola que cabe en el buffer
+        tail = slice(-self.history_size, None)
+        for name, buffer in predictor.history.items():
+            if name in raw_names:
+                buffer.data.extend(data[name][tail].tolist())
+                buffer.timestamps.extend(ts[tail].tolist())
+                buffer.rollups.load_samples(data[name], ts)
+                predictor.dirty_metrics.add(name)
+
+        prev_speed = np.concatenate(([0.0], speed[:-1]))
+        t = self.thresholds
+        counters = predictor.event_counters
+        counters["high_rpm_samples"] = int(np.count_nonzero(rpm > t.rpm_max))
+        counters["high_throttle_samples"] = int(np.count_nonzero(throttle > 85))
+        counters["hard_braking_events"] = int(np.count_nonzero(prev_speed - speed > 15))
+        if predictor.signals is None:
+            # Sin histéresis cada muestra por encima del umbral es un evento
+            counters["high_rpm_events"] = counters["high_rpm_samples"]
+            counters["overheating_events"] = int(np.count_nonzero(coolant > t.coolant_temp_warning))
+            counters["high_throttle_events"] = counters["high_throttle_samples"]
+            counters["high_vibration_events"] = int(np.count_nonzero(vibration > t.brake_vibration_warning))
+            counters["pressure_anomaly_events"] = int(np.count_nonzero(
+                (pressure < t.tire_pressure_min) | (pressure > t.tire_pressure_max)
+            ))
+
+        predictor.start_time = float(ts[0])
+        predictor.clock.advance(float(ts[-1]))
+        predictor.last_speed = float(speed[-1])
+
+        # Sembrar el almacén de características del ciclo con cálculo vectorizado
+        predictor._data_version += 1
+        predictor._features = {
+            name: self._window_features(data[name][tail] if name in raw_names else np.empty(0), ts[tail])
+            for name in predictor.history
+        }
+        predictor._features_version = predictor._data_version
+
+        # El detector de anomalías y las señales con histéresis son recursivos en
+        # el tiempo: se reproducen fila a fila, en el mismo orden que en
+        # streaming (OBD y luego sensores)
+        detector, signals = predictor.anomaly_detector, predictor.signals
+        if detector is not None or signals is not None:
+            groups = [
+                (source, [(name, data[name].tolist()) for name in names if name in raw_names])
+                for source, names in (("obd", OBD_COLUMNS), ("sensors", SENSOR_COLUMNS))
+            ]
+            for i, timestamp in enumerate(ts.tolist()):
+                for source, group in groups:
+                    if group:
+                        values = {name: column[i] for name, column in group}
+                        if detector is not None:
+                            detector.update(values, timestamp)
+                        if signals is not None:
+                            signals.update(source, values, timestamp)
+            if signals is not None:
+                for name, counter in SIGNAL_COUNTERS.items():
+                    counters[counter] += signals.episode_count(name)
+        return predictor
+
+    @staticmethod
+    def _window_features(values: np.ndarray, ts: np.ndarray) -> Dict[str, Optional[float]]:
+        """Mismas características que DataBuffer.compute_features, sobre arrays"""
+        # Las medias usan suma secuencial (cumsum) para coincidir bit a bit con sum()
+        features: Dict[str, Optional[float]] = {"count": len(values)}
+        for window in FEATURE_WINDOWS:
+            recent = values[-window:]
+            features[f"avg_{window}"] = float(np.cumsum(recent)[-1] / len(recent)) if len(recent) else None
+
+        recent = values[-TREND_WINDOW:]
+        if len(recent) < 10:
+            features["slope"] = None
+        else:
+            x = np.arange(len(recent)) - (len(recent) - 1) / 2
+            y_mean = np.cumsum(recent)[-1] / len(recent)
+            features["slope"] = float(np.dot(x, recent - y_mean) / np.dot(x, x))
+
+        if len(values) < 2:
+            features["rate"] = None
+        else:
+            time_diff = ts[-1] - ts[0]
+            features["rate"] = float((values[-1] - values[0]) / time_diff) if time_diff else 0
+        return features
+
+    def run(self, columns: Union[str, Dict], sample_interval: float = 2.0) -> BackfillResult:
+        """Recalcula desgaste y pronósticos de un vehículo a partir de su telemetría"""
+        if not isinstance(columns, dict) or "timestamp" not in columns:
+            columns = load_telemetry_columns(columns, sample_interval)
+
+        analyzer = self.compute_wear(columns)
+        predictor = self.compute_predictor(columns)
+        forecasts = {
+            name: predictor.get_component_forecast(name, getattr(analyzer.state, name).health_score)
+            for name in COMPONENTS
+        }
+        return BackfillResult(
+            wear_state=analyzer.state,
+            forecasts=forecasts,
+            wear_analyzer=analyzer,
+            future_predictor=predictor,
+        )
@@ -0,0 +1,187 @@
+"""
+Checkpoints del estado del cerebro predictivo.
+Guarda de forma atómica el desgaste acumulado, los historiales de
+FuturePredictor, los contadores de eventos y los cooldowns de alertas en un
+único fichero binario .npz, y lo restaura al arrancar.
+
+Formato (pensado para muchos vehículos):
+- "meta": JSON (uint8) con la versión, los IDs de vehículo y los escalares
+  de cada uno.
+- "<buffer>.values" / "<buffer>.timestamps": float64 con los buffers de todos
+  los vehículos concatenados.
+- "<buffer>.offsets": int64 con los límites de cada vehículo (n + 1).
+- "rollups.rows": float64 (n, 5) con los cubos de todos los niveles de
+  agregados (ver rollups.COLUMNS), por vehículo y luego por nivel
+  "<buffer>@<segundos>" (lista en meta["rollups"]), y "rollups.row_offsets" con
+  los límites de cada par (vehículo, nivel). Van en solo dos arrays porque
+  cada entrada del .npz tiene un coste fijo al escribir y leer.
+
+Los checkpoints de la versión 1 no traen agregados: se reconstruyen con las
+muestras crudas al restaurar.
+"""
+
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .wear_models import WearAnalyzer
+from .alert_manager import AlertManager
+from .future_predictor import FuturePredictor
+from .stream_join import StreamJoiner
+from .hysteresis import SignalBank
+from .incidents import IncidentCorrelator
+from .rollups import COLUMNS as ROLLUP_COLUMNS
+
+CHECKPOINT_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+
+
+@dataclass
+class VehicleSnapshot:
+    """Estado serializable de un vehículo"""
+    scalars: Dict = field(default_factory=dict)
+    buffers: Dict[str, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict)
+    rollups: Dict[str, np.ndarray] = field(default_factory=dict)  # "<buffer>@<segundos>"
+
+
+def snapshot_vehicle(wear_analyzer: WearAnalyzer, future_predictor: FuturePredictor,
+                     alert_manager: AlertManager, stream_join: StreamJoiner = None,
+                     signals: SignalBank = None,
+                     incidents: IncidentCorrelator = None) -> VehicleSnapshot:
+    """Captura el estado de los analizadores de un vehículo"""
+    predictor_scalars, buffers = future_predictor.get_checkpoint_state()
+    scalars = {
+        "wear": wear_analyzer.get_checkpoint_state(),
+        "predictor": predictor_scalars,
+        "alerts": alert_manager.get_checkpoint_state(),
+    }
+    if stream_join is not None and stream_join.pending:
+        scalars["join"] = stream_join.get_checkpoint_state()
+    if signals is not None:
+        scalars["signals"] = signals.get_checkpoint_state()
+    if incidents is not None and incidents.open:
+        scalars["incidents"] = incidents.get_checkpoint_state()
+    return VehicleSnapshot(
+        scalars=scalars,
+        buffers={
+            name: (np.fromiter(buffer.data, dtype=np.float64, count=len(buffer.data)),
+                   np.fromiter(buffer.timestamps, dtype=np.float64, count=len(buffer.timestamps)))
+            for name, buffer in buffers.items()
+        },
+        rollups={
+            f"{name}@{tier.resolution:g}": tier.to_array()
+            for name, buffer in buffers.items()
+            for tier in buffer.rollups.tiers
+        },
+    )
+
+
+def restore_vehicle(snapshot: VehicleSnapshot, wear_analyzer: WearAnalyzer,
+                    future_predictor: FuturePredictor, alert_manager: AlertManager,
+                    stream_join: StreamJoiner = None, signals: SignalBank = None,
+                    incidents: IncidentCorrelator = None) -> None:
+    """Aplica un snapshot sobre los analizadores de un vehículo"""
+    wear_analyzer.restore_checkpoint_state(snapshot.scalars["wear"])
+    rollups: Dict[str, Dict[float, np.ndarray]] = {}
+    for key, rows in snapshot.rollups.items():
+        name, resolution = key.rsplit("@", 1)
+        rollups.setdefault(name, {})[float(resolution)] = rows
+    future_predictor.restore_checkpoint_state(
+        snapshot.scalars["predictor"],
+        {name: (values.tolist(), timestamps.tolist())
+         for name, (values, timestamps) in snapshot.buffers.items()},
+        rollups,
+    )
+    alert_manager.restore_checkpoint_state(snapshot.scalars["alerts"])
+    if stream_join is not None:
+        stream_join.restore_checkpoint_state(snapshot.scalars.get("join"))
+    if signals is not None:
+        signals.restore_checkpoint_state(snapshot.scalars.get("signals"))
+    if incidents is not None:
+        incidents.restore_checkpoint_state(snapshot.scalars.get("incidents"))
+
+
+def pack_snapshots(snapshots: Dict[str, VehicleSnapshot]) -> Dict[str, np.ndarray]:
+    """Empaqueta los snapshots de varios vehículos en arrays planos"""
+    vehicle_ids = list(snapshots)
+    meta = {
+        "version": CHECKPOINT_VERSION,
+        "vehicles": vehicle_ids,
+        "scalars": [snapshots[vid].scalars for vid in vehicle_ids],
+        "rollups": sorted({name for snap in snapshots.values() for name in snap.rollups}),
+    }
+    arrays = {"meta": np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)}
+
+    buffer_names = sorted({name for snap in snapshots.values() for name in snap.buffers})
+    empty = np.empty(0, dtype=np.float64)
+    for name in buffer_names:
+        parts = [snapshots[vid].buffers.get(name, (empty, empty)) for vid in vehicle_ids]
+        lengths = [len(values) for values, _ in parts]
+        arrays[f"{name}.values"] = np.concatenate([values for values, _ in parts]) if parts else empty
+        arrays[f"{name}.timestamps"] = np.concatenate([ts for _, ts in parts]) if parts else empty
+        arrays[f"{name}.offsets"] = np.concatenate(([0], np.cumsum(lengths))).astype(np.int64)
+
+    if meta["rollups"]:
+        no_rows = np.empty((0, len(ROLLUP_COLUMNS)), dtype=np.float64)
+        parts = [snapshots[vid].rollups.get(name, no_rows) for vid in vehicle_ids for name in meta["rollups"]]
+        arrays["rollups.rows"] = np.concatenate(parts) if parts else no_rows
+        arrays["rollups.row_offsets"] = np.concatenate(([0], np.cumsum([len(rows) for rows in parts]))).astype(np.int64)
+    return arrays
+
+
+def unpack_snapshots(arrays) -> Dict[str, VehicleSnapshot]:
+    """Operación inversa de pack_snapshots"""
+    meta = json.loads(bytes(arrays["meta"]).decode())
+    if meta.get("version") not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Versión de checkpoint no soportada: {meta.get('version')}")
+
+    snapshots = {
+        vid: VehicleSnapshot(scalars=scalars)
+        for vid, scalars in zip(meta["vehicles"], meta["scalars"])
+    }
+    buffer_names = {key.rsplit(".", 1)[0] for key in arrays.keys() if key.endswith(".offsets")}
+    for name in buffer_names:
+        values = arrays[f"{name}.values"]
+        timestamps = arrays[f"{name}.timestamps"]
+        offsets = arrays[f"{name}.offsets"]
+        for i, vid in enumerate(meta["vehicles"]):
+            start, end = offsets[i], offsets[i + 1]
+            snapshots[vid].buffers[name] = (values[start:end], timestamps[start:end])
+
+    rollup_names = meta.get("rollups", [])
+    if rollup_names:
+        rows, offsets = arrays["rollups.rows"], arrays["rollups.row_offsets"]
+        part = 0
+        for vid in meta["vehicles"]:
+            for name in rollup_names:
+                snapshots[vid].rollups[name] = rows[offsets[part]:offsets[part + 1]]
+                part += 1
+    return snapshots
+
+
+def save_checkpoint(path: str, snapshots: Dict[str, VehicleSnapshot]) -> None:
+    """Escribe un checkpoint de forma atómica (fichero temporal + rename)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=".checkpoint-", suffix=".npz", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **pack_snapshots(snapshots))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_checkpoint(path: str) -> Dict[str, VehicleSnapshot]:
+    """Lee un checkpoint escrito con save_checkpoint"""
+    with np.load(path) as data:
+        arrays = {key: data[key] for key in data.files}
+    return unpack_snapshots(arrays)
@@ -0,0 +1,194 @@
+"""
+Modo clúster del cerebro predictivo.
+Varias instancias comparten la entrada con suscripciones compartidas de MQTT
+($share/<group>/...) y se reparten los vehículos con un anillo de hash
+consistente. Cada instancia anuncia su presencia con latidos periódicos (y un
+mensaje de última voluntad al caer); cuando cambia la pertenencia, el estado
+de los vehículos que cambian de dueño se entrega a través del directorio de
+volcado compartido.
+
+El latido incluye los miembros para los que la instancia ya entregó sus
+vehículos. Hasta que todos los demás confirman la pertenencia actual (o vence
+CLUSTER["handoff_timeout_seconds"]), el motor retiene los mensajes de los
+vehículos que aún no tiene: si los procesara antes de que el dueño anterior
+escriba el volcado, empezaría con un estado vacío y perdería el historial.
+"""
+
+import bisect
+import hashlib
+import json
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import paho.mqtt.client as mqtt
+
+from .config import TOPICS, CLUSTER
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Anillo de hash consistente con nodos virtuales.
+    Al añadir o quitar una instancia solo cambia de dueño ~1/N de los vehículos.
+    """
+
+    def __init__(self, members: List[str] = None, virtual_nodes: int = None):
+        self.virtual_nodes = virtual_nodes or CLUSTER["virtual_nodes"]
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self.members: List[str] = []
+        self.set_members(members or [])
+
+    def set_members(self, members: List[str]) -> None:
+        self.members = sorted(set(members))
+        points = sorted(
+            (_hash(f"{member}#{i}"), member)
+            for member in self.members
+            for i in range(self.virtual_nodes)
+        )
+        self._points = [point for point, _ in points]
+        self._owners = [member for _, member in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._points:
+            return None
+        index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class ClusterMembership:
+    """
+    Pertenencia al clúster y reparto de vehículos.
+    No publica por sí misma: el motor envía los latidos y le pasa los que recibe.
+    """
+
+    def __init__(self, group: str, instance_id: str,
+                 heartbeat_interval: float = None, member_timeout: float = None,
+                 virtual_nodes: int = None, handoff_timeout: float = None,
+                 on_change: Optional[Callable[[List[str]], None]] = None):
+        self.group = group
+        self.instance_id = instance_id
+        self.heartbeat_interval = heartbeat_interval or CLUSTER["heartbeat_interval_seconds"]
+        self.member_timeout = member_timeout or CLUSTER["member_timeout_seconds"]
+        self.handoff_timeout = handoff_timeout or CLUSTER["handoff_timeout_seconds"]
+        self.on_change = on_change
+
+        now = time.time()
+        self._last_seen: Dict[str, float] = {instance_id: now}
+        self._lock = threading.Lock()
+        self.ring = HashRing([instance_id], virtual_nodes)
+        self.membership_changes = 0
+
+        # Traspaso: miembros para los que cada instancia confirmó su entrega
+        self._handed_off: Dict[str, List[str]] = {instance_id: [instance_id]}
+        # Al arrancar aún no conocemos a los demás: se espera a sus latidos
+        self._discovery_deadline = now + 2 * self.heartbeat_interval
+        self._settle_deadline = now + self.handoff_timeout
+
+    # Topics
+    def shared_topic(self, topic: str) -> str:
+        return f"$share/{self.group}/{topic}"
+
+    def member_topic(self, instance_id: str = None) -> str:
+        return TOPICS["cluster_members"].format(group=self.group, instance_id=instance_id or self.instance_id)
+
+    def members_wildcard(self) -> str:
+        return self.member_topic("+")
+
+    def forward_topic(self, instance_id: str = None) -> str:
+        return TOPICS["cluster_forward"].format(group=self.group, instance_id=instance_id or self.instance_id)
+
+    def is_member_topic(self, topic: str) -> bool:
+        return mqtt.topic_matches_sub(self.members_wildcard(), topic)
+
+    def heartbeat_payload(self, online: bool = True) -> str:
+        with self._lock:
+            handed_off = self._handed_off[self.instance_id]
+        return json.dumps({
+            "instance_id": self.instance_id,
+            "status": "online" if online else "offline",
+            "timestamp": time.time(),
+            "handoff": handed_off,
+        })
+
+    # Pertenencia
+    def handle_heartbeat(self, payload: Dict) -> None:
+        """Procesa el latido (o la baja) de una instancia"""
+        instance_id = payload.get("instance_id")
+        if not instance_id or instance_id == self.instance_id:
+            return
+        with self._lock:
+            if payload.get("status") == "offline":
+                self._last_seen.pop(instance_id, None)
+                self._handed_off.pop(instance_id, None)
+            else:
+                self._last_seen[instance_id] = time.time()
+                self._handed_off[instance_id] = sorted(payload.get("handoff") or [])
+        self._refresh()
+
+    def expire(self) -> None:
+        """Da de baja las instancias sin latidos recientes"""
+        now = time.time()
+        with self._lock:
+            self._last_seen[self.instance_id] = now
+            for instance_id, seen in list(self._last_seen.items()):
+                if now - seen > self.member_timeout:
+                    del self._last_seen[instance_id]
+                    self._handed_off.pop(instance_id, None)
+        self._refresh()
+
+    def _refresh(self) -> None:
+        with self._lock:
+            members = sorted(self._last_seen)
+            if members == self.ring.members:
+                return
+            self.ring.set_members(members)
+            self.membership_changes += 1
+            self._settle_deadline = time.time() + self.handoff_timeout
+        print(f"🔁 [Cluster] Miembros de '{self.group}': {', '.join(members)}")
+        if self.on_change:
+            self.on_change(members)
+
+    # Traspaso de vehículos
+    def mark_handed_off(self, members: List[str]) -> None:
+        """Registra que ya entregamos los vehículos que no nos tocan con `members`"""
+        with self._lock:
+            self._handed_off[self.instance_id] = sorted(members)
+
+    def handoff_settled(self) -> bool:
+        """
+        True cuando todos los demás miembros entregaron ya los vehículos según
+        la pertenencia actual, o venció el plazo de espera.
+        """
+        now = time.time()
+        with self._lock:
+            members = self.ring.members
+            others = [member for member in members if member != self.instance_id]
+            if not others:
+                return now >= self._discovery_deadline
+            if now >= self._settle_deadline:
+                return True
+            return all(self._handed_off.get(member) == members for member in others)
+
+    @property
+    def members(self) -> List[str]:
+        return list(self.ring.members)
+
+    def owner(self, vehicle_id: str) -> str:
+        return self.ring.owner(vehicle_id) or self.instance_id
+
+    def is_owner(self, vehicle_id: str) -> bool:
+        return self.owner(vehicle_id) == self.instance_id
+
+    def get_stats(self) -> Dict:
+        return {
+            "group": self.group,
+            "instance_id": self.instance_id,
+            "members": self.members,
+            "membership_changes": self.membership_changes,
+            "handoff_settled": self.handoff_settled(),
+        }
@@ -6,6 +6,12 @@ TOPICS = {
     "sensors_input": "boomapp/vehicle/sensors",
     "predictions_output": "boomapp/predictions/wear",
     "alerts_output": "boomapp/predictions/alerts",
+    # Flota: boomapp/vehicle/<vehicle_id>/obd y boomapp/vehicle/<vehicle_id>/sensors
+    "fleet_obd_input": "boomapp/vehicle/+/obd",
+    "fleet_sensors_input": "boomapp/vehicle/+/sensors",
+    # Modo clúster: latidos de las instancias y reenvío al dueño de un vehículo
+    "cluster_members": "boomapp/brain/cluster/{group}/members/{instance_id}",
+    "cluster_forward": "boomapp/brain/cluster/{group}/forward/{instance_id}",
 }
 
 # Umbrales de alerta para componentes
@@ -32,6 +38,17 @@ THRESHOLDS = {
         "pressure_max": 110,
         "vibration_warning": 6.0,
     },
+    "fuel": {
+        "level_warning": 15,   # % de depósito
+        "level_critical": 5,
+    },
+}
+
+# Perfiles de umbrales por modelo de vehículo (ver threshold_profiles.py)
+THRESHOLD_PROFILES = {
+    "directory": "data/threshold_profiles",  # un JSON por perfil; lo que no defina se hereda de THRESHOLDS
+    "default_profile": "default",            # perfil de los vehículos sin asignar ("default" = THRESHOLDS)
+    "vehicles": {},                          # vehicle_id -> perfil (prevalece sobre los "vehicles" de los ficheros)
 }
 
 # Pesos para cálculo de desgaste (0-1)
@@ -58,6 +75,188 @@ WEAR_WEIGHTS = {
     },
 }
 
+# Umbrales de los factores de uso de WEAR_WEIGHTS que no están en THRESHOLDS
+WEAR_USAGE = {
+    "cold_coolant_temp": 60,        # cold_starts: motor girando con refrigerante frío (°C)
+    "rpm_fluctuation": 1500,        # rpm_fluctuation: salto de RPM entre mensajes OBD
+    "high_speed_braking_kmh": 100,  # high_speed_braking: frenado brusco desde esta velocidad
+}
+
+# Histéresis de las señales de umbral (alertas y contadores de episodios)
+HYSTERESIS = {
+    "enabled": True,
+    "enter_dwell_seconds": 0.0,    # más allá del umbral durante este tiempo para activar
+    "exit_dwell_seconds": 15.0,    # dentro de la banda de salida durante este tiempo para desactivar
+    # Banda de salida por métrica: la señal se apaga al volver este margen por dentro del umbral
+    "exit_margin": {
+        "rpm": 300, "coolant_temp": 3.0, "fuel_level": 2.0, "throttle": 5.0,
+        "vibration": 0.5, "pressure": 1.5, "temperature": 2.0,
+    },
+    # Permanencias por señal (nombre de la regla de alerta o de hysteresis.EXTRA_SIGNALS)
+    "overrides": {
+        "ambient_hot": {"enter_dwell_seconds": 30.0},   # la temperatura ambiente varía despacio
+    },
+}
+
+# Procesamiento por tiempo de evento
+EVENT_TIME = {
+    "max_out_of_order_seconds": 5.0,  # tolerancia a mensajes desordenados
+}
+
+# Unión por tiempo de evento de los flujos OBD y de sensores de cada vehículo
+STREAM_JOIN = {
+    "tolerance_seconds": 1.0,   # separación máxima para emparejar un OBD con un sensor
+    "max_delay_seconds": 2.0,   # tiempo de evento máximo esperando al otro flujo
+    "max_wait_seconds": 5.0,    # tiempo real máximo en cola (vehículo que deja de enviar)
+    "max_pending": 64,          # mensajes en cola por flujo; por encima se emiten sin esperar
+    "recent_size": 32,          # mensajes recientes por flujo para emparejar
+}
+
+# Modelado multi-vehículo
+FLEET = {
+    "default_vehicle_id": "default",  # para mensajes sin vehicle_id
+    "memory_budget_mb": 512,          # memoria para vehículos residentes
+    "spill_dir": "checkpoints/spill", # estado de vehículos inactivos
+}
+
+# Cola de ingesta y workers particionados por vehículo
+INGEST = {
+    "num_workers": 4,      # 0 = procesar en el hilo de red de MQTT
+    "queue_size": 10000,   # mensajes en cola por worker antes de descartar
+    # Los sensores se descartan con la cola a partir de esta ocupación; el
+    # resto queda reservado para OBD, que espera hasta obd_put_timeout_seconds
+    "sensor_max_fill": 0.8,
+    "obd_put_timeout_seconds": 0.05,
+}
+
+# Degradación bajo sobrecarga de ingesta (ocupación de cola 0-1, espera en segundos)
+OVERLOAD = {
+    "check_interval_seconds": 0.25,
+    "levels": {
+        # Nivel 1: solo se encola 1 de cada `sensor_sample_every` mensajes de sensores por vehículo
+        "downsample": {"enter_fill": 0.25, "enter_wait": 0.5, "exit_fill": 0.10, "exit_wait": 0.2},
+        # Nivel 2: además se aplazan pronósticos y estimación de costes
+        "defer": {"enter_fill": 0.50, "enter_wait": 2.0, "exit_fill": 0.25, "exit_wait": 1.0},
+    },
+    "sensor_sample_every": 4,
+}
+
+# Escalado horizontal con suscripciones compartidas ($share/<group>/...)
+CLUSTER = {
+    "heartbeat_interval_seconds": 5,
+    "member_timeout_seconds": 15,   # sin latido durante este tiempo = fuera
+    "virtual_nodes": 160,           # puntos por instancia en el anillo de hash
+    # Tras un cambio de miembros, los mensajes de vehículos que no tenemos en
+    # memoria se retienen hasta que los demás confirman su traspaso (o vence
+    # este plazo, p. ej. si el dueño anterior cayó sin entregarlos)
+    "handoff_timeout_seconds": 15,
+    "handoff_hold_max_messages": 500,  # por vehículo; los siguientes se descartan
+}
+
+# Publicación periódica por vehículo según su nivel de riesgo (segundos)
+PUBLISH_SCHEDULE = {
+    "tiers": {
+        "critical": {"predictions": 2, "forecasts": 5},
+        "elevated": {"predictions": 5, "forecasts": 15},
+        "healthy": {"predictions": 30, "forecasts": 120},
+    },
+    "default_tier": "elevated",     # vehículos recién vistos
+    "critical_health": 50,          # salud general por debajo = crítico
+    "elevated_health": 75,          # salud general por debajo = elevado
+    "batch_size": 500,              # tareas vencidas máximas por tanda
+    "max_sleep_seconds": 0.5,       # espera máxima del hilo planificador
+}
+
+# Checkpoints periódicos del estado del cerebro
+CHECKPOINT = {
+    "interval_seconds": 60,
+}
+
+# Instrumentación por etapas del camino caliente (activable en caliente)
+INSTRUMENTATION = {
+    "enabled": False,
+    "dump_interval_seconds": 0,   # 0 = sin volcado periódico
+}
+
+# Agregados por niveles del historial (min/max/media/conteo por cubo)
+ROLLUPS = {
+    # (nombre, segundos por cubo, cubos retenidos)
+    "tiers": [("1m", 60, 60), ("1h", 3600, 72), ("1d", 86400, 60)],
+    "trend_tiers": ["1d", "1h"],   # niveles válidos para la tendencia de largo plazo
+    "trend_min_buckets": 6,        # cubos mínimos para ajustar la tendencia
+}
+
+# Vida útil restante por Monte Carlo (P10/P50/P90 de horas hasta el fallo)
+RUL = {
+    "enabled": True,
+    "trials": 2000,            # trayectorias simuladas por componente
+    "failure_health": 20,      # salud a la que el componente pasa a "failure"
+    "horizon_hours": 10000,    # cruces más allá cuentan como "sin fallo previsto"
+    "min_points": 10,          # puntos mínimos de salud para ajustar la tendencia
+    "seed": None,              # semilla fija para resultados reproducibles
+}
+
+# Proyecciones what-if del desgaste con perfiles de conducción (what_if.py)
+WHAT_IF = {
+    "sample_interval_seconds": 2.0,  # duración de cada fila si el perfil no trae "timestamp"
+    "points": 20,                    # puntos de la trayectoria de salud hasta el horizonte
+}
+
+# Detección de anomalías en streaming (EWMA + CUSUM sobre el z-score)
+ANOMALY = {
+    "enabled": True,
+    "alpha": 0.01,             # peso de cada muestra en la media/varianza EWMA
+    "z_threshold": 5.0,        # |z| por encima = pico anómalo
+    "cusum_k": 0.5,            # holgura por muestra (en desviaciones típicas)
+    "cusum_h": 8.0,            # suma acumulada por encima = deriva
+    "warmup_samples": 100,     # muestras antes de empezar a señalar
+    "clear_samples": 50,       # muestras sin señal para despejar la anomalía
+    "active_alpha_factor": 0.1,  # adaptación de la línea base con anomalía vigente
+    # Desviación típica mínima por métrica (evita z enormes con señales planas)
+    "min_std": {
+        "rpm": 50, "speed": 1.0, "coolant_temp": 0.5, "throttle": 1.0, "fuel_level": 0.5,
+        "temperature": 0.5, "pressure": 0.5, "vibration": 0.1, "humidity": 1.0,
+    },
+    # Componente al que se atribuye la anomalía de cada métrica
+    "components": {
+        "rpm": "engine", "coolant_temp": "engine", "throttle": "engine", "fuel_level": "engine",
+        "speed": "transmission", "vibration": "brakes", "pressure": "tires",
+        "temperature": "battery", "humidity": "battery",
+    },
+}
+
+# Análisis espectral de ventanas crudas de vibración (frenos y neumáticos)
+VIBRATION = {
+    "sample_rate_hz": 1000,      # si el mensaje no trae "vibration_sample_rate"
+    "min_window": 128,           # muestras mínimas por ventana
+    "segment_size": 512,         # muestras por segmento de Welch
+    "segment_overlap": 0.5,
+    "batch_size": 32,            # ventanas encoladas antes de procesar el lote
+    "min_frequency_hz": 1.0,     # por debajo se ignora (deriva del sensor)
+    # Bandas de energía (Hz)
+    "bands": {"wheel": (1, 40), "brake": (40, 150), "structural": (150, 500)},
+    "fast_alpha": 0.2,           # media móvil rápida de energía por banda
+    "slow_alpha": 0.02,          # media móvil lenta (referencia)
+    "wheel_diameter_m": 0.65,    # para la frecuencia de giro de la rueda
+    "order_tolerance": 0.15,     # ± fracción alrededor de cada orden de rueda
+    "order_energy_ratio": 0.3,   # fracción de energía en órdenes = firma presente
+    "min_speed_kmh": 20,         # por debajo no se evalúa la firma de rueda
+    "braking_decel_kmh_s": 4.0,  # deceleración que cuenta como frenada
+    "score_alpha": 0.1,          # media móvil de la evidencia de cada firma
+    "score_threshold": 0.5,      # evidencia media para reportar la firma
+    "min_windows": 10,           # ventanas evaluadas antes de reportar
+    "history_size": 120,         # resúmenes recientes en memoria
+}
+
+# Métricas de entrada que alimentan el pronóstico de cada componente
+COMPONENT_METRICS = {
+    "engine": ["rpm", "coolant_temp", "throttle"],
+    "brakes": ["vibration", "speed"],
+    "transmission": ["rpm", "speed", "throttle"],
+    "tires": ["pressure", "speed"],
+    "battery": ["temperature"],
+}
+
 # Intervalos de mantenimiento base (en horas de uso)
 MAINTENANCE_INTERVALS = {
     "oil_change": 250,
@@ -67,6 +266,38 @@ MAINTENANCE_INTERVALS = {
     "transmission_service": 1000,
 }
 
+# Alertas: límites de memoria y cooldown
+ALERTS = {
+    "history_size": 1000,     # alertas en el historial (buffer circular)
+    "max_active": 200,        # alertas activas por vehículo; se desaloja la más antigua
+    "cooldown_seconds": 30,   # entre alertas del mismo componente y nivel
+    "ttl_seconds": 3600,      # una alerta activa caduca tras este tiempo de evento
+    "reminder_seconds": 600,  # recordatorio de alertas graves sin reconocer
+    "reminder_levels": ["critical", "emergency"],
+    "timer_tick_seconds": 1.0,  # resolución de la rueda de temporizadores
+    # Sin mensajes durante este tiempo real, el reloj de eventos del vehículo
+    # avanza con el tiempo real transcurrido para que venzan sus temporizadores
+    "idle_advance_seconds": 30,
+}
+
+# Limitación de alertas por vehículo y componente (cubos de tokens, tiempo de evento)
+ALERT_RATE_LIMIT = {
+    "enabled": True,
+    "component": {"burst": 3, "refill_per_minute": 0.5},   # por componente de cada vehículo
+    "vehicle": {"burst": 8, "refill_per_minute": 2.0},     # todas las alertas de un vehículo
+    "bypass_levels": ["emergency"],                        # nunca se limitan
+    "summary_interval_seconds": 300,  # resumen periódico de las alertas suprimidas
+}
+
+# Correlación de alertas en incidentes por vehículo y componente (tiempo de evento)
+INCIDENTS = {
+    "enabled": True,
+    "window_seconds": 300,           # sin señales nuevas durante este tiempo = resuelto
+    "update_interval_seconds": 300,  # publicación mínima entre actualizaciones sin escalado
+    "max_children": 50,              # señales hijas guardadas por incidente
+    "history_size": 100,             # incidentes resueltos en memoria
+}
+
 # Niveles de alerta
 ALERT_LEVELS = {
     "info": 0,
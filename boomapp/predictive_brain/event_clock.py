@@ -0,0 +1,70 @@
+"""
+Reloj de tiempo de evento para el cerebro predictivo.
+El desgaste y las tendencias se calculan con el timestamp de origen de cada
+mensaje, no con la hora de llegada, para que la latencia del broker o una
+reproducción acelerada del historial no alteren los resultados.
+"""
+
+import time
+from typing import Dict, Optional
+
+from .config import EVENT_TIME
+
+
+def resolve_event_time(payload: Dict, timestamp: Optional[float] = None) -> float:
+    """
+    Determina el tiempo de evento de un mensaje.
+    Prioridad: timestamp explícito > campo "timestamp" del payload > hora actual.
+    Acepta segundos o milisegundos epoch.
+    """
+    if timestamp is None:
+        timestamp = payload.get("timestamp")
+    if timestamp is None:
+        return time.time()
+
+    timestamp = float(timestamp)
+    if timestamp > 1e12:  # milisegundos
+        timestamp /= 1000
+    return timestamp
+
+
+class EventClock:
+    """
+    Reloj monotónico guiado por tiempo de evento.
+    La marca de agua es el mayor tiempo de evento aceptado; los eventos que
+    llegan con un retraso mayor que la tolerancia se descartan y los que
+    llegan dentro de ella se aceptan sin hacer retroceder el reloj.
+    """
+
+    def __init__(self, max_out_of_order: float = None):
+        self.max_out_of_order = (EVENT_TIME["max_out_of_order_seconds"]
+                                 if max_out_of_order is None else max_out_of_order)
+        self.watermark: Optional[float] = None
+        self.late_events = 0      # descartados por llegar demasiado tarde
+        self.reordered_events = 0  # aceptados fuera de orden
+
+    def accept(self, event_time: float) -> bool:
+        """Indica si un evento está dentro de la tolerancia de desorden"""
+        if self.watermark is None or event_time >= self.watermark:
+            return True
+        if self.watermark - event_time <= self.max_out_of_order:
+            self.reordered_events += 1
+            return True
+        self.late_events += 1
+        return False
+
+    def elapsed(self, event_time: float) -> float:
+        """Segundos de evento transcurridos desde la marca de agua (nunca negativos)"""
+        if self.watermark is None:
+            return 0.0
+        return max(0.0, event_time - self.watermark)
+
+    def advance(self, event_time: float) -> float:
+        """Avanza la marca de agua y retorna los segundos transcurridos"""
+        delta = self.elapsed(event_time)
+        if self.watermark is None or event_time > self.watermark:
+            self.watermark = event_time
+        return delta
+
+    def is_in_order(self, event_time: float) -> bool:
+        return self.watermark is None or event_time >= self.watermark
@@ -0,0 +1,382 @@
+"""
+Núcleo de desgaste de flota en estructura de arrays (SoA).
+Mantiene el estrés, el desgaste, la salud y los contadores de mantenimiento
+de todos los vehículos y componentes en arrays de NumPy (una fila por
+vehículo) y aplica lotes de filas OBD/sensores con operaciones vectorizadas
+y enmascaradas, en lugar de actualizar un ComponentWear por llamada.
+
+Los resultados coinciden con WearAnalyzer mensaje a mensaje: las filas de un
+lote se aplican en orden de llegada. Como en WearAnalyzer, las filas de
+sensores son filas fusionadas (ver stream_join): su columna "speed" es la del
+OBD alineado y cada flujo mide el tiempo con su propia marca de agua. Si un vehículo aparece varias veces en
+el lote, sus filas se reparten en rondas sucesivas (la ronda k contiene la
+k-ésima fila de cada vehículo) y cada ronda es una única operación vectorizada.
+
+Además calcula un índice de uso por componente (0-100) ponderado con
+WEAR_WEIGHTS: la fracción de mensajes en que se da cada factor de uso,
+multiplicada por su peso.
+
+El estrés de cada fila se calcula con obd_row_stress() y sensor_row_stress(),
+que también usan las proyecciones what-if (what_if.py). Cada vehículo tiene
+el índice de su perfil de umbrales (threshold_profiles) y en cada ronda se
+toman de ThresholdTable los umbrales de cada fila.
+"""
+
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+from .config import WEAR_WEIGHTS, WEAR_USAGE, EVENT_TIME, MAINTENANCE_INTERVALS
+from .wear_models import WearAnalyzer, VehicleWearState
+from .threshold_profiles import ThresholdProfile, ThresholdProfiles, ThresholdRows, DEFAULT_PROFILE
+
+# Umbrales de un perfil (escalares) o de cada fila de un lote (columnas)
+Thresholds = Union[ThresholdProfile, ThresholdRows]
+
+COMPONENTS = ("engine", "brakes", "transmission", "tires", "battery")
+ENGINE, BRAKES, TRANSMISSION, TIRES, BATTERY = range(len(COMPONENTS))
+
+# Normalización del estrés acumulado a porcentaje de desgaste
+WEAR_SCALE = np.array([36000.0, 36000.0, 36000.0, 36000.0, 1000.0])
+
+MAINTENANCE_KEYS = ("oil_change", "brake_inspection", "transmission_service", "tire_rotation", "coolant_check")
+
+OBD, SENSOR = 0, 1
+
+# Factores del índice de uso: (componente, clave de WEAR_WEIGHTS, tipo de mensaje)
+FACTORS = tuple(
+    (component, factor, SENSOR if factor in ("high_vibration_time", "pressure_anomaly_time", "vibration_time") else OBD)
+    for component, weights in WEAR_WEIGHTS.items()
+    for factor in weights
+)
+
+# Valores por defecto equivalentes a los .get() de WearAnalyzer
+DEFAULTS = {
+    "rpm": 0.0, "speed": 0.0, "coolant_temp": 90.0, "throttle": 0.0,
+    "temperature": 25.0, "pressure": 101.0, "vibration": 0.0,
+}
+
+# Contadores por vehículo de VehicleWearState
+COUNTERS = ("high_rpm_seconds", "overheating_seconds", "hard_braking_count",
+            "high_vibration_seconds", "pressure_anomaly_seconds", "total_runtime_hours")
+HIGH_RPM, OVERHEATING, HARD_BRAKING, HIGH_VIBRATION, PRESSURE_ANOMALY, RUNTIME = range(len(COUNTERS))
+
+# Caída de velocidad entre OBD consecutivos que cuenta como frenado brusco (km/h)
+HARD_BRAKING_DROP = 20
+
+# Estrés de frenos por frenado brusco acumulado, sumado en cada fila de sensores
+BRAKING_STRESS = 0.1
+
+
+def obd_row_stress(rpm: np.ndarray, speed: np.ndarray, coolant: np.ndarray,
+                   throttle: np.ndarray, t: Thresholds = DEFAULT_PROFILE) -> Dict[str, np.ndarray]:
+    """
+    Estrés por segundo de motor y transmisión de filas OBD y sus factores de
+    uso por umbral (mismas fórmulas que WearAnalyzer).
+    """
+    high_rpm = rpm > t.rpm_max
+    overheating = coolant > t.coolant_temp_warning
+    engine = (0.5 * high_rpm + 0.5 * (rpm > t.rpm_critical)
+              + 0.3 * overheating + 0.7 * (coolant > t.coolant_temp_critical)
+              + 0.2 * (throttle > 80))
+    moving = speed > 0
+    gear_stress = moving & (rpm / np.where(moving, speed, 1.0) > t.rpm_speed_ratio_warning)
+    high_load = (throttle > 70) & (rpm > 4000)
+    return {
+        "engine": engine,
+        "transmission": 0.5 * gear_stress + 0.3 * high_load,
+        "high_rpm": high_rpm,
+        "overheating": overheating,
+        "gear_stress": gear_stress,
+        "high_load": high_load,
+    }
+
+
+def sensor_row_stress(temperature: np.ndarray, pressure: np.ndarray, vibration: np.ndarray,
+                      speed: np.ndarray, t: Thresholds = DEFAULT_PROFILE) -> Dict[str, np.ndarray]:
+    """
+    Estrés de frenos y neumáticos por segundo, estrés de batería por fila y
+    factores de uso de filas de sensores fusionadas (speed = la del OBD
+    alineado). El estrés por frenado brusco acumulado se suma aparte.
+    """
+    high_vibration = vibration > t.brake_vibration_warning
+    pressure_anomaly = (pressure < t.tire_pressure_min) | (pressure > t.tire_pressure_max)
+    tire_vibration = vibration > t.tire_vibration_warning
+    extreme = (temperature < t.battery_temp_min) | (temperature > t.battery_temp_max)
+    return {
+        "brakes": 0.4 * high_vibration + 0.6 * (vibration > t.brake_vibration_critical),
+        "tires": 0.4 * pressure_anomaly + 0.3 * tire_vibration + 0.3 * (speed > 120),
+        "battery": 0.1 * extreme,
+        "high_vibration": high_vibration,
+        "pressure_anomaly": pressure_anomaly,
+        "tire_vibration": tire_vibration,
+    }
+
+
+class FleetWearKernel:
+    """Desgaste de todos los vehículos de la flota en arrays"""
+
+    def __init__(self, capacity: int = 1024, max_out_of_order: float = None,
+                 threshold_profiles: ThresholdProfiles = None):
+        self.max_out_of_order = (EVENT_TIME["max_out_of_order_seconds"]
+                                 if max_out_of_order is None else max_out_of_order)
+        self.threshold_profiles = threshold_profiles if threshold_profiles is not None else ThresholdProfiles()
+        self.slots: Dict[str, int] = {}
+        self.vehicle_ids: List[str] = []
+        self._allocate(max(1, capacity))
+
+    def _allocate(self, capacity: int) -> None:
+        n = len(self.vehicle_ids)
+        intervals = np.array([MAINTENANCE_INTERVALS[key] for key in MAINTENANCE_KEYS], dtype=np.float64)
+
+        def grow(name: str, shape: tuple, fill: float) -> None:
+            array = np.full(shape, fill, dtype=np.float64)
+            old = getattr(self, name, None)
+            if old is not None:
+                array[:n] = old[:n]
+            setattr(self, name, array)
+
+        grow("stress", (capacity, len(COMPONENTS)), 0.0)
+        grow("wear", (capacity, len(COMPONENTS)), 0.0)
+        grow("health", (capacity, len(COMPONENTS)), 100.0)
+        grow("maintenance", (capacity, len(COMPONENTS)), 0.0)
+        self.maintenance[n:] = intervals
+        grow("counters", (capacity, len(COUNTERS)), 0.0)
+        grow("usage_counts", (capacity, len(FACTORS)), 0.0)
+        grow("messages", (capacity, 2), 0.0)          # OBD, sensores aplicados
+        grow("watermark", (capacity,), np.nan)        # nan = sin OBD todavía
+        grow("sensor_watermark", (capacity,), np.nan) # nan = sin sensores todavía
+        grow("start_time", (capacity,), np.nan)
+        grow("last_speed", (capacity,), np.nan)       # nan = sin OBD previo
+        grow("last_rpm", (capacity,), np.nan)
+        # Fila de ThresholdTable con los umbrales de cada vehículo
+        profile_index = np.zeros(capacity, dtype=np.intp)
+        if n:
+            profile_index[:n] = self.profile_index[:n]
+        self.profile_index = profile_index
+        self.capacity = capacity
+
+    def slot(self, vehicle_id: str) -> int:
+        """Fila del vehículo (se crea si no existe)"""
+        slot = self.slots.get(vehicle_id)
+        if slot is None:
+            slot = len(self.vehicle_ids)
+            if slot >= self.capacity:
+                self._allocate(self.capacity * 2)
+            self.slots[vehicle_id] = slot
+            self.vehicle_ids.append(vehicle_id)
+            self.profile_index[slot] = self.threshold_profiles.index_for_vehicle(vehicle_id)
+        return slot
+
+    def set_threshold_profile(self, vehicle_id: str, profile_name: str) -> None:
+        """Asigna un perfil de umbrales al vehículo (afecta a las filas siguientes)"""
+        self.threshold_profiles.assign(vehicle_id, profile_name)
+        self.profile_index[self.slot(vehicle_id)] = self.threshold_profiles.indices[profile_name]
+
+    # Aplicación de lotes
+    def apply_batch(self, vehicle_ids: Sequence[str], kinds: Sequence[int], timestamps: Sequence[float],
+                    columns: Dict[str, Sequence[float]]) -> np.ndarray:
+        """
+        Aplica un lote de filas en orden de llegada. `kinds` es OBD (0) o
+        SENSOR (1) por fila y `columns` trae una columna por métrica (nan =
+        ausente en el mensaje; en filas de sensores "speed" es la del OBD
+        emparejado). Retorna la máscara de filas aceptadas.
+        """
+        slots = np.fromiter((self.slot(v) for v in vehicle_ids), dtype=np.intp, count=len(vehicle_ids))
+        kinds = np.asarray(kinds, dtype=np.int8)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        n = len(slots)
+        values = {}
+        for name, default in DEFAULTS.items():
+            column = np.asarray(columns[name], dtype=np.float64) if name in columns else np.full(n, default)
+            values[name] = np.where(np.isnan(column), default, column)
+
+        # Ronda de cada fila: cuántas filas anteriores del mismo vehículo hay en el lote
+        order = np.argsort(slots, kind="stable")
+        sorted_slots = slots[order]
+        starts = np.flatnonzero(np.r_[True, sorted_slots[1:] != sorted_slots[:-1]])
+        group_start = np.repeat(starts, np.diff(np.r_[starts, n]))
+        rounds = np.empty(n, dtype=np.intp)
+        rounds[order] = np.arange(n) - group_start
+
+        accepted = np.zeros(n, dtype=bool)
+        for r in range(int(rounds.max()) + 1 if n else 0):
+            rows = np.flatnonzero(rounds == r)
+            accepted[rows] = self._apply_round(
+                slots[rows], kinds[rows], timestamps[rows], {k: v[rows] for k, v in values.items()}
+            )
+        return accepted
+
+    def _apply_round(self, slots: np.ndarray, kinds: np.ndarray, ts: np.ndarray,
+                     v: Dict[str, np.ndarray]) -> np.ndarray:
+        """Una fila como mucho por vehículo: todo vectorizado y enmascarado"""
+        # Cada flujo se compara con su propia marca de agua
+        watermark = np.where(kinds == OBD, self.watermark[slots], self.sensor_watermark[slots])
+        no_clock = np.isnan(watermark)
+        accept = no_clock | (ts >= watermark) | (watermark - ts <= self.max_out_of_order)
+        delta = np.where(no_clock, 0.0, np.maximum(0.0, ts - np.where(no_clock, 0.0, watermark)))
+
+        obd = accept & (kinds == OBD)
+        sensor = accept & (kinds == SENSOR)
+        if obd.any():
+            self._apply_obd(slots[obd], ts[obd], delta[obd], {k: x[obd] for k, x in v.items()})
+        if sensor.any():
+            self._apply_sensor(slots[sensor], ts[sensor], delta[sensor], {k: x[sensor] for k, x in v.items()})
+        return accept
+
+    def _apply_obd(self, slots: np.ndarray, ts: np.ndarray, delta: np.ndarray, v: Dict[str, np.ndarray]) -> None:
+        rpm, speed, coolant, throttle = v["rpm"], v["speed"], v["coolant_temp"], v["throttle"]
+        counters = self.counters
+
+        first = np.isnan(self.start_time[slots])
+        self.start_time[slots[first]] = ts[first]
+        counters[slots, RUNTIME] += delta / 3600
+
+        # Motor y transmisión, con los umbrales del perfil de cada fila
+        t = self.threshold_profiles.table.gather(self.profile_index[slots])
+        row = obd_row_stress(rpm, speed, coolant, throttle, t)
+        high_rpm, overheating = row["high_rpm"], row["overheating"]
+        gear_stress, high_load = row["gear_stress"], row["high_load"]
+        counters[slots, HIGH_RPM] += delta * high_rpm
+        counters[slots, OVERHEATING] += delta * overheating
+        self.stress[slots, ENGINE] += row["engine"] * delta
+        self.stress[slots, TRANSMISSION] += row["transmission"] * delta
+
+        # Frenado brusco respecto al OBD anterior (solo filas en orden, como
+        # WearAnalyzer: una atrasada no se compara con el OBD más reciente)
+        watermark = self.watermark[slots]
+        in_order = np.isnan(watermark) | (ts >= watermark)
+        previous = self.last_speed[slots]
+        has_previous = in_order & ~np.isnan(previous)
+        previous = np.where(has_previous, previous, 0.0)
+        hard_braking = has_previous & (previous - speed > HARD_BRAKING_DROP)
+        counters[slots, HARD_BRAKING] += hard_braking
+
+        self.maintenance[slots] = np.maximum(0.0, self.maintenance[slots] - (delta / 3600)[:, None])
+        self._refresh(slots, (ENGINE, TRANSMISSION))
+
+        # Índice de uso
+        last_rpm = self.last_rpm[slots]
+        factors = {
+            "high_rpm_time": high_rpm,
+            "overheating_time": overheating,
+            "cold_starts": (rpm > 0) & (coolant < WEAR_USAGE["cold_coolant_temp"]),
+            "hard_braking_count": hard_braking,
+            "high_speed_braking": hard_braking & (previous > WEAR_USAGE["high_speed_braking_kmh"]),
+            "gear_stress": gear_stress,
+            "rpm_fluctuation": has_previous & (np.abs(rpm - np.where(has_previous, last_rpm, 0.0))
+                                               > WEAR_USAGE["rpm_fluctuation"]),
+            "high_load_time": high_load,
+            "high_speed_time": speed > 120,
+        }
+        self._count_usage(slots, OBD, factors)
+
+        self.watermark[slots] = np.where(np.isnan(watermark), ts, np.fmax(watermark, ts))
+        self.last_speed[slots] = np.where(in_order, speed, self.last_speed[slots])
+        self.last_rpm[slots] = np.where(in_order, rpm, self.last_rpm[slots])
+
+    def _apply_sensor(self, slots: np.ndarray, ts: np.ndarray, delta: np.ndarray, v: Dict[str, np.ndarray]) -> None:
+        counters = self.counters
+        t = self.threshold_profiles.table.gather(self.profile_index[slots])
+        row = sensor_row_stress(v["temperature"], v["pressure"], v["vibration"], v["speed"], t)
+        high_vibration, pressure_anomaly, tire_vibration = (
+            row["high_vibration"], row["pressure_anomaly"], row["tire_vibration"])
+
+        # Frenos: vibración y frenados bruscos acumulados
+        counters[slots, HIGH_VIBRATION] += delta * high_vibration
+        self.stress[slots, BRAKES] += row["brakes"] * delta + counters[slots, HARD_BRAKING] * BRAKING_STRESS
+
+        # Neumáticos: presión, vibración y velocidad del OBD alineado
+        counters[slots, PRESSURE_ANOMALY] += delta * pressure_anomaly
+        self.stress[slots, TIRES] += row["tires"] * delta
+
+        # Batería: temperatura ambiente extrema
+        self.stress[slots, BATTERY] += row["battery"]
+
+        self._refresh(slots, (BRAKES, TIRES, BATTERY))
+        self._count_usage(slots, SENSOR, {
+            "high_vibration_time": high_vibration,
+            "pressure_anomaly_time": pressure_anomaly,
+            "vibration_time": tire_vibration,
+        })
+        watermark = self.sensor_watermark[slots]
+        self.sensor_watermark[slots] = np.where(np.isnan(watermark), ts, np.fmax(watermark, ts))
+
+    def _refresh(self, slots: np.ndarray, components: tuple) -> None:
+        """Desgaste y salud a partir del estrés acumulado"""
+        columns = list(components)
+        wear = np.minimum(100.0, self.stress[np.ix_(slots, columns)] / WEAR_SCALE[columns])
+        self.wear[np.ix_(slots, columns)] = wear
+        self.health[np.ix_(slots, columns)] = np.maximum(0.0, 100.0 - wear)
+
+    def _count_usage(self, slots: np.ndarray, kind: int, factors: Dict[str, np.ndarray]) -> None:
+        self.messages[slots, kind] += 1
+        for index, (_, factor, factor_kind) in enumerate(FACTORS):
+            if factor_kind == kind and factor in factors:
+                self.usage_counts[slots, index] += factors[factor]
+
+    # Lectura
+    def usage_index(self) -> np.ndarray:
+        """
+        Índice de uso (0-100) de los componentes con pesos en WEAR_WEIGHTS,
+        (vehículos, componentes de WEAR_WEIGHTS): suma ponderada de la
+        fracción de mensajes en que se dio cada factor.
+        """
+        n = len(self.vehicle_ids)
+        kinds = np.array([kind for _, _, kind in FACTORS])
+        weights = np.array([WEAR_WEIGHTS[component][factor] for component, factor, _ in FACTORS])
+        messages = self.messages[:n, kinds]
+        fractions = np.divide(self.usage_counts[:n], messages, out=np.zeros_like(messages), where=messages > 0)
+        weighted = fractions * weights
+        result = np.zeros((n, len(WEAR_WEIGHTS)))
+        for column, component in enumerate(WEAR_WEIGHTS):
+            mask = [c == component for c, _, _ in FACTORS]
+            result[:, column] = weighted[:, mask].sum(axis=1) * 100
+        return result
+
+    def get_usage_index(self, vehicle_id: str) -> Dict[str, float]:
+        row = self.usage_index()[self.slots[vehicle_id]]
+        return {component: round(float(value), 2) for component, value in zip(WEAR_WEIGHTS, row)}
+
+    def wear_state(self, vehicle_id: str) -> VehicleWearState:
+        """Estado de un vehículo como VehicleWearState (mismo formato que WearAnalyzer)"""
+        slot = self.slots[vehicle_id]
+        state = VehicleWearState()
+        for index, name in enumerate(COMPONENTS):
+            component = getattr(state, name)
+            component.accumulated_stress = float(self.stress[slot, index])
+            component.wear_percentage = float(self.wear[slot, index])
+            component.health_score = float(self.health[slot, index])
+            component.hours_until_maintenance = float(self.maintenance[slot, index])
+        for index, name in enumerate(COUNTERS):
+            value = float(self.counters[slot, index])
+            setattr(state, name, int(value) if name == "hard_braking_count" else value)
+        if not np.isnan(self.start_time[slot]):
+            state.start_time = float(self.start_time[slot])
+        return state
+
+    def load_analyzer(self, vehicle_id: str, analyzer: WearAnalyzer) -> None:
+        """Carga en la fila del vehículo el estado de un WearAnalyzer escalar"""
+        slot = self.slot(vehicle_id)
+        state = analyzer.state
+        for index, name in enumerate(COMPONENTS):
+            component = getattr(state, name)
+            self.stress[slot, index] = component.accumulated_stress
+            self.wear[slot, index] = component.wear_percentage
+            self.health[slot, index] = component.health_score
+            self.maintenance[slot, index] = component.hours_until_maintenance
+        for index, name in enumerate(COUNTERS):
+            self.counters[slot, index] = getattr(state, name)
+        watermark = analyzer.clock.watermark
+        self.watermark[slot] = np.nan if watermark is None else watermark
+        sensor_watermark = analyzer.sensor_clock.watermark
+        self.sensor_watermark[slot] = np.nan if sensor_watermark is None else sensor_watermark
+        self.start_time[slot] = state.start_time if analyzer.last_update is not None else np.nan
+        self.last_speed[slot] = analyzer.last_obd_data.get("speed", 0) if analyzer.last_obd_data else np.nan
+        self.last_rpm[slot] = analyzer.last_obd_data.get("rpm", 0) if analyzer.last_obd_data else np.nan
+
+    def __len__(self) -> int:
+        return len(self.vehicle_ids)
+
+    def __contains__(self, vehicle_id: str) -> bool:
+        return vehicle_id in self.slots
@@ -10,7 +10,31 @@ from typing import Dict, List, Optional, Tuple
 from enum import Enum
 import statistics
 
-from .config import THRESHOLDS, MAINTENANCE_INTERVALS
+import numpy as np
+
+from .config import (MAINTENANCE_INTERVALS, COMPONENT_METRICS, ROLLUPS, RUL, ANOMALY, VIBRATION,
+                     HYSTERESIS)
+from .anomaly import StreamingAnomalyDetector
+from .hysteresis import SignalBank
+from .threshold_profiles import ThresholdProfile, DEFAULT_PROFILE
+from .vibration import VibrationAnalyzer
+from .event_clock import EventClock, resolve_event_time
+from .rollups import RollupSeries
+from .rul import DegradationFit, MonteCarloRUL, RULEstimate, fit_degradation
+
+# Ventanas (en muestras) del almacén de características por ciclo
+FEATURE_WINDOWS = (50, 100)
+TREND_WINDOW = 50
+
+# Contador de episodios que incrementa la subida de cada señal con histéresis
+SIGNAL_COUNTERS = {
+    "rpm_high": "high_rpm_events",
+    "coolant_high": "overheating_events",
+    "high_throttle": "high_throttle_events",
+    "vibration_high": "high_vibration_events",
+    "pressure_low": "pressure_anomaly_events",
+    "pressure_high": "pressure_anomaly_events",
+}
 
 
 class RiskLevel(Enum):
@@ -70,9 +94,11 @@ class ComponentForecast:
     trend: TrendDirection
     risk_factors: List[str]
     predictions: List[FuturePrediction]
+    long_term_trend_per_hour: Optional[float] = None  # de los agregados por hora/día
+    remaining_life_interval: Optional[RULEstimate] = None  # P10/P50/P90 por Monte Carlo
     
     def to_dict(self) -> dict:
-        return {
+        result = {
             "name": self.name,
             "current_health": round(self.current_health, 1),
             "forecast": {
@@ -85,19 +111,45 @@ class ComponentForecast:
             "risk_factors": self.risk_factors,
             "predictions": [p.to_dict() for p in self.predictions]
         }
+        if self.long_term_trend_per_hour is not None:
+            result["long_term_trend_per_hour"] = round(self.long_term_trend_per_hour, 4)
+        if self.remaining_life_interval is not None:
+            result["remaining_life_interval"] = self.remaining_life_interval.to_dict()
+        return result
 
 
 class DataBuffer:
-    """Buffer circular para almacenar historial de datos"""
+    """
+    Buffer circular para almacenar historial de datos.
+    Además de las muestras crudas mantiene agregados por niveles (1 min, 1 h,
+    1 día) que conservan la tendencia cuando las muestras ya salieron del buffer.
+    """
     
-    def __init__(self, max_size: int = 1000):
+    def __init__(self, max_size: int = 1000, rollup_tiers: Optional[List[Tuple[str, float, int]]] = None):
         self.max_size = max_size
         self.data: deque = deque(maxlen=max_size)
         self.timestamps: deque = deque(maxlen=max_size)
+        self.rollups = RollupSeries(rollup_tiers)
     
     def add(self, value: float, timestamp: float = None):
-        self.data.append(value)
-        self.timestamps.append(timestamp or time.time())
+        if timestamp is None:
+            timestamp = time.time()
+        self.rollups.add(value, timestamp)
+        
+        if not self.timestamps or timestamp >= self.timestamps[-1]:
+            self.data.append(value)
+            self.timestamps.append(timestamp)
+            return
+        
+        # Muestra desordenada: insertar en su posición temporal (suele estar al final)
+        if len(self.data) == self.max_size:
+            self.data.popleft()
+            self.timestamps.popleft()
+        index = len(self.timestamps)
+        while index > 0 and self.timestamps[index - 1] > timestamp:
+            index -= 1
+        self.data.insert(index, value)
+        self.timestamps.insert(index, timestamp)
     
     def get_recent(self, count: int) -> List[float]:
         return list(self.data)[-count:]
@@ -108,14 +160,17 @@ class DataBuffer:
     
     def get_trend_slope(self, count: int = 50) -> Optional[float]:
         """Calcula la pendiente de la tendencia (positivo = aumentando)"""
-        data = list(self.data)[-count:]
+        return self._linear_slope(list(self.data)[-count:])
+    
+    @staticmethod
+    def _linear_slope(data: List[float]) -> Optional[float]:
+        """Pendiente por regresión lineal simple sobre el índice de muestra"""
         if len(data) < 10:
             return None
         
-        # Regresión lineal simple
         n = len(data)
         x_mean = (n - 1) / 2
-        y_mean = statistics.mean(data)
+        y_mean = sum(data) / n
         
         numerator = sum((i - x_mean) * (data[i] - y_mean) for i in range(n))
         denominator = sum((i - x_mean) ** 2 for i in range(n))
@@ -130,16 +185,65 @@ class DataBuffer:
         if len(self.data) < 2:
             return None
         
-        data = list(self.data)
-        timestamps = list(self.timestamps)
-        
-        time_diff = timestamps[-1] - timestamps[0]
+        time_diff = self.timestamps[-1] - self.timestamps[0]
         if time_diff == 0:
             return 0
         
-        value_diff = data[-1] - data[0]
+        value_diff = self.data[-1] - self.data[0]
         return value_diff / time_diff
     
+    def compute_features(self, windows: Tuple[int, ...] = FEATURE_WINDOWS,
+                         trend_window: int = TREND_WINDOW) -> Dict[str, Optional[float]]:
+        """
+        Calcula todas las características de ventana del buffer en una sola pasada.
+        Claves: count, avg_<ventana>, slope y rate.
+        """
+        data = list(self.data)
+        features: Dict[str, Optional[float]] = {"count": len(data)}
+        
+        for window in windows:
+            recent = data[-window:]
+            features[f"avg_{window}"] = sum(recent) / len(recent) if recent else None
+        
+        features["slope"] = self._linear_slope(data[-trend_window:])
+        features["rate"] = self.get_rate_of_change()
+        return features
+    
+    def get_long_term_slope(self) -> Optional[float]:
+        """Pendiente por hora sobre los agregados (días de historial)"""
+        return self.rollups.trend_per_hour()
+    
+    def get_degradation_fit(self) -> Optional[DegradationFit]:
+        """
+        Recta de valor frente al tiempo (horas) para la vida útil restante:
+        sobre las medias de los agregados si hay suficientes cubos, si no sobre
+        las muestras crudas.
+        """
+        for name in ROLLUPS["trend_tiers"]:
+            tier = self.rollups.tier(name)
+            if tier is None:
+                continue
+            centers, means = tier.means()
+            if len(means) >= ROLLUPS["trend_min_buckets"]:
+                return fit_degradation(centers / 3600, means, ROLLUPS["trend_min_buckets"])
+        return fit_degradation(np.asarray(self.timestamps) / 3600, self.data)
+    
+    def load(self, values: List[float], timestamps: List[float],
+             rollups: Dict[float, np.ndarray] = None) -> None:
+        """
+        Reemplaza el contenido del buffer (p. ej. al restaurar un checkpoint).
+        `rollups` son los agregados guardados por resolución en segundos; los
+        niveles que falten se reconstruyen con las muestras cargadas.
+        """
+        self.data = deque(values, maxlen=self.max_size)
+        self.timestamps = deque(timestamps, maxlen=self.max_size)
+        rollups = rollups or {}
+        for tier in self.rollups.tiers:
+            if tier.resolution in rollups:
+                tier.load_array(rollups[tier.resolution])
+            else:
+                tier.load_samples(values, timestamps)
+    
     def __len__(self):
         return len(self.data)
 
@@ -148,9 +252,15 @@ class FuturePredictor:
     """
     Motor de predicción de problemas futuros.
     Analiza tendencias históricas para pronosticar fallos.
+    El tiempo de ejecución y las tasas se miden en tiempo de evento.
+    Los contadores *_events cuentan episodios de las señales con histéresis
+    (SignalBank, compartido o propio); *_samples cuenta muestras.
+    Los umbrales son los del perfil compilado del vehículo (threshold_profiles).
     """
     
-    def __init__(self, history_size: int = 1000):
+    def __init__(self, history_size: int = 1000, max_out_of_order: float = None,
+                 signals: Optional[SignalBank] = None, thresholds: Optional[ThresholdProfile] = None):
+        self.thresholds = thresholds or DEFAULT_PROFILE
         # Buffers de historial para cada métrica
         self.history = {
             # OBD
@@ -174,8 +284,17 @@ class FuturePredictor:
             "hard_braking_events": 0,
             "pressure_anomaly_events": 0,
             "high_throttle_events": 0,
+            # Muestras por encima del umbral (para fracciones de tiempo)
+            "high_rpm_samples": 0,
+            "high_throttle_samples": 0,
         }
         
+        # Señales con histéresis: compartidas (las actualiza el dueño) o propias
+        self._owns_signals = signals is None
+        if signals is None and HYSTERESIS["enabled"]:
+            signals = SignalBank(self.thresholds.signal_specs)
+        self.signals = signals
+        
         # Historial de salud por componente
         self.health_history = {
             "engine": DataBuffer(500),
@@ -185,16 +304,63 @@ class FuturePredictor:
             "battery": DataBuffer(500),
         }
         
-        self.start_time = time.time()
+        self.clock = EventClock(max_out_of_order)
+        self.start_time: Optional[float] = None  # primer tiempo de evento
         self.last_speed = 0
-    
-    def record_obd_data(self, obd_data: Dict) -> None:
-        """Registra datos OBD en el historial"""
-        timestamp = time.time()
         
+        # Almacén de características: se recalcula una vez por ciclo de datos
+        self._data_version = 0
+        self._features: Dict[str, Dict[str, Optional[float]]] = {}
+        self._features_version = -1
+        self._predictions: Dict[str, List[FuturePrediction]] = {}
+        self._predictions_version = -1
+        
+        # Métricas con datos nuevos desde el último pronóstico
+        self.dirty_metrics = set()
+        
+        # Estimador de vida útil restante (se crea con el primer pronóstico)
+        self._rul: Optional[MonteCarloRUL] = None
+        
+        # Detector de anomalías EWMA/CUSUM sobre todas las métricas del historial
+        self.anomaly_detector = StreamingAnomalyDetector(list(self.history)) if ANOMALY["enabled"] else None
+        self.anomaly_components = set()  # componentes con cambios de anomalía sin pronosticar
+        
+        # Espectros de ventanas crudas de vibración (frenos y neumáticos)
+        self.vibration = VibrationAnalyzer()
+
+    def set_thresholds(self, thresholds: ThresholdProfile, signals: Optional[SignalBank] = None) -> None:
+        """Cambia el perfil de umbrales; un banco de señales propio se reconstruye conservando su estado"""
+        self.thresholds = thresholds
+        if signals is None and self._owns_signals and self.signals is not None:
+            signals = SignalBank(thresholds.signal_specs)
+            signals.restore_checkpoint_state(self.signals.get_checkpoint_state())
+        self.signals = signals
+
+    def record_obd_data(self, obd_data: Dict, timestamp: float = None) -> bool:
+        """
+        Registra datos OBD en el historial.
+        Retorna False si el mensaje llegó fuera de la tolerancia de desorden.
+        """
+        timestamp = resolve_event_time(obd_data, timestamp)
+        if not self.clock.accept(timestamp):
+            return False
+        in_order = self._advance_clock(timestamp)
+        self._data_version += 1
+        
+        values = {}
         for key in ["rpm", "speed", "coolant_temp", "throttle", "fuel_level"]:
             if key in obd_data:
                 self.history[key].add(obd_data[key], timestamp)
+                self.dirty_metrics.add(key)
+                values[key] = obd_data[key]
+        self._detect_anomalies(values, timestamp)
+        if self._owns_signals and self.signals is not None:
+            self.signals.update("obd", obd_data, timestamp)
+        
+        # Los mensajes desordenados se guardan en el historial pero no
+        # cuentan como eventos para no duplicar transiciones
+        if not in_order:
+            return True
         
         # Detectar eventos críticos
         rpm = obd_data.get("rpm", 0)
@@ -202,44 +368,216 @@ class FuturePredictor:
         throttle = obd_data.get("throttle", 0)
         speed = obd_data.get("speed", 0)
         
-        if rpm > THRESHOLDS["engine"]["rpm_max"]:
-            self.event_counters["high_rpm_events"] += 1
+        # Sin histéresis cada muestra por encima del umbral cuenta como evento
+        per_sample = self.signals is None
+        if rpm > self.thresholds.rpm_max:
+            self.event_counters["high_rpm_samples"] += 1
+            if per_sample:
+                self.event_counters["high_rpm_events"] += 1
         
-        if coolant_temp > THRESHOLDS["engine"]["coolant_temp_warning"]:
+        if per_sample and coolant_temp > self.thresholds.coolant_temp_warning:
             self.event_counters["overheating_events"] += 1
         
         if throttle > 85:
-            self.event_counters["high_throttle_events"] += 1
+            self.event_counters["high_throttle_samples"] += 1
+            if per_sample:
+                self.event_counters["high_throttle_events"] += 1
+        
+        if not per_sample:
+            self._count_episodes()
         
         # Detectar frenado brusco
         if self.last_speed - speed > 15:
             self.event_counters["hard_braking_events"] += 1
         
         self.last_speed = speed
+        return True
     
-    def record_sensor_data(self, sensor_data: Dict) -> None:
-        """Registra datos de sensores en el historial"""
-        timestamp = time.time()
+    def record_sensor_data(self, sensor_data: Dict, timestamp: float = None) -> bool:
+        """
+        Registra datos de sensores en el historial.
+        Retorna False si el mensaje llegó fuera de la tolerancia de desorden.
+        """
+        timestamp = resolve_event_time(sensor_data, timestamp)
+        if not self.clock.accept(timestamp):
+            return False
+        in_order = self._advance_clock(timestamp)
+        self._data_version += 1
         
+        values = {}
         for key in ["temperature", "pressure", "vibration", "humidity"]:
             if key in sensor_data:
                 self.history[key].add(sensor_data[key], timestamp)
+                self.dirty_metrics.add(key)
+                values[key] = sensor_data[key]
+        self._detect_anomalies(values, timestamp)
+        if self._owns_signals and self.signals is not None:
+            self.signals.update("sensors", sensor_data, timestamp)
+        
+        samples = sensor_data.get("vibration_samples")
+        if samples is not None:
+            # Velocidad del OBD alineado con la ventana (fila fusionada, ver stream_join)
+            self.vibration.add_window(samples, timestamp, sensor_data.get("vibration_sample_rate"),
+                                      speed=sensor_data.get("speed", 0.0), braking=self._is_braking())
+            self.dirty_metrics.add("vibration")
+        
+        if not in_order:
+            return True
         
         # Detectar eventos críticos
+        if self.signals is not None:
+            self._count_episodes()
+            return True
+        
         vibration = sensor_data.get("vibration", 0)
         pressure = sensor_data.get("pressure", 101)
         
-        if vibration > THRESHOLDS["brakes"]["vibration_warning"]:
+        t = self.thresholds
+        if vibration > t.brake_vibration_warning:
             self.event_counters["high_vibration_events"] += 1
         
-        tire_thresh = THRESHOLDS["tires"]
-        if pressure < tire_thresh["pressure_min"] or pressure > tire_thresh["pressure_max"]:
+        if pressure < t.tire_pressure_min or pressure > t.tire_pressure_max:
             self.event_counters["pressure_anomaly_events"] += 1
+        return True
+    
+    def _count_episodes(self) -> None:
+        """Cuenta los episodios que empezaron en la última actualización de señales"""
+        for name in self.signals.rising:
+            counter = SIGNAL_COUNTERS.get(name)
+            if counter:
+                self.event_counters[counter] += 1
+    
+    def _detect_anomalies(self, values: Dict[str, float], timestamp: float) -> None:
+        """Actualiza el detector con todas las métricas del mensaje en un paso"""
+        if self.anomaly_detector is None or not values:
+            return
+        for metric in self.anomaly_detector.update(values, timestamp):
+            self.anomaly_components.add(ANOMALY["components"].get(metric))
+    
+    def _is_braking(self) -> bool:
+        """Si las dos últimas velocidades registradas indican una frenada"""
+        speed = self.history["speed"]
+        if len(speed) < 2:
+            return False
+        dt = speed.timestamps[-1] - speed.timestamps[-2]
+        if dt <= 0:
+            return False
+        return (speed.data[-2] - speed.data[-1]) / dt >= VIBRATION["braking_decel_kmh_s"]
+    
+    def _advance_clock(self, timestamp: float) -> bool:
+        """Avanza el reloj de evento; retorna si el mensaje llegó en orden"""
+        if self.start_time is None:
+            self.start_time = timestamp
+        in_order = self.clock.is_in_order(timestamp)
+        self.clock.advance(timestamp)
+        return in_order
+    
+    def get_runtime_hours(self) -> float:
+        """Horas de tiempo de evento cubiertas por el historial"""
+        if self.start_time is None:
+            return 0.0
+        return (self.clock.watermark - self.start_time) / 3600
     
     def record_component_health(self, component: str, health: float) -> None:
-        """Registra la salud de un componente"""
+        """Registra la salud de un componente en el tiempo de evento actual"""
         if component in self.health_history:
-            self.health_history[component].add(health, time.time())
+            timestamp = self.clock.watermark if self.clock.watermark is not None else time.time()
+            self.health_history[component].add(health, timestamp)
+    
+    def pop_dirty_components(self) -> set:
+        """Retorna los componentes afectados por datos nuevos y limpia las marcas"""
+        dirty = {
+            component for component, metrics in COMPONENT_METRICS.items()
+            if self.dirty_metrics.intersection(metrics)
+        }
+        dirty.update(self.anomaly_components)
+        self.dirty_metrics.clear()
+        self.anomaly_components.clear()
+        return dirty
+    
+    def refresh_features(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Etapa de almacén de características: calcula todas las medias, pendientes
+        y tasas de cambio del historial una sola vez por ciclo (es decir, mientras
+        no lleguen datos nuevos) y las deja en una tabla compartida por todos
+        los predictores.
+        """
+        if self._features_version != self._data_version:
+            self._features = {
+                key: buffer.compute_features() for key, buffer in self.history.items()
+            }
+            self._features_version = self._data_version
+        return self._features
+    
+    def _feature(self, metric: str, name: str) -> Optional[float]:
+        """Lee una característica del almacén del ciclo actual"""
+        return self.refresh_features()[metric][name]
+    
+    def _component_predictions(self, component: str) -> List[FuturePrediction]:
+        """Predicciones de un componente, calculadas una vez por ciclo"""
+        if self._predictions_version != self._data_version:
+            self._predictions = {}
+            self._predictions_version = self._data_version
+        
+        if component not in self._predictions:
+            predictor = self._component_predictors().get(component)
+            predictions = predictor() if predictor else []
+            predictions.extend(self.predict_anomalies(component))
+            self._predictions[component] = predictions
+        return list(self._predictions[component])
+    
+    def _component_predictors(self) -> Dict:
+        return {
+            "engine": self.predict_engine_issues,
+            "brakes": self.predict_brake_issues,
+            "tires": self.predict_tire_issues,
+            "transmission": self.predict_transmission_issues,
+            "battery": self.predict_battery_issues,
+        }
+    
+    def get_checkpoint_state(self) -> Tuple[Dict, Dict[str, DataBuffer]]:
+        """Escalares y buffers de historial para checkpoints"""
+        scalars = {
+            "event_counters": dict(self.event_counters),
+            "start_time": self.start_time,
+            "watermark": self.clock.watermark,
+            "last_speed": self.last_speed,
+        }
+        if self.anomaly_detector is not None:
+            scalars["anomaly"] = self.anomaly_detector.get_checkpoint_state()
+        if self.vibration.windows_processed or self.vibration.pending:
+            scalars["vibration"] = self.vibration.get_checkpoint_state()
+        if self._owns_signals and self.signals is not None:
+            scalars["signals"] = self.signals.get_checkpoint_state()
+        buffers = {f"history.{key}": buffer for key, buffer in self.history.items()}
+        buffers.update({f"health.{key}": buffer for key, buffer in self.health_history.items()})
+        return scalars, buffers
+    
+    def restore_checkpoint_state(self, scalars: Dict, buffers: Dict[str, Tuple[List[float], List[float]]],
+                                 rollups: Dict[str, Dict[float, np.ndarray]] = None) -> None:
+        """
+        Restaura el estado guardado con get_checkpoint_state.
+        `rollups` (por buffer y resolución) es opcional: sin él los agregados
+        se reconstruyen con las muestras crudas del buffer.
+        """
+        self.event_counters.update(scalars["event_counters"])
+        self.start_time = scalars["start_time"]
+        self.clock.watermark = scalars["watermark"]
+        self.last_speed = scalars["last_speed"]
+        if self.anomaly_detector is not None:
+            self.anomaly_detector.restore_checkpoint_state(scalars.get("anomaly"))
+        self.vibration.restore_checkpoint_state(scalars.get("vibration"))
+        if self._owns_signals and self.signals is not None:
+            self.signals.restore_checkpoint_state(scalars.get("signals"))
+        
+        for name, (values, timestamps) in buffers.items():
+            group, key = name.split(".", 1)
+            target = self.history if group == "history" else self.health_history
+            if key in target:
+                target[key].load(values, timestamps, (rollups or {}).get(name))
+        
+        self._data_version += 1
+        self.dirty_metrics.update(self.history.keys())
     
     def _calculate_trend(self, buffer: DataBuffer) -> TrendDirection:
         """Determina la dirección de la tendencia"""
@@ -279,13 +617,14 @@ class FuturePredictor:
         predictions = []
         
         # Análisis de temperatura del refrigerante
-        coolant_avg = self.history["coolant_temp"].get_average(100)
-        coolant_trend = self.history["coolant_temp"].get_trend_slope()
-        coolant_rate = self.history["coolant_temp"].get_rate_of_change()
+        coolant = self.refresh_features()["coolant_temp"]
+        coolant_avg = coolant["avg_100"]
+        coolant_trend = coolant["slope"]
+        coolant_rate = coolant["rate"]
         
         if coolant_avg and coolant_trend:
-            warning_thresh = THRESHOLDS["engine"]["coolant_temp_warning"]
-            critical_thresh = THRESHOLDS["engine"]["coolant_temp_critical"]
+            warning_thresh = self.thresholds.coolant_temp_warning
+            critical_thresh = self.thresholds.coolant_temp_critical
             
             # Tendencia de sobrecalentamiento
             if coolant_trend > 0.05 and coolant_avg > 85:
@@ -304,7 +643,7 @@ class FuturePredictor:
                     problem_type="overheating",
                     risk_level=risk,
                     estimated_time_to_failure=time_to_warning,
-                    confidence=min(90, 50 + len(self.history["coolant_temp"]) / 10),
+                    confidence=min(90, 50 + coolant["count"] / 10),
                     trend=TrendDirection.DEGRADING if coolant_trend > 0 else TrendDirection.STABLE,
                     description=f"Tendencia de aumento de temperatura del motor detectada. "
                                f"Temperatura promedio: {coolant_avg:.1f}°C, tendencia: +{coolant_trend:.2f}°C/muestra.",
@@ -319,8 +658,8 @@ class FuturePredictor:
                 ))
         
         # Análisis de RPM excesivo
-        rpm_avg = self.history["rpm"].get_average(100)
-        high_rpm_ratio = self.event_counters["high_rpm_events"] / max(1, len(self.history["rpm"]))
+        rpm_avg = self._feature("rpm", "avg_100")
+        high_rpm_ratio = self.event_counters["high_rpm_samples"] / max(1, self._feature("rpm", "count"))
         
         if high_rpm_ratio > 0.1:  # Más del 10% del tiempo en RPM alto
             wear_rate_per_hour = high_rpm_ratio * 2  # Factor de desgaste acelerado
@@ -351,20 +690,20 @@ class FuturePredictor:
         """Predice problemas futuros de frenos"""
         predictions = []
         
-        vibration_avg = self.history["vibration"].get_average(100)
-        vibration_trend = self.history["vibration"].get_trend_slope()
+        vibration = self.refresh_features()["vibration"]
+        vibration_avg = vibration["avg_100"]
+        vibration_trend = vibration["slope"]
         hard_braking_count = self.event_counters["hard_braking_events"]
         
         if vibration_avg:
-            warning_thresh = THRESHOLDS["brakes"]["vibration_warning"]
+            warning_thresh = self.thresholds.brake_vibration_warning
             
             # Vibración en aumento
             if vibration_trend and vibration_trend > 0.02:
                 time_to_warning = None
                 if vibration_avg < warning_thresh:
-                    rate = self.history["vibration"].get_rate_of_change()
                     time_to_warning = self._estimate_time_to_threshold(
-                        vibration_avg, warning_thresh, rate, increasing=True
+                        vibration_avg, warning_thresh, vibration["rate"], increasing=True
                     )
                 
                 risk = RiskLevel.LOW
@@ -378,7 +717,7 @@ class FuturePredictor:
                     problem_type="wear_degradation",
                     risk_level=risk,
                     estimated_time_to_failure=time_to_warning,
-                    confidence=min(80, 45 + len(self.history["vibration"]) / 15),
+                    confidence=min(80, 45 + vibration["count"] / 15),
                     trend=TrendDirection.DEGRADING,
                     description=f"Aumento progresivo de vibración detectado (promedio: {vibration_avg:.2f}). "
                                f"Puede indicar desgaste de pastillas o discos de freno.",
@@ -392,7 +731,7 @@ class FuturePredictor:
                 ))
         
         # Frenados bruscos frecuentes
-        runtime_hours = (time.time() - self.start_time) / 3600
+        runtime_hours = self.get_runtime_hours()
         if runtime_hours > 0.01:  # Al menos algo de tiempo
             braking_rate = hard_braking_count / runtime_hours
             
@@ -414,24 +753,27 @@ class FuturePredictor:
                     }
                 ))
         
+        predictions.extend(self._vibration_predictions("disc_warp"))
+        
         return predictions
     
     def predict_tire_issues(self) -> List[FuturePrediction]:
         """Predice problemas futuros de neumáticos"""
         predictions = []
         
-        pressure_avg = self.history["pressure"].get_average(100)
-        pressure_trend = self.history["pressure"].get_trend_slope()
+        pressure = self.refresh_features()["pressure"]
+        pressure_avg = pressure["avg_100"]
+        pressure_trend = pressure["slope"]
         anomaly_count = self.event_counters["pressure_anomaly_events"]
         
         if pressure_avg:
-            tire_thresh = THRESHOLDS["tires"]
+            pressure_min = self.thresholds.tire_pressure_min
             
             # Presión baja en tendencia
             if pressure_trend and pressure_trend < -0.01:
                 time_to_low = self._estimate_time_to_threshold(
-                    pressure_avg, tire_thresh["pressure_min"], 
-                    self.history["pressure"].get_rate_of_change(), 
+                    pressure_avg, pressure_min, 
+                    pressure["rate"], 
                     increasing=False
                 )
                 
@@ -450,12 +792,12 @@ class FuturePredictor:
                         "current_pressure": pressure_avg,
                         "trend_slope": pressure_trend,
                         "anomaly_events": anomaly_count,
-                        "min_threshold": tire_thresh["pressure_min"]
+                        "min_threshold": pressure_min
                     }
                 ))
         
         # Desgaste por velocidad alta
-        speed_avg = self.history["speed"].get_average(100)
+        speed_avg = self._feature("speed", "avg_100")
         if speed_avg and speed_avg > 100:
             wear_factor = (speed_avg - 80) / 40  # Factor de desgaste por velocidad
             
@@ -476,21 +818,23 @@ class FuturePredictor:
                 }
             ))
         
+        predictions.extend(self._vibration_predictions("wheel_imbalance"))
+        
         return predictions
     
     def predict_transmission_issues(self) -> List[FuturePrediction]:
         """Predice problemas futuros de transmisión"""
         predictions = []
         
-        rpm_avg = self.history["rpm"].get_average(100)
-        speed_avg = self.history["speed"].get_average(100)
-        throttle_avg = self.history["throttle"].get_average(100)
+        rpm_avg = self._feature("rpm", "avg_100")
+        speed_avg = self._feature("speed", "avg_100")
+        throttle_avg = self._feature("throttle", "avg_100")
         
         if rpm_avg and speed_avg and speed_avg > 0:
             # Ratio RPM/velocidad anómalo
             ratio = rpm_avg / speed_avg
             
-            if ratio > THRESHOLDS["transmission"]["rpm_speed_ratio_warning"]:
+            if ratio > self.thresholds.rpm_speed_ratio_warning:
                 predictions.append(FuturePrediction(
                     component="transmission",
                     problem_type="gear_stress",
@@ -511,7 +855,7 @@ class FuturePredictor:
         
         # Uso agresivo del acelerador
         if throttle_avg and throttle_avg > 60:
-            high_throttle_ratio = self.event_counters["high_throttle_events"] / max(1, len(self.history["throttle"]))
+            high_throttle_ratio = self.event_counters["high_throttle_samples"] / max(1, self._feature("throttle", "count"))
             
             if high_throttle_ratio > 0.15:
                 predictions.append(FuturePrediction(
@@ -537,13 +881,13 @@ class FuturePredictor:
         """Predice problemas futuros de batería"""
         predictions = []
         
-        temp_avg = self.history["temperature"].get_average(100)
+        temp_avg = self._feature("temperature", "avg_100")
         
         if temp_avg:
-            battery_thresh = THRESHOLDS["battery"]
+            t = self.thresholds
             
             # Temperatura extrema afecta batería
-            if temp_avg > battery_thresh["temp_max"] - 5:
+            if temp_avg > t.battery_temp_max - 5:
                 degradation_rate = (temp_avg - 35) / 10  # Factor de degradación
                 
                 predictions.append(FuturePrediction(
@@ -563,7 +907,7 @@ class FuturePredictor:
                     }
                 ))
             
-            elif temp_avg < battery_thresh["temp_min"] + 5:
+            elif temp_avg < t.battery_temp_min + 5:
                 predictions.append(FuturePrediction(
                     component="battery",
                     problem_type="cold_performance",
@@ -582,6 +926,90 @@ class FuturePredictor:
         
         return predictions
     
+    def _vibration_predictions(self, signature: str) -> List[FuturePrediction]:
+        """Predicciones por firmas espectrales de vibración"""
+        texts = {
+            "disc_warp": (
+                "brakes",
+                "Vibración concentrada en el orden de giro de la rueda al frenar "
+                "({score:.0f}% de las frenadas analizadas). Patrón típico de discos de freno alabeados.",
+                "Medir el alabeo de los discos y rectificarlos o sustituirlos. "
+                "Revisar el par de apriete de las ruedas.",
+            ),
+            "wheel_imbalance": (
+                "tires",
+                "Vibración concentrada en el orden de giro de la rueda a velocidad de crucero "
+                "({score:.0f}% de las ventanas analizadas). Patrón típico de una rueda desequilibrada.",
+                "Equilibrar las ruedas y revisar deformaciones de llanta o neumático.",
+            ),
+        }
+        component, description, recommendation = texts[signature]
+        
+        predictions = []
+        for found in self.vibration.signatures():
+            if found["signature"] != signature:
+                continue
+            score = found["score"]
+            predictions.append(FuturePrediction(
+                component=component,
+                problem_type=signature,
+                risk_level=RiskLevel.HIGH if score > 0.8 else RiskLevel.MODERATE,
+                estimated_time_to_failure=None,
+                confidence=min(90, 40 + score * 50),
+                trend=TrendDirection.DEGRADING,
+                description=description.format(score=score * 100),
+                recommendation=recommendation,
+                data_points={
+                    "signature_score": round(score, 3),
+                    "windows_analyzed": found["windows"],
+                    "peak_frequency_hz": round(found["peak_frequency_hz"], 2),
+                    "band_growth": {band: round(ratio, 3) for band, ratio in found["band_growth"].items()},
+                }
+            ))
+        return predictions
+    
+    def predict_anomalies(self, component: str = None) -> List[FuturePrediction]:
+        """Predicciones por anomalías vigentes del detector EWMA/CUSUM"""
+        if self.anomaly_detector is None:
+            return []
+        
+        descriptions = {
+            "spike": "Valor anómalo puntual",
+            "drift_up": "Deriva sostenida al alza",
+            "drift_down": "Deriva sostenida a la baja",
+        }
+        predictions = []
+        for anomaly in self.anomaly_detector.active_anomalies():
+            owner = ANOMALY["components"].get(anomaly["metric"])
+            if owner is None or (component is not None and owner != component):
+                continue
+            
+            severity = anomaly["peak_z_score"] / ANOMALY["z_threshold"]
+            risk = RiskLevel.MODERATE
+            if severity > 1.5:
+                risk = RiskLevel.HIGH
+            if severity > 3:
+                risk = RiskLevel.CRITICAL
+            drift = anomaly["kind"] != "spike"
+            
+            predictions.append(FuturePrediction(
+                component=owner,
+                problem_type=f"anomaly_{anomaly['metric']}",
+                risk_level=risk,
+                estimated_time_to_failure=None,
+                confidence=min(95, 50 + severity * 15),
+                trend=TrendDirection.DEGRADING if drift else TrendDirection.STABLE,
+                description=f"{descriptions[anomaly['kind']]} en {anomaly['metric']}: "
+                           f"{anomaly['value']:.1f} frente a una línea base de "
+                           f"{anomaly['baseline_mean']:.1f} ± {anomaly['baseline_std']:.1f} "
+                           f"(z = {anomaly['z_score']:+.1f}).",
+                recommendation="Revisar el componente y el sensor antes de que se alcancen los umbrales. "
+                              "Si la deriva continúa, programar una inspección.",
+                data_points=anomaly,
+                timestamp=anomaly["since"]
+            ))
+        return predictions
+    
     def get_component_forecast(self, component: str, current_health: float) -> ComponentForecast:
         """Genera pronóstico completo para un componente"""
         
@@ -596,51 +1024,63 @@ class FuturePredictor:
         health_slope = health_buffer.get_trend_slope() if health_buffer else 0
         degradation_per_hour = abs(health_slope) * 3600 / max(1, len(health_buffer)) if health_slope else 0.1
         
+        # Con horas o días de agregados, el largo plazo usa su pendiente por hora
+        long_term_slope = health_buffer.get_long_term_slope() if health_buffer else None
+        if long_term_slope is not None:
+            long_term_degradation = max(0.0, -long_term_slope)
+        else:
+            long_term_degradation = degradation_per_hour
+        
         # Predicciones de salud futura
         predicted_1h = max(0, current_health - degradation_per_hour * 1)
-        predicted_24h = max(0, current_health - degradation_per_hour * 24)
-        predicted_7d = max(0, current_health - degradation_per_hour * 168)
+        predicted_24h = max(0, current_health - long_term_degradation * 24)
+        predicted_7d = max(0, current_health - long_term_degradation * 168)
         
-        # Vida útil restante estimada
-        if degradation_per_hour > 0:
-            remaining_life = current_health / degradation_per_hour
+        # Vida útil restante: mediana de Monte Carlo si hay historial suficiente
+        remaining_life_interval = self._estimate_remaining_life(health_buffer, current_health)
+        if remaining_life_interval is not None:
+            remaining_life = remaining_life_interval.p50
+            if remaining_life is None:
+                remaining_life = remaining_life_interval.horizon_hours
+        elif long_term_degradation > 0:
+            remaining_life = current_health / long_term_degradation
         else:
-            remaining_life = 10000  # Muy alta si no hay degradación
+            remaining_life = RUL["horizon_hours"]  # Muy alta si no hay degradación
         
         # Obtener predicciones específicas del componente
         predictions = []
         risk_factors = []
         
         if component == "engine":
-            predictions = self.predict_engine_issues()
+            predictions = self._component_predictions("engine")
             if self.event_counters["high_rpm_events"] > 10:
                 risk_factors.append("Uso frecuente en RPM alto")
             if self.event_counters["overheating_events"] > 5:
                 risk_factors.append("Episodios de sobrecalentamiento")
         
         elif component == "brakes":
-            predictions = self.predict_brake_issues()
+            predictions = self._component_predictions("brakes")
             if self.event_counters["hard_braking_events"] > 20:
                 risk_factors.append("Frenados bruscos frecuentes")
             if self.event_counters["high_vibration_events"] > 10:
                 risk_factors.append("Vibración elevada detectada")
         
         elif component == "tires":
-            predictions = self.predict_tire_issues()
+            predictions = self._component_predictions("tires")
             if self.event_counters["pressure_anomaly_events"] > 10:
                 risk_factors.append("Anomalías de presión")
-            speed_avg = self.history["speed"].get_average(50)
+            speed_avg = self._feature("speed", "avg_50")
             if speed_avg and speed_avg > 110:
                 risk_factors.append("Velocidad media alta")
         
         elif component == "transmission":
-            predictions = self.predict_transmission_issues()
+            predictions = self._component_predictions("transmission")
             if self.event_counters["high_throttle_events"] > 20:
                 risk_factors.append("Conducción agresiva")
         
         elif component == "battery":
-            predictions = self.predict_battery_issues()
-            temp_avg = self.history["temperature"].get_average(50)
+            predictions = self._component_predictions("battery")
+            temp_avg = self._feature("temperature", "avg_50")
             if temp_avg and (temp_avg > 40 or temp_avg < 0):
                 risk_factors.append("Temperatura ambiente extrema")
         
@@ -653,17 +1093,28 @@ class FuturePredictor:
             estimated_remaining_life_hours=remaining_life,
             trend=trend,
             risk_factors=risk_factors,
-            predictions=predictions
+            predictions=predictions,
+            long_term_trend_per_hour=long_term_slope,
+            remaining_life_interval=remaining_life_interval
         )
     
+    def _estimate_remaining_life(self, health_buffer: Optional[DataBuffer],
+                                 current_health: float) -> Optional[RULEstimate]:
+        """P10/P50/P90 de horas hasta el umbral de fallo (None sin datos suficientes)"""
+        if not RUL["enabled"] or health_buffer is None:
+            return None
+        fit = health_buffer.get_degradation_fit()
+        if fit is None:
+            return None
+        if self._rul is None:
+            self._rul = MonteCarloRUL(seed=RUL["seed"])
+        return self._rul.estimate(current_health, fit)
+    
     def get_all_predictions(self) -> List[FuturePrediction]:
         """Obtiene todas las predicciones de todos los componentes"""
         all_predictions = []
-        all_predictions.extend(self.predict_engine_issues())
-        all_predictions.extend(self.predict_brake_issues())
-        all_predictions.extend(self.predict_tire_issues())
-        all_predictions.extend(self.predict_transmission_issues())
-        all_predictions.extend(self.predict_battery_issues())
+        for component in ["engine", "brakes", "tires", "transmission", "battery"]:
+            all_predictions.extend(self._component_predictions(component))
         
         # Ordenar por nivel de riesgo
         risk_order = {RiskLevel.CRITICAL: 0, RiskLevel.HIGH: 1, RiskLevel.MODERATE: 2, RiskLevel.LOW: 3}
@@ -679,9 +1130,9 @@ class FuturePredictor:
         for pred in all_predictions:
             risk_counts[pred.risk_level.value] += 1
         
-        runtime_hours = (time.time() - self.start_time) / 3600
+        runtime_hours = self.get_runtime_hours()
         
-        return {
+        summary = {
             "total_predictions": len(all_predictions),
             "risk_distribution": risk_counts,
             "event_counters": self.event_counters.copy(),
@@ -691,3 +1142,6 @@ class FuturePredictor:
             "runtime_hours": round(runtime_hours, 2),
             "highest_risk_predictions": [p.to_dict() for p in all_predictions[:3]]
         }
+        if self.vibration.windows_processed or self.vibration.pending:
+            summary["vibration"] = self.vibration.get_summary()
+        return summary
@@ -0,0 +1,169 @@
+"""
+Señales de umbral con histéresis y permanencia mínima.
+Una lectura que oscila alrededor de un umbral (p. ej. la temperatura del
+refrigerante en torno a 100 °C) no debe contar como un episodio nuevo en cada
+cruce. Cada señal es una pequeña máquina de estados:
+
+    OFF -> PENDING_ON   la lectura supera el umbral de entrada
+    PENDING_ON -> ON    lo sigue superando `enter_dwell_seconds` (subida = episodio nuevo)
+    ON -> PENDING_OFF   la lectura vuelve por dentro del umbral de salida
+    PENDING_OFF -> OFF  sigue dentro `exit_dwell_seconds` (bajada = fin del episodio)
+
+Si vuelve a salir durante PENDING_ON o PENDING_OFF, el estado retrocede sin
+generar transición. El umbral de salida es el de entrada desplazado
+HYSTERESIS["exit_margin"] de la métrica hacia el lado normal.
+
+Las señales se derivan de las reglas de alerta OBD y de sensores (una señal
+por regla, con su mismo nombre) más las de EXTRA_SIGNALS. Un SignalBank por
+vehículo se actualiza una vez por fila y lo comparten AlertManager (alerta
+solo al empezar o escalar un episodio) y FuturePredictor (cuenta episodios,
+no muestras).
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from .config import HYSTERESIS
+from .alert_rules import DEFAULT_RULES
+
+OFF, PENDING_ON, ON, PENDING_OFF = range(4)
+
+# Señales que no corresponden a una regla de alerta: (nombre, fuente, métrica, operador, umbral)
+EXTRA_SIGNALS = (
+    ("high_throttle", "obd", "throttle", ">", 85),
+)
+
+
+@dataclass(frozen=True)
+class SignalSpec:
+    """Umbrales y permanencias de una señal"""
+    name: str
+    source: str               # "obd" o "sensors"
+    metric: str
+    above: bool               # True: activa por encima del umbral; False: por debajo
+    enter: float
+    exit: float
+    enter_dwell: float = 0.0
+    exit_dwell: float = 0.0
+
+
+def build_signal_specs(rules: Sequence = None, config: Dict = None) -> List[SignalSpec]:
+    """Una señal por regla de alerta OBD/sensores más EXTRA_SIGNALS"""
+    rules = DEFAULT_RULES.rules if rules is None else rules
+    config = config or HYSTERESIS
+    rows = [(r.name, r.source, r.metric, r.op, r.threshold) for r in rules if r.source in ("obd", "sensors")]
+    rows.extend(EXTRA_SIGNALS)
+
+    specs = []
+    for name, source, metric, op, threshold in rows:
+        above = op in (">", ">=")
+        margin = config["exit_margin"].get(metric, 0.0)
+        overrides = config["overrides"].get(name, {})
+        specs.append(SignalSpec(
+            name=name,
+            source=source,
+            metric=metric,
+            above=above,
+            enter=threshold,
+            exit=threshold - margin if above else threshold + margin,
+            enter_dwell=overrides.get("enter_dwell_seconds", config["enter_dwell_seconds"]),
+            exit_dwell=overrides.get("exit_dwell_seconds", config["exit_dwell_seconds"]),
+        ))
+    return specs
+
+
+class SignalBank:
+    """Máquinas de estado de histéresis de todas las señales de un vehículo"""
+
+    def __init__(self, specs: Sequence[SignalSpec] = None):
+        self.specs = list(specs) if specs is not None else build_signal_specs()
+        self.index = {spec.name: i for i, spec in enumerate(self.specs)}
+        self.by_source: Dict[str, List[int]] = {"obd": [], "sensors": []}
+        for i, spec in enumerate(self.specs):
+            self.by_source[spec.source].append(i)
+
+        n = len(self.specs)
+        self.states = [OFF] * n
+        self.since = [0.0] * n          # inicio del estado pendiente
+        self.episodes = [0] * n         # subidas a ON acumuladas
+        self.last_time: Dict[str, Optional[float]] = {"obd": None, "sensors": None}
+        # Transiciones de la última actualización
+        self.rising: List[str] = []
+        self.falling: List[str] = []
+
+    def update(self, source: str, values: Dict, timestamp: float) -> List[str]:
+        """
+        Aplica una lectura de una fuente. Retorna las señales que empiezan
+        episodio. Las lecturas anteriores a la última de la fuente no cambian
+        el estado (un mensaje desordenado no reabre un episodio).
+        """
+        rising, falling = [], []
+        self.rising, self.falling = rising, falling
+        last = self.last_time[source]
+        if last is not None and timestamp < last:
+            return rising
+        self.last_time[source] = timestamp
+
+        states, since = self.states, self.since
+        for i in self.by_source[source]:
+            spec = self.specs[i]
+            x = values.get(spec.metric)
+            if x is None:
+                continue
+            state = states[i]
+            if state == OFF or state == PENDING_ON:
+                if x > spec.enter if spec.above else x < spec.enter:
+                    if state == OFF:
+                        since[i] = timestamp
+                    if timestamp - since[i] >= spec.enter_dwell:
+                        states[i] = ON
+                        self.episodes[i] += 1
+                        rising.append(spec.name)
+                    else:
+                        states[i] = PENDING_ON
+                elif state == PENDING_ON:
+                    states[i] = OFF
+            elif x < spec.exit if spec.above else x > spec.exit:
+                if state == ON:
+                    since[i] = timestamp
+                if timestamp - since[i] >= spec.exit_dwell:
+                    states[i] = OFF
+                    falling.append(spec.name)
+                else:
+                    states[i] = PENDING_OFF
+            elif state == PENDING_OFF:
+                states[i] = ON
+        return rising
+
+    def is_active(self, name: str) -> bool:
+        """Señal en episodio (ON o pendiente de apagarse)"""
+        i = self.index.get(name)
+        return i is not None and self.states[i] >= ON
+
+    def active(self) -> List[str]:
+        return [spec.name for spec, state in zip(self.specs, self.states) if state >= ON]
+
+    def episode_count(self, name: str) -> int:
+        return self.episodes[self.index[name]]
+
+    def get_checkpoint_state(self) -> Dict:
+        return {
+            "signals": [spec.name for spec in self.specs],
+            "states": list(self.states),
+            "since": list(self.since),
+            "episodes": list(self.episodes),
+            "last_time": dict(self.last_time),
+        }
+
+    def restore_checkpoint_state(self, state: Optional[Dict]) -> None:
+        """Restaura por nombre de señal (las que no estén empiezan en OFF)"""
+        if not state:
+            return
+        for j, name in enumerate(state["signals"]):
+            i = self.index.get(name)
+            if i is None:
+                continue
+            self.states[i] = int(state["states"][j])
+            self.since[i] = float(state["since"][j])
+            self.episodes[i] = int(state["episodes"][j])
+        self.last_time.update(state["last_time"])
@@ -0,0 +1,268 @@
+"""
+Correlación de alertas en incidentes.
+Un mismo episodio (p. ej. un sobrecalentamiento) dispara varias alertas: el
+WARNING y el EMERGENCY de las reglas OBD, las de desgaste de
+evaluate_wear_state y las predicciones de riesgo alto del pronóstico. En
+lugar de publicar cada una, se agrupan por vehículo y componente en un
+incidente con señales hijas:
+
+- La primera alerta de un componente abre el incidente y se publica.
+- Una alerta de nivel mayor lo escala y se publica al momento.
+- El resto de alertas y las predicciones de riesgo alto/crítico del mismo
+  componente se añaden como hijas; el incidente actualizado se publica como
+  mucho cada INCIDENTS["update_interval_seconds"] de tiempo de evento.
+- Sin señales nuevas durante INCIDENTS["window_seconds"] el incidente se
+  resuelve y se publica por última vez.
+
+Las predicciones solo se añaden a incidentes abiertos (no abren uno nuevo):
+el pronóstico ya se publica por su cuenta. Los tiempos son de evento, como
+los de AlertManager.
+"""
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Tuple
+
+from .config import ALERT_LEVELS, INCIDENTS
+
+if TYPE_CHECKING:
+    from .alert_manager import Alert
+    from .future_predictor import FuturePrediction
+
+# Nivel de incidente de cada nivel de riesgo de una predicción
+PREDICTION_LEVELS = {"critical": "critical", "high": "warning"}
+
+
+@dataclass
+class Incident:
+    """Alertas y predicciones relacionadas de un componente de un vehículo"""
+    id: str
+    component: str
+    level: str
+    message: str
+    opened_at: float
+    updated_at: float
+    vehicle_id: Optional[str] = None
+    children: List[Dict] = field(default_factory=list)
+    child_count: int = 0                 # hijas totales (children se recorta)
+    resolved_at: Optional[float] = None
+    published_at: Optional[float] = None
+    dirty: bool = False                  # hijas nuevas sin publicar
+
+    @property
+    def open(self) -> bool:
+        return self.resolved_at is None
+
+    def to_dict(self) -> dict:
+        return {
+            "type": "incident",
+            "id": self.id,
+            "vehicle_id": self.vehicle_id,
+            "level": self.level,
+            "component": self.component,
+            "message": self.message,
+            "timestamp": self.updated_at,
+            "opened_at": self.opened_at,
+            "resolved_at": self.resolved_at,
+            "status": "open" if self.open else "resolved",
+            "child_count": self.child_count,
+            "children": list(self.children),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Incident":
+        return cls(
+            id=data["id"],
+            component=data["component"],
+            level=data["level"],
+            message=data["message"],
+            opened_at=data["opened_at"],
+            updated_at=data["timestamp"],
+            vehicle_id=data.get("vehicle_id"),
+            children=list(data.get("children", [])),
+            child_count=data.get("child_count", 0),
+            resolved_at=data.get("resolved_at"),
+            published_at=data.get("published_at"),
+            dirty=data.get("dirty", False),
+        )
+
+
+class IncidentCorrelator:
+    """
+    Incidentes abiertos por componente de un vehículo.
+    add_alert(), add_prediction() y poll() retornan los cambios que hay que
+    publicar como pares (incidente, evento), con evento "opened",
+    "escalated", "updated" o "resolved".
+    """
+
+    def __init__(self, vehicle_id: Optional[str] = None, config: Dict = None):
+        config = config or INCIDENTS
+        self.vehicle_id = vehicle_id
+        self.window = config["window_seconds"]
+        self.update_interval = config["update_interval_seconds"]
+        self.max_children = config["max_children"]
+        self.open: Dict[str, Incident] = {}
+        self.history: Deque[Incident] = deque(maxlen=config["history_size"])
+        self.by_alert: Dict[str, Incident] = {}   # alerta hija -> incidente abierto
+        self.counter = 0
+        self.event_time: Optional[float] = None
+        self.stats = {"opened": 0, "escalated": 0, "resolved": 0, "children": 0}
+
+    def _next_id(self) -> str:
+        self.counter += 1
+        return f"INC-{int(time.time())}-{self.counter:04d}"
+
+    def add_alert(self, alert: "Alert") -> List[Tuple[Incident, str]]:
+        """Añade una alerta a su incidente (abriéndolo si no hay uno abierto)"""
+        changes = self.poll(alert.timestamp)
+        child = {
+            "kind": "alert",
+            "id": alert.id,
+            "level": alert.level.value,
+            "message": alert.message,
+            "timestamp": alert.timestamp,
+            "data": alert.data,
+        }
+        incident = self.open.get(alert.component)
+        if incident is None:
+            incident = Incident(
+                id=self._next_id(),
+                component=alert.component,
+                level=alert.level.value,
+                message=alert.message,
+                opened_at=alert.timestamp,
+                updated_at=alert.timestamp,
+                vehicle_id=self.vehicle_id,
+            )
+            self.open[alert.component] = incident
+            self.stats["opened"] += 1
+            self.by_alert[alert.id] = incident
+            self._add_child(incident, child)
+            changes.append(self._published(incident, "opened"))
+            return changes
+
+        self.by_alert[alert.id] = incident
+        changes.extend(self._merge(incident, child))
+        return changes
+
+    def add_prediction(self, prediction: "FuturePrediction") -> List[Tuple[Incident, str]]:
+        """Añade una predicción de riesgo alto/crítico al incidente abierto de su componente"""
+        level = PREDICTION_LEVELS.get(prediction.risk_level.value)
+        incident = self.open.get(prediction.component)
+        if level is None or incident is None:
+            return []
+        # Una predicción se repite en cada pronóstico: solo cuenta la primera vez
+        if any(child["kind"] == "prediction" and child["problem_type"] == prediction.problem_type
+               for child in incident.children):
+            return []
+        child = {
+            "kind": "prediction",
+            "problem_type": prediction.problem_type,
+            "level": level,
+            "message": prediction.description,
+            "timestamp": incident.updated_at if self.event_time is None else self.event_time,
+            "estimated_time_to_failure_hours": prediction.estimated_time_to_failure,
+        }
+        return self._merge(incident, child)
+
+    def poll(self, now: float = None) -> List[Tuple[Incident, str]]:
+        """Resuelve incidentes sin señales en la ventana y publica actualizaciones pendientes"""
+        if now is not None and (self.event_time is None or now > self.event_time):
+            self.event_time = now
+        now = self.event_time
+        changes = []
+        if now is None:
+            return changes
+        for component, incident in list(self.open.items()):
+            if now - incident.updated_at >= self.window:
+                changes.append(self._resolve(component, incident, now))
+            elif incident.dirty and now - incident.published_at >= self.update_interval:
+                changes.append(self._published(incident, "updated"))
+        return changes
+
+    def next_deadline(self) -> Optional[float]:
+        """Tiempo de evento en que poll() tendrá algo que resolver o publicar"""
+        deadlines = [incident.updated_at + self.window for incident in self.open.values()]
+        deadlines += [incident.published_at + self.update_interval
+                      for incident in self.open.values() if incident.dirty]
+        return min(deadlines) if deadlines else None
+
+    def _merge(self, incident: Incident, child: Dict) -> List[Tuple[Incident, str]]:
+        self._add_child(incident, child)
+        incident.updated_at = max(incident.updated_at, child["timestamp"])
+        if ALERT_LEVELS[child["level"]] > ALERT_LEVELS[incident.level]:
+            incident.level = child["level"]
+            incident.message = child["message"]
+            self.stats["escalated"] += 1
+            return [self._published(incident, "escalated")]
+        incident.dirty = True
+        if incident.updated_at - incident.published_at >= self.update_interval:
+            return [self._published(incident, "updated")]
+        return []
+
+    def _add_child(self, incident: Incident, child: Dict) -> None:
+        incident.child_count += 1
+        self.stats["children"] += 1
+        if len(incident.children) >= self.max_children:
+            # Se conservan la primera hija y las más recientes
+            dropped = incident.children.pop(1)
+            if dropped["kind"] == "alert":
+                self.by_alert.pop(dropped["id"], None)
+        incident.children.append(child)
+
+    def _published(self, incident: Incident, event: str) -> Tuple[Incident, str]:
+        incident.published_at = incident.updated_at
+        incident.dirty = False
+        return incident, event
+
+    def _resolve(self, component: str, incident: Incident, now: float) -> Tuple[Incident, str]:
+        del self.open[component]
+        incident.resolved_at = now
+        self.history.append(incident)
+        self.stats["resolved"] += 1
+        for child in incident.children:
+            if child["kind"] == "alert":
+                self.by_alert.pop(child["id"], None)
+        return self._published(incident, "resolved")
+
+    def incident_for_alert(self, alert_id: str) -> Optional[Incident]:
+        """Incidente (abierto o del historial de resueltos) al que pertenece una alerta"""
+        incident = self.by_alert.get(alert_id)
+        if incident is not None:
+            return incident
+        for incident in reversed(self.history):
+            if any(child["kind"] == "alert" and child["id"] == alert_id for child in incident.children):
+                return incident
+        return None
+
+    def get_open_incidents(self) -> List[Dict]:
+        return [incident.to_dict() for incident in self.open.values()]
+
+    def get_incident_history(self) -> List[Dict]:
+        """Últimos incidentes resueltos"""
+        return [incident.to_dict() for incident in self.history]
+
+    def get_checkpoint_state(self) -> Dict:
+        return {
+            "open": [
+                {**incident.to_dict(), "published_at": incident.published_at, "dirty": incident.dirty}
+                for incident in self.open.values()
+            ],
+            "counter": self.counter,
+            "event_time": self.event_time,
+        }
+
+    def restore_checkpoint_state(self, state: Optional[Dict]) -> None:
+        if not state:
+            return
+        self.counter = state["counter"]
+        self.event_time = state["event_time"]
+        self.open.clear()
+        self.by_alert.clear()
+        for data in state["open"]:
+            incident = Incident.from_dict(data)
+            self.open[incident.component] = incident
+            for child in incident.children:
+                if child["kind"] == "alert":
+                    self.by_alert[child["id"]] = incident
@@ -0,0 +1,220 @@
+"""
+Cola de ingesta del cerebro predictivo.
+El callback de MQTT solo decodifica y encola; un pool de workers procesa los
+mensajes. Cada vehículo pertenece a una única partición (hash de su ID), así
+que sus mensajes se procesan siempre en orden y por el mismo worker.
+
+Con la cola casi llena se descartan primero los mensajes de sensores: la
+parte final de cada cola queda reservada para los OBD, que además esperan un
+poco a que haya hueco antes de descartarse.
+"""
+
+import queue
+import threading
+import time
+import zlib
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, List, Optional
+
+from .config import INGEST
+
+# Manejador de un mensaje: (tipo, vehicle_id, payload)
+Handler = Callable[[str, str, Dict], None]
+
+_STOP = object()
+
+# Peso de cada mensaje en la media móvil de espera en cola
+WAIT_EWMA_ALPHA = 0.1
+
+
+def partition_for(vehicle_id: str, num_partitions: int) -> int:
+    """Partición estable de un vehículo (independiente de PYTHONHASHSEED)"""
+    return zlib.crc32(vehicle_id.encode()) % num_partitions
+
+
+class _Worker:
+    """Hilo dueño de una partición de vehículos"""
+
+    def __init__(self, index: int, queue_size: int, handler: Handler,
+                 after_message: Optional[Callable[[], None]]):
+        self.index = index
+        self.queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.handler = handler
+        self.after_message = after_message
+        # Se mantiene mientras se procesa un mensaje; IngestPool.exclusive() lo usa
+        self.lock = threading.Lock()
+
+        self.processed = 0
+        self.errors = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.busy_total = 0.0
+        self.wait_ewma = 0.0  # espera en cola reciente (media móvil exponencial)
+
+        self.thread = threading.Thread(target=self._run, name=f"brain-ingest-{index}", daemon=True)
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            try:
+                if item is _STOP:
+                    return
+                kind, vehicle_id, payload, enqueued_at = item
+                start = time.perf_counter()
+                self.wait_ewma += WAIT_EWMA_ALPHA * ((start - enqueued_at) - self.wait_ewma)
+                with self.lock:
+                    try:
+                        self.handler(kind, vehicle_id, payload)
+                    except Exception as e:
+                        self.errors += 1
+                        print(f"✗ [Ingest-{self.index}] Error procesando mensaje de {vehicle_id}: {e}")
+                end = time.perf_counter()
+
+                self.processed += 1
+                self.busy_total += end - start
+                latency = end - enqueued_at
+                self.latency_total += latency
+                self.latency_max = max(self.latency_max, latency)
+
+                if self.after_message:
+                    self.after_message()
+            finally:
+                self.queue.task_done()
+
+
+class IngestPool:
+    """
+    Pool de workers con una cola por partición.
+    - submit(): no bloquea salvo los OBD (hasta obd_put_timeout_seconds); los
+      sensores se descartan a partir de sensor_max_fill y el resto con la cola llena
+    - num_workers=0 procesa en línea (hilo del llamador), sin colas
+    """
+
+    def __init__(self, handler: Handler, num_workers: int = None, queue_size: int = None,
+                 after_message: Optional[Callable[[], None]] = None):
+        self.handler = handler
+        self.after_message = after_message
+        self.num_workers = INGEST["num_workers"] if num_workers is None else num_workers
+        self.queue_size = queue_size or INGEST["queue_size"]
+        self.sensor_limit = max(1, int(self.queue_size * INGEST["sensor_max_fill"]))
+        self.obd_put_timeout = INGEST["obd_put_timeout_seconds"]
+        self.workers: List[_Worker] = [
+            _Worker(i, self.queue_size, handler, after_message) for i in range(self.num_workers)
+        ]
+        self.running = False
+
+        self.messages_submitted = 0
+        self.messages_dropped = 0
+        self.obd_messages_dropped = 0
+        self.sensor_messages_dropped = 0
+
+    def start(self) -> None:
+        if self.running:
+            return
+        for worker in self.workers:
+            worker.thread.start()
+        self.running = True
+
+    def stop(self, drain: bool = True) -> None:
+        """Detiene los workers, procesando antes lo que quede en cola"""
+        if not self.running:
+            return
+        for worker in self.workers:
+            if not drain:
+                self._clear(worker.queue)
+            worker.queue.put(_STOP)
+        for worker in self.workers:
+            worker.thread.join()
+        self.running = False
+
+    @staticmethod
+    def _clear(q: "queue.Queue") -> None:
+        while True:
+            try:
+                q.get_nowait()
+                q.task_done()
+            except queue.Empty:
+                return
+
+    def partition(self, vehicle_id: str) -> int:
+        """Worker al que pertenece un vehículo (0 si se procesa en línea)"""
+        return partition_for(vehicle_id, len(self.workers)) if self.workers else 0
+
+    def submit(self, kind: str, vehicle_id: str, payload: Dict, lane: str = None) -> bool:
+        """
+        Encola un mensaje en la partición de su vehículo. `lane` ("obd" o
+        "sensors", por defecto `kind`) decide cómo se trata con la cola llena.
+        """
+        self.messages_submitted += 1
+        if not self.workers or not self.running:
+            self.handler(kind, vehicle_id, payload)
+            if self.after_message:
+                self.after_message()
+            return True
+
+        lane = lane or kind
+        worker = self.workers[partition_for(vehicle_id, len(self.workers))]
+        item = (kind, vehicle_id, payload, time.perf_counter())
+        try:
+            if lane == "obd":
+                worker.queue.put(item, timeout=self.obd_put_timeout)
+            elif lane == "sensors" and worker.queue.qsize() >= self.sensor_limit:
+                raise queue.Full
+            else:
+                worker.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            self.messages_dropped += 1
+            if lane == "obd":
+                self.obd_messages_dropped += 1
+            elif lane == "sensors":
+                self.sensor_messages_dropped += 1
+            return False
+
+    def join(self) -> None:
+        """Espera a que se procesen todos los mensajes encolados"""
+        for worker in self.workers:
+            worker.queue.join()
+
+    @contextmanager
+    def exclusive(self):
+        """
+        Detiene el procesamiento en todas las particiones mientras dura el
+        bloque (p. ej. para tomar un checkpoint consistente). No debe usarse
+        desde dentro de un manejador.
+        """
+        with ExitStack() as stack:
+            for worker in self.workers:
+                stack.enter_context(worker.lock)
+            yield
+
+    def load(self) -> Dict[str, float]:
+        """
+        Carga actual de la partición más cargada: ocupación de su cola (0-1) y
+        espera reciente en cola en segundos (0 si la cola está vacía).
+        """
+        fill, wait = 0.0, 0.0
+        for worker in self.workers:
+            depth = worker.queue.qsize()
+            fill = max(fill, depth / self.queue_size)
+            if depth:
+                wait = max(wait, worker.wait_ewma)
+        return {"queue_fill": fill, "queue_wait": wait}
+
+    def get_stats(self) -> Dict:
+        processed = sum(w.processed for w in self.workers)
+        latency_total = sum(w.latency_total for w in self.workers)
+        busy_total = sum(w.busy_total for w in self.workers)
+        return {
+            "num_workers": self.num_workers,
+            "messages_submitted": self.messages_submitted,
+            "messages_dropped": self.messages_dropped,
+            "obd_messages_dropped": self.obd_messages_dropped,
+            "sensor_messages_dropped": self.sensor_messages_dropped,
+            "processing_errors": sum(w.errors for w in self.workers),
+            "queue_depth": sum(w.queue.qsize() for w in self.workers),
+            "queue_depth_per_worker": [w.queue.qsize() for w in self.workers],
+            "avg_latency_ms": latency_total / processed * 1000 if processed else 0.0,
+            "max_latency_ms": max((w.latency_max for w in self.workers), default=0.0) * 1000,
+            "avg_processing_ms": busy_total / processed * 1000 if processed else 0.0,
+        }
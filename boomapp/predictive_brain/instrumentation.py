@@ -0,0 +1,199 @@
+"""
+Instrumentación por etapas del cerebro predictivo.
+Cada etapa del camino caliente (decode, wear, record, alerts, forecasts,
+costs, publish) acumula su duración, medida con un reloj monótono, en un
+histograma de cubos fijos en escala logarítmica (potencias de 2 en µs).
+
+Coste en el camino caliente:
+- Desactivado: clock() y lap() retornan sin medir nada.
+- Activado: un perf_counter() y un incremento de contador por etapa. Cada
+  hilo escribe en sus propios histogramas, sin locks; get_stats() los suma.
+
+Las alertas que el AlertManager publica desde su callback durante la
+evaluación cuentan en "publish" y también dentro de "alerts".
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from .config import INSTRUMENTATION
+
+STAGES = ("decode", "join", "wear", "record", "alerts", "forecasts", "costs", "publish")
+
+# Cubo i = duraciones en [2^(i-1), 2^i) µs; el último acumula el resto (> ~35 min)
+NUM_BUCKETS = 32
+
+
+class LatencyHistogram:
+    """Histograma de duraciones con cubos logarítmicos fijos"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        index = int(seconds * 1e6).bit_length()
+        self.counts[index if index < NUM_BUCKETS else NUM_BUCKETS - 1] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Cota superior (segundos) del cubo que contiene el cuantil q"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if count and cumulative >= target:
+                return min((2 ** index) / 1e6, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "avg_us": round(self.total / self.count * 1e6, 1) if self.count else 0.0,
+            "p50_us": round(self.quantile(0.50) * 1e6, 1),
+            "p90_us": round(self.quantile(0.90) * 1e6, 1),
+            "p99_us": round(self.quantile(0.99) * 1e6, 1),
+            "max_us": round(self.max * 1e6, 1),
+        }
+
+
+class StageProfiler:
+    """
+    Perfilador de etapas activable en caliente.
+
+    Uso en el camino caliente (una medida encadena con la siguiente):
+        t = profiler.clock()
+        ...trabajo...
+        t = profiler.lap("wear", t)
+        ...trabajo...
+        profiler.lap("record", t)
+    """
+
+    def __init__(self, enabled: bool = None, dump_interval: float = None):
+        self.enabled = INSTRUMENTATION["enabled"] if enabled is None else enabled
+        self.dump_interval = (INSTRUMENTATION["dump_interval_seconds"]
+                              if dump_interval is None else dump_interval)
+        self.last_dump = time.monotonic()
+        self.started_at = time.monotonic()
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._tables: List[Dict[str, LatencyHistogram]] = []  # una tabla por hilo
+
+    # Control
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            for table in self._tables:
+                for histogram in table.values():
+                    histogram.__init__()
+            self.started_at = time.monotonic()
+
+    # Camino caliente
+    def _table(self) -> Dict[str, LatencyHistogram]:
+        table = getattr(self._local, "table", None)
+        if table is None:
+            table = {stage: LatencyHistogram() for stage in STAGES}
+            self._local.table = table
+            with self._lock:
+                self._tables.append(table)
+        return table
+
+    def clock(self) -> float:
+        """Inicio de una medida (0.0 si el perfilador está desactivado)"""
+        return time.perf_counter() if self.enabled else 0.0
+
+    def lap(self, stage: str, start: float) -> float:
+        """Registra la etapa desde `start` y retorna el inicio de la siguiente"""
+        if not self.enabled or not start:
+            return 0.0
+        now = time.perf_counter()
+        self.record(stage, now - start)
+        return now
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Registra una duración ya medida"""
+        if not self.enabled:
+            return
+        table = self._table()
+        histogram = table.get(stage)
+        if histogram is None:
+            histogram = table[stage] = LatencyHistogram()
+        histogram.record(seconds)
+
+    # Lectura
+    def histograms(self) -> Dict[str, LatencyHistogram]:
+        """Histogramas combinados de todos los hilos"""
+        merged: Dict[str, LatencyHistogram] = {}
+        with self._lock:
+            tables = list(self._tables)
+        for table in tables:
+            for stage, histogram in list(table.items()):
+                merged.setdefault(stage, LatencyHistogram()).merge(histogram)
+        return merged
+
+    def get_stats(self) -> Dict:
+        histograms = self.histograms()
+        busy = sum(histogram.total for histogram in histograms.values())
+        stages = {}
+        for stage, histogram in histograms.items():
+            if not histogram.count:
+                continue
+            stats = histogram.to_dict()
+            stats["share_percent"] = round(100 * histogram.total / busy, 1) if busy else 0.0
+            stages[stage] = stats
+        return {
+            "enabled": self.enabled,
+            "window_seconds": round(time.monotonic() - self.started_at, 1),
+            "busy_ms": round(busy * 1000, 3),
+            "stages": stages,
+        }
+
+    def maybe_dump(self) -> Optional[str]:
+        """Imprime el resumen por etapas si ha pasado el intervalo de volcado"""
+        if not self.enabled or not self.dump_interval:
+            return None
+        now = time.monotonic()
+        if now - self.last_dump < self.dump_interval:
+            return None
+        with self._lock:
+            if now - self.last_dump < self.dump_interval:
+                return None
+            self.last_dump = now
+        report = self.format_report()
+        print(report)
+        return report
+
+    def format_report(self) -> str:
+        stats = self.get_stats()
+        lines = [f"⏱️ [Perfil] {stats['window_seconds']:.0f}s, {stats['busy_ms']:.0f} ms de CPU en etapas"]
+        ordered = sorted(stats["stages"].items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        for stage, s in ordered:
+            lines.append(
+                f"   {stage:<10} {s['share_percent']:5.1f}%  n={s['count']:<8} "
+                f"avg={s['avg_us']:.0f}µs p50≤{s['p50_us']:.0f}µs p99≤{s['p99_us']:.0f}µs max={s['max_us']:.0f}µs"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,126 @@
+"""
+Control de sobrecarga del cerebro predictivo.
+Cuando las colas de ingesta crecen o la espera en cola se dispara, el
+controlador sube de nivel y el motor degrada el trabajo de forma escalonada:
+
+0. normal: todo a ritmo completo.
+1. downsample: solo se encola 1 de cada N mensajes de sensores de cada
+   vehículo; el resto se descarta al recibirlo, antes de ocupar la cola.
+2. defer: además se aplazan los pronósticos y la estimación de costes.
+
+Los mensajes OBD nunca se muestrean: el desgaste y la evaluación de umbrales
+del AlertManager se ejecutan con cada uno, así que las alertas siguen en
+tiempo real durante los picos.
+Cada nivel tiene umbrales de entrada y de salida distintos (histéresis) para
+no oscilar en el límite.
+"""
+
+import threading
+import time
+from typing import Callable, Dict
+
+from .config import OVERLOAD
+
+LEVELS = ("normal", "downsample", "defer")
+NORMAL, DOWNSAMPLE, DEFER = range(len(LEVELS))
+
+
+class OverloadController:
+    """Nivel de degradación según la ocupación de colas y la espera en cola"""
+
+    def __init__(self, config: Dict = None, clock: Callable[[], float] = time.monotonic):
+        config = config or OVERLOAD
+        self.thresholds = [config["levels"][name] for name in LEVELS[1:]]
+        self.sensor_sample_every = max(1, config["sensor_sample_every"])
+        self.check_interval = config["check_interval_seconds"]
+        self.clock = clock
+
+        self.level = NORMAL
+        self.queue_fill = 0.0
+        self.queue_wait = 0.0
+        self._level_since = clock()
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+        self.transitions = 0
+        self.time_in_level = [0.0] * len(LEVELS)
+        self.sensor_messages_shed = 0
+        self._sensor_messages: Dict[str, int] = {}  # mensajes de sensores por vehículo bajo sobrecarga
+        self.forecasts_deferred = 0
+
+    def update(self, queue_fill: float, queue_wait: float) -> int:
+        """Aplica una medida de carga y retorna el nivel resultante"""
+        with self._lock:
+            self.queue_fill, self.queue_wait = queue_fill, queue_wait
+            level = self.level
+            # Subir mientras se supere el umbral de entrada del nivel siguiente
+            while level < DEFER:
+                t = self.thresholds[level]
+                if queue_fill < t["enter_fill"] and queue_wait < t["enter_wait"]:
+                    break
+                level += 1
+            # Bajar mientras se esté por debajo de los umbrales de salida del actual
+            while level > NORMAL and level == self.level:
+                t = self.thresholds[level - 1]
+                if queue_fill >= t["exit_fill"] or queue_wait >= t["exit_wait"]:
+                    break
+                level -= 1
+            if level != self.level:
+                self._set_level(level)
+            return self.level
+
+    def maybe_update(self, load: Callable[[], Dict[str, float]]) -> int:
+        """update() con la carga de `load()` como mucho cada check_interval"""
+        now = self.clock()
+        if now - self._last_check < self.check_interval:
+            return self.level
+        self._last_check = now
+        measured = load()
+        return self.update(measured["queue_fill"], measured["queue_wait"])
+
+    def _set_level(self, level: int) -> None:
+        now = self.clock()
+        self.time_in_level[self.level] += now - self._level_since
+        self._level_since = now
+        previous, self.level = self.level, level
+        if level == NORMAL:
+            self._sensor_messages.clear()
+        self.transitions += 1
+        arrow = "⬆️" if level > previous else "⬇️"
+        print(f"{arrow} [Sobrecarga] {LEVELS[previous]} → {LEVELS[level]} "
+              f"(cola {self.queue_fill * 100:.0f}%, espera {self.queue_wait * 1000:.0f} ms)")
+
+    # Decisiones del camino caliente
+    def admit_sensor_message(self, vehicle_id: str) -> bool:
+        """Si un mensaje de sensores recién recibido del vehículo se encola"""
+        if self.level < DOWNSAMPLE:
+            return True
+        with self._lock:
+            sequence = self._sensor_messages.get(vehicle_id, 0)
+            self._sensor_messages[vehicle_id] = sequence + 1
+            if sequence % self.sensor_sample_every == 0:
+                return True
+            self.sensor_messages_shed += 1
+            return False
+
+    def defer_forecasts(self) -> bool:
+        """Si hay que aplazar pronósticos y costes; cuenta el aplazamiento"""
+        if self.level < DEFER:
+            return False
+        with self._lock:
+            self.forecasts_deferred += 1
+        return True
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            time_in_level = list(self.time_in_level)
+            time_in_level[self.level] += self.clock() - self._level_since
+            return {
+                "level": LEVELS[self.level],
+                "queue_fill_percent": round(self.queue_fill * 100, 1),
+                "queue_wait_ms": round(self.queue_wait * 1000, 1),
+                "transitions": self.transitions,
+                "seconds_in_level": {name: round(t, 1) for name, t in zip(LEVELS, time_in_level)},
+                "sensor_messages_shed": self.sensor_messages_shed,
+                "forecasts_deferred": self.forecasts_deferred,
+            }
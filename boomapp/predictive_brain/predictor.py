@@ -4,39 +4,86 @@ Se suscribe a MQTT, procesa datos y publica predicciones/alertas.
 """
 
 import json
+import os
+import socket
 import time
 import threading
-from typing import Dict, Optional, Callable, List
+from typing import Dict, Optional, Callable, List, Sequence, Tuple, Union
 import paho.mqtt.client as mqtt
 
-from .config import TOPICS
+from .config import TOPICS, CHECKPOINT, FLEET, PUBLISH_SCHEDULE, INCIDENTS, STREAM_JOIN, CLUSTER
 from .wear_models import WearAnalyzer
 from .alert_manager import AlertManager, Alert
-from .future_predictor import FuturePredictor
+from .future_predictor import FuturePredictor, FuturePrediction
+from .incidents import Incident
+from .what_if import DrivingProfile, WhatIfResult, project_wear
+from .threshold_profiles import ThresholdProfile, ThresholdProfiles
 from .cost_estimator import CostEstimator
+from .event_clock import resolve_event_time
+from .checkpoint import save_checkpoint, load_checkpoint
+from .vehicle_registry import VehicleRegistry, VehicleState
+from .stream_join import FusedRecord
+from .ingest import IngestPool
+from .cluster import ClusterMembership
+from .instrumentation import StageProfiler
+from .publish_scheduler import PublishScheduler
+from .overload import OverloadController
+
+DEFAULT_VEHICLE_ID = FLEET["default_vehicle_id"]
 
 
 class PredictiveEngine:
     """
     Motor de mantenimiento predictivo.
     - Se suscribe a topics MQTT de sensores
-    - Analiza datos y calcula desgaste
-    - Publica predicciones y alertas a MQTT
+    - Encola los mensajes y los analiza en workers particionados por vehículo
+    - Alinea por tiempo de evento los flujos OBD y de sensores de cada vehículo
+    - Analiza datos y calcula desgaste por vehículo
+    - Publica predicciones y alertas a MQTT (predicciones y pronósticos por
+      temporizador, con cadencia según el riesgo de cada vehículo; las
+      alertas agrupadas en incidentes por componente)
+    - En modo clúster reparte los vehículos entre varias instancias
     """
     
     def __init__(self, broker: str = "localhost", port: int = 1883,
-                 username: str = None, password: str = None, use_tls: bool = False):
+                 username: str = None, password: str = None, use_tls: bool = False,
+                 checkpoint_path: str = None, checkpoint_interval: float = None,
+                 memory_budget_mb: float = None, spill_dir: str = None,
+                 num_workers: int = None, cluster_group: str = None,
+                 instance_id: str = None, profile: bool = None,
+                 profile_dump_interval: float = None, threshold_profiles_dir: str = None):
         self.broker = broker
         self.port = port
         self.username = username
         self.password = password
         self.use_tls = use_tls
         
-        # Cliente MQTT
-        self.client = mqtt.Client(client_id="boomapp_predictive_brain")
+        # Modo clúster: suscripciones compartidas y reparto de vehículos por hash
+        self.cluster: Optional[ClusterMembership] = None
+        self._rebalance_event = threading.Event()
+        # Mensajes retenidos hasta que el dueño anterior entrega el vehículo
+        self._held: Dict[str, List[Tuple[str, Dict]]] = {}
+        self._held_lock = threading.Lock()
+        if cluster_group:
+            instance_id = instance_id or f"{socket.gethostname()}-{os.getpid()}"
+            self.cluster = ClusterMembership(
+                cluster_group, instance_id,
+                on_change=lambda members: self._rebalance_event.set()
+            )
+        
+        # Cliente MQTT (cada instancia del clúster necesita un client_id propio)
+        client_id = "boomapp_predictive_brain"
+        if self.cluster:
+            client_id = f"{client_id}_{self.cluster.instance_id}"
+        self.client = mqtt.Client(client_id=client_id)
         self.connected = False
         self.running = False
         
+        # Última voluntad: el resto del clúster nos da de baja si caemos
+        if self.cluster:
+            self.client.will_set(self.cluster.member_topic(),
+                                 self.cluster.heartbeat_payload(online=False), qos=1)
+        
         # Configurar autenticación
         if self.username and self.password:
             self.client.username_pw_set(self.username, self.password)
@@ -50,32 +97,63 @@ class PredictiveEngine:
         self.client.on_disconnect = self._on_disconnect
         self.client.on_message = self._on_message
         
-        # Componentes de análisis
-        self.wear_analyzer = WearAnalyzer()
-        self.alert_manager = AlertManager()
-        self.future_predictor = FuturePredictor()
+        # Perfiles de umbrales por modelo de vehículo, compilados al cargarse
+        self.threshold_profiles = ThresholdProfiles(threshold_profiles_dir)
+        
+        # Estado de análisis por vehículo (creado en el primer mensaje)
+        self.registry = VehicleRegistry(
+            memory_budget_mb=memory_budget_mb,
+            spill_dir=spill_dir,
+            on_create=self._on_vehicle_created,
+            threshold_profiles=self.threshold_profiles
+        )
         self.cost_estimator = CostEstimator()
         
-        # Configurar callback de alertas
-        self.alert_manager.on_new_alert = self._on_new_alert
+        # Latencia por etapa del camino caliente (activable con set_profiling)
+        self.profiler = StageProfiler(enabled=profile, dump_interval=profile_dump_interval)
+        
+        # Ingesta: el callback de MQTT solo decodifica y encola
+        self.ingest = IngestPool(
+            self._handle_message,
+            num_workers=num_workers,
+            after_message=self._after_message
+        )
         
         # Callbacks externos
         self.on_prediction: Optional[Callable[[Dict], None]] = None
         self.on_alert: Optional[Callable[[Dict], None]] = None
         
-        # Control de publicación
-        self.last_prediction_publish = 0
-        self.prediction_publish_interval = 5  # segundos
-        self.last_forecast_publish = 0
-        self.forecast_publish_interval = 15  # segundos (predicciones futuras menos frecuentes)
+        # Degradación escalonada si la ingesta no da abasto (los OBD nunca)
+        self.overload = OverloadController()
         
-        # Estadísticas
+        # Publicación periódica por vehículo (hilo propio, ver _scheduler_loop)
+        self.scheduler = PublishScheduler()
+        self._scheduler_wakeup = threading.Event()
+        
+        # Checkpoints periódicos del estado
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval or CHECKPOINT["interval_seconds"]
+        self.last_checkpoint = time.time()
+        self._checkpoint_lock = threading.Lock()
+        
+        # Estadísticas (actualizadas desde varios workers)
+        self._stats_lock = threading.Lock()
         self.stats = {
             "obd_messages_processed": 0,
             "sensor_messages_processed": 0,
             "predictions_published": 0,
             "alerts_published": 0,
+            "incidents_published": 0,
+            "alerts_correlated": 0,
+            "alert_summaries_published": 0,
             "forecasts_published": 0,
+            "forecasts_recomputed": 0,
+            "forecasts_reused": 0,
+            "late_messages_dropped": 0,
+            "checkpoints_saved": 0,
+            "messages_forwarded": 0,
+            "messages_held_for_handoff": 0,
+            "held_messages_dropped": 0,
             "start_time": None
         }
     
@@ -84,11 +162,17 @@ class PredictiveEngine:
             self.connected = True
             print(f"✓ [PredictiveBrain] Conectado a MQTT: {self.broker}:{self.port}")
             
-            # Suscribirse a topics de entrada
-            self.client.subscribe(TOPICS["obd_input"])
-            self.client.subscribe(TOPICS["sensors_input"])
-            print(f"✓ [PredictiveBrain] Suscrito a: {TOPICS['obd_input']}")
-            print(f"✓ [PredictiveBrain] Suscrito a: {TOPICS['sensors_input']}")
+            # Suscribirse a topics de entrada (vehículo único y flota)
+            for topic in self._input_topics():
+                self.client.subscribe(topic)
+                print(f"✓ [PredictiveBrain] Suscrito a: {topic}")
+            
+            if self.cluster:
+                self.client.subscribe(self.cluster.members_wildcard(), qos=1)
+                self.client.subscribe(self.cluster.forward_topic(), qos=1)
+                self._publish_heartbeat()
+                print(f"✓ [PredictiveBrain] Instancia {self.cluster.instance_id} "
+                      f"en el clúster '{self.cluster.group}'")
         else:
             print(f"✗ [PredictiveBrain] Error de conexión MQTT: código {rc}")
     
@@ -96,71 +180,344 @@ class PredictiveEngine:
         self.connected = False
         print(f"✗ [PredictiveBrain] Desconectado de MQTT")
     
+    def _input_topics(self) -> List[str]:
+        topics = [TOPICS[key] for key in ["obd_input", "sensors_input", "fleet_obd_input", "fleet_sensors_input"]]
+        if self.cluster:
+            # El broker entrega cada mensaje a una sola instancia del grupo
+            topics = [self.cluster.shared_topic(topic) for topic in topics]
+        return topics
+    
     def _on_message(self, client, userdata, msg):
         try:
+            started = self.profiler.clock()
             payload = json.loads(msg.payload.decode())
+            self.profiler.lap("decode", started)
             topic = msg.topic
             
+            if self.cluster and self.cluster.is_member_topic(topic):
+                self.cluster.handle_heartbeat(payload)
+                self._release_held()
+                return
+            if self.cluster and topic == self.cluster.forward_topic():
+                self.ingest.submit("forward", payload["vehicle_id"], payload, lane=payload["kind"])
+                return
+            
             if topic == TOPICS["obd_input"]:
-                self._process_obd_data(payload)
+                kind, topic_vehicle_id = "obd", None
             elif topic == TOPICS["sensors_input"]:
-                self._process_sensor_data(payload)
+                kind, topic_vehicle_id = "sensors", None
+            elif mqtt.topic_matches_sub(TOPICS["fleet_obd_input"], topic):
+                kind, topic_vehicle_id = "obd", topic.split("/")[2]
+            elif mqtt.topic_matches_sub(TOPICS["fleet_sensors_input"], topic):
+                kind, topic_vehicle_id = "sensors", topic.split("/")[2]
+            else:
+                return
+            
+            vehicle_id = self._resolve_vehicle_id(payload, topic_vehicle_id)
+            # Bajo sobrecarga se muestrean los sensores antes de encolar; los OBD nunca
+            if kind == "sensors" and not self.overload.admit_sensor_message(vehicle_id):
+                return
+            self.ingest.submit(kind, vehicle_id, payload)
                 
         except json.JSONDecodeError as e:
             print(f"✗ [PredictiveBrain] Error decodificando JSON: {e}")
         except Exception as e:
             print(f"✗ [PredictiveBrain] Error procesando mensaje: {e}")
     
-    def _process_obd_data(self, obd_data: Dict) -> None:
+    def _handle_message(self, kind: str, vehicle_id: str, payload: Dict) -> None:
+        """Procesa un mensaje ya decodificado (ejecutado por el worker de su vehículo)"""
+        if kind == "publish":
+            self._run_scheduled_publish(payload["vehicles"])
+            return
+        if kind == "release":
+            self._process_held(vehicle_id)
+            return
+        if kind == "forward":
+            # Reenviado por otra instancia: se procesa aquí aunque el anillo discrepe
+            kind, payload = payload["kind"], payload["payload"]
+        elif self.cluster and not self.cluster.is_owner(vehicle_id):
+            self._forward(kind, vehicle_id, payload)
+            return
+        
+        if self.cluster and self._hold(kind, vehicle_id, payload):
+            return
+        self._process_message(kind, vehicle_id, payload)
+    
+    def _process_message(self, kind: str, vehicle_id: str, payload: Dict) -> None:
+        if kind == "obd":
+            self._process_obd_data(payload, vehicle_id)
+        else:
+            self._process_sensor_data(payload, vehicle_id)
+    
+    def _forward(self, kind: str, vehicle_id: str, payload: Dict) -> None:
+        """Reenvía un mensaje a la instancia dueña del vehículo"""
+        owner = self.cluster.owner(vehicle_id)
+        message = json.dumps({"kind": kind, "vehicle_id": vehicle_id, "payload": payload})
+        self.client.publish(self.cluster.forward_topic(owner), message, qos=1)
+        self._count("messages_forwarded")
+    
+    def _hold(self, kind: str, vehicle_id: str, payload: Dict) -> bool:
+        """
+        Retiene el mensaje si el vehículo puede seguir en manos de su dueño
+        anterior (traspaso sin confirmar y el vehículo no está en memoria).
+        Los mensajes posteriores de un vehículo retenido también se retienen
+        para conservar el orden.
+        """
+        with self._held_lock:
+            held = self._held.get(vehicle_id)
+            if held is None:
+                if self.registry.peek(vehicle_id) is not None or self.cluster.handoff_settled():
+                    return False
+                held = self._held[vehicle_id] = []
+            if len(held) >= CLUSTER["handoff_hold_max_messages"]:
+                self._count("held_messages_dropped")
+                return True
+            held.append((kind, payload))
+        self._count("messages_held_for_handoff")
+        return True
+    
+    def _release_held(self) -> None:
+        """Encola la liberación de los vehículos retenidos una vez confirmado el traspaso"""
+        if not self._held or not self.cluster.handoff_settled():
+            return
+        with self._held_lock:
+            vehicle_ids = list(self._held)
+        for vehicle_id in vehicle_ids:
+            self.ingest.submit("release", vehicle_id, {})
+    
+    def _process_held(self, vehicle_id: str) -> None:
+        """Procesa en orden los mensajes retenidos de un vehículo (en su worker)"""
+        with self._held_lock:
+            held = self._held.pop(vehicle_id, [])
+        for kind, payload in held:
+            if self.cluster.is_owner(vehicle_id):
+                self._process_message(kind, vehicle_id, payload)
+            else:
+                # La pertenencia cambió mientras esperaba
+                self._forward(kind, vehicle_id, payload)
+    
+    def _publish_heartbeat(self, online: bool = True) -> mqtt.MQTTMessageInfo:
+        return self.client.publish(self.cluster.member_topic(),
+                                   self.cluster.heartbeat_payload(online), qos=1)
+    
+    def _cluster_loop(self) -> None:
+        """Latidos periódicos y traspaso de vehículos al cambiar los miembros"""
+        while self.running:
+            self._rebalance_event.wait(self.cluster.heartbeat_interval)
+            if not self.running:
+                return
+            if self.connected:
+                self._publish_heartbeat()
+            self.cluster.expire()
+            if self._rebalance_event.is_set():
+                self._rebalance_event.clear()
+                self._rebalance()
+            # Sin confirmación de algún miembro, al vencer el plazo
+            self._release_held()
+    
+    def _rebalance(self) -> None:
+        """
+        Entrega al directorio compartido los vehículos que ya no nos pertenecen
+        y lo confirma en un latido, para que sus nuevos dueños los carguen.
+        """
+        members = self.cluster.members
+        with self.ingest.exclusive():
+            moved = self.registry.handoff(self.cluster.is_owner)
+        self.cluster.mark_handed_off(members)
+        if self.connected:
+            self._publish_heartbeat()
+        if moved:
+            print(f"🔁 [Cluster] {moved} vehículos entregados a otras instancias")
+    
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += amount
+    
+    @staticmethod
+    def _resolve_vehicle_id(payload: Dict, topic_vehicle_id: str = None) -> str:
+        """ID de vehículo: campo del payload > segmento del topic > por defecto"""
+        return str(payload.get("vehicle_id") or topic_vehicle_id or DEFAULT_VEHICLE_ID)
+    
+    def _on_vehicle_created(self, vehicle: VehicleState) -> None:
+        """Configura un vehículo recién creado en el registro"""
+        vehicle.alert_manager.on_new_alert = lambda alert: self._on_new_alert(vehicle, alert)
+        vehicle.alert_manager.on_alert_reminder = lambda alert: self._on_alert_reminder(vehicle, alert)
+        vehicle.alert_manager.on_alert_summary = self._publish_alert_summary
+    
+    def get_vehicle(self, vehicle_id: str = None) -> VehicleState:
+        """Estado de un vehículo (se crea o recarga si hace falta)"""
+        return self.registry.get(vehicle_id or DEFAULT_VEHICLE_ID)
+    
+    # Compatibilidad: componentes de análisis del vehículo por defecto
+    @property
+    def wear_analyzer(self) -> WearAnalyzer:
+        return self.get_vehicle().wear_analyzer
+    
+    @property
+    def alert_manager(self) -> AlertManager:
+        return self.get_vehicle().alert_manager
+    
+    @property
+    def future_predictor(self) -> FuturePredictor:
+        return self.get_vehicle().future_predictor
+    
+    def _process_obd_data(self, obd_data: Dict, vehicle_id: str = None) -> None:
         """Procesa datos OBD recibidos"""
-        self.stats["obd_messages_processed"] += 1
+        self._count("obd_messages_processed")
+        self._join_message("obd", obd_data, vehicle_id)
+    
+    def _process_sensor_data(self, sensor_data: Dict, vehicle_id: str = None) -> None:
+        """Procesa datos de sensores recibidos"""
+        self._count("sensor_messages_processed")
+        self._join_message("sensors", sensor_data, vehicle_id)
+    
+    def _join_message(self, source: str, payload: Dict, vehicle_id: str = None) -> None:
+        """Alinea el mensaje con el otro flujo y procesa las filas fusionadas listas"""
+        event_time = resolve_event_time(payload)
+        with self.registry.lease(self._resolve_vehicle_id(payload, vehicle_id)) as vehicle:
+            started = self.profiler.clock()
+            records = vehicle.stream_join.push(source, payload, event_time)
+            self.profiler.lap("join", started)
+            self._process_records(vehicle, records)
+    
+    def _process_records(self, vehicle: VehicleState, records: List[FusedRecord]) -> None:
+        """Aplica filas fusionadas a las etapas de desgaste, historial y alertas"""
+        for record in records:
+            if record.source == "obd":
+                self._process_obd_record(vehicle, record)
+            else:
+                self._process_sensor_record(vehicle, record)
+        if records and INCIDENTS["enabled"]:
+            # Incidentes sin señales nuevas en la ventana y actualizaciones pendientes
+            self._publish_incident_changes(vehicle.incidents.poll(vehicle.alert_manager.event_time))
+    
+    def _process_obd_record(self, vehicle: VehicleState, record: FusedRecord) -> None:
+        obd_data, event_time = record.values, record.timestamp
         
         # Actualizar modelo de desgaste
-        self.wear_analyzer.process_obd_data(obd_data)
+        started = self.profiler.clock()
+        if not vehicle.wear_analyzer.process_obd_data(obd_data, event_time):
+            self._count("late_messages_dropped")
+            return
+        started = self.profiler.lap("wear", started)
         
-        # Registrar en predictor de futuro para análisis de tendencias
-        self.future_predictor.record_obd_data(obd_data)
+        # Señales con histéresis compartidas por predictor y alertas
+        if vehicle.signals is not None:
+            vehicle.signals.update("obd", obd_data, event_time)
         
-        # Evaluar alertas inmediatas
-        alerts = self.alert_manager.evaluate_obd_data(obd_data)
-        for alert in alerts:
-            self._publish_alert(alert)
+        # Registrar en predictor de futuro para análisis de tendencias
+        vehicle.future_predictor.record_obd_data(obd_data, event_time)
+        started = self.profiler.lap("record", started)
         
-        # Publicar predicciones periódicamente
-        self._maybe_publish_predictions()
+        # Evaluar alertas inmediatas (se publican desde _on_new_alert)
+        alerts = vehicle.alert_manager.evaluate_obd_data(obd_data, event_time)
+        self.profiler.lap("alerts", started)
         
-        # Publicar pronósticos futuros periódicamente
-        self._maybe_publish_forecasts()
+        # Predicciones y pronósticos se publican por temporizador
+        self._mark_data(vehicle, alerts)
     
-    def _process_sensor_data(self, sensor_data: Dict) -> None:
-        """Procesa datos de sensores recibidos"""
-        self.stats["sensor_messages_processed"] += 1
+    def _process_sensor_record(self, vehicle: VehicleState, record: FusedRecord) -> None:
+        sensor_data, event_time = record.values, record.timestamp
         
         # Actualizar modelo de desgaste
-        self.wear_analyzer.process_sensor_data(sensor_data)
+        started = self.profiler.clock()
+        if not vehicle.wear_analyzer.process_sensor_data(sensor_data, event_time):
+            self._count("late_messages_dropped")
+            return
+        started = self.profiler.lap("wear", started)
+        
+        if vehicle.signals is not None:
+            vehicle.signals.update("sensors", sensor_data, event_time)
         
         # Registrar en predictor de futuro para análisis de tendencias
-        self.future_predictor.record_sensor_data(sensor_data)
+        vehicle.future_predictor.record_sensor_data(sensor_data, event_time)
+        started = self.profiler.lap("record", started)
         
         # Evaluar alertas inmediatas
-        alerts = self.alert_manager.evaluate_sensor_data(sensor_data)
-        for alert in alerts:
+        alerts = vehicle.alert_manager.evaluate_sensor_data(sensor_data, event_time)
+        self.profiler.lap("alerts", started)
+        
+        self._mark_data(vehicle, alerts)
+    
+    def _on_new_alert(self, vehicle: VehicleState, alert: Alert) -> None:
+        """Callback cuando se genera una nueva alerta: se publica su incidente"""
+        if not INCIDENTS["enabled"]:
             self._publish_alert(alert)
+            return
+        changes = vehicle.incidents.add_alert(alert)
+        incident = vehicle.incidents.incident_for_alert(alert.id)
+        if all(changed is not incident for changed, _ in changes):
+            self._count("alerts_correlated")
+        self._publish_incident_changes(changes)
     
-    def _on_new_alert(self, alert: Alert) -> None:
-        """Callback cuando se genera una nueva alerta"""
-        self._publish_alert(alert)
+    def _on_alert_reminder(self, vehicle: VehicleState, alert: Alert) -> None:
+        """Callback cuando una alerta grave sigue sin reconocer"""
+        incident = vehicle.incidents.incident_for_alert(alert.id) if INCIDENTS["enabled"] else None
+        if incident is not None:
+            self._publish_incident(incident, "reminder")
+        else:
+            self._publish_alert(alert, reminder=True)
     
-    def _publish_alert(self, alert: Alert) -> None:
+    def _publish_alert_summary(self, summary: Dict) -> None:
+        """Publica el resumen periódico de alertas suprimidas por el límite de un vehículo"""
+        if not self.connected:
+            return
+        
+        started = self.profiler.clock()
+        self.client.publish(TOPICS["alerts_output"], json.dumps(summary), qos=1)
+        self.profiler.lap("publish", started)
+        self._count("alert_summaries_published")
+        
+        components = ", ".join(f"{name} ({entry['count']})" for name, entry in summary["by_component"].items())
+        print(f"📋 [ALERTAS] {summary['vehicle_id']}: {summary['suppressed']} alertas por encima del límite: {components}")
+        
+        if self.on_alert:
+            self.on_alert(summary)
+    
+    def _publish_incident_changes(self, changes: List[Tuple[Incident, str]]) -> None:
+        for incident, event in changes:
+            self._publish_incident(incident, event)
+    
+    def _publish_incident(self, incident: Incident, event: str) -> None:
+        """Publica un incidente (abierto, escalado, actualizado o resuelto) a MQTT"""
+        if not self.connected:
+            return
+        
+        started = self.profiler.clock()
+        incident_data = incident.to_dict()
+        incident_data["event"] = event
+        payload = json.dumps(incident_data)
+        
+        self.client.publish(TOPICS["alerts_output"], payload, qos=1)
+        self.profiler.lap("publish", started)
+        self._count("incidents_published")
+        
+        emoji = "✅" if event == "resolved" else {
+            "info": "ℹ️",
+            "warning": "⚠️",
+            "critical": "🔴",
+            "emergency": "🚨"
+        }.get(incident.level, "📢")
+        print(f"{emoji} [INCIDENTE] {event.upper()} {incident.vehicle_id} {incident.component} "
+              f"{incident.level.upper()} ({incident.child_count} señales): {incident.message}")
+        
+        if self.on_alert:
+            self.on_alert(incident_data)
+    
+    def _publish_alert(self, alert: Alert, reminder: bool = False) -> None:
         """Publica una alerta a MQTT"""
         if not self.connected:
             return
         
+        started = self.profiler.clock()
         alert_data = alert.to_dict()
+        if reminder:
+            alert_data["reminder"] = True
         payload = json.dumps(alert_data)
         
         self.client.publish(TOPICS["alerts_output"], payload, qos=1)
-        self.stats["alerts_published"] += 1
+        self.profiler.lap("publish", started)
+        self._count("alerts_published")
         
         level_emoji = {
             "info": "ℹ️",
@@ -169,114 +526,218 @@ class PredictiveEngine:
             "emergency": "🚨"
         }
         emoji = level_emoji.get(alert.level.value, "📢")
-        print(f"{emoji} [ALERTA] {alert.level.value.upper()}: {alert.message}")
+        prefix = "RECORDATORIO " if reminder else ""
+        print(f"{emoji} [ALERTA] {prefix}{alert.vehicle_id} {alert.level.value.upper()}: {alert.message}")
         
         if self.on_alert:
             self.on_alert(alert_data)
     
-    def _maybe_publish_predictions(self) -> None:
-        """Publica predicciones si ha pasado el intervalo"""
-        current_time = time.time()
+    def _mark_data(self, vehicle: VehicleState, alerts: List[Alert]) -> None:
+        """Anota datos nuevos del vehículo para el planificador de publicaciones"""
+        vehicle.last_data = time.time()
+        if self.scheduler.track(vehicle.vehicle_id):
+            self._scheduler_wakeup.set()  # primera publicación sin esperar al siguiente ciclo
+        elif any(alert.level.value in ("critical", "emergency") for alert in alerts):
+            # Una alerta grave pasa el vehículo a cadencia crítica sin esperar
+            if self.scheduler.tier(vehicle.vehicle_id) != "critical":
+                self.scheduler.set_tier(vehicle.vehicle_id, "critical")
+                self._scheduler_wakeup.set()
+    
+    def _risk_tier(self, vehicle: VehicleState) -> str:
+        """Nivel de cadencia de publicación según alertas activas y salud"""
+        by_level = vehicle.alert_manager.get_alert_summary()["by_level"]
+        health = vehicle.wear_analyzer.state.overall_health
+        if by_level["emergency"] or by_level["critical"] or health < PUBLISH_SCHEDULE["critical_health"]:
+            return "critical"
+        if by_level["warning"] or health < PUBLISH_SCHEDULE["elevated_health"]:
+            return "elevated"
+        return "healthy"
+    
+    def _scheduler_loop(self) -> None:
+        """Reparte en tandas las publicaciones vencidas a los workers de sus vehículos"""
+        max_sleep = PUBLISH_SCHEDULE["max_sleep_seconds"]
+        while self.running:
+            self.overload.maybe_update(self.ingest.load)
+            self.dispatch_due_publications()
+            next_due = self.scheduler.next_due()
+            wait = max_sleep if next_due is None else min(max_sleep, max(0.0, next_due - self.scheduler.clock()))
+            self._scheduler_wakeup.wait(wait)
+            self._scheduler_wakeup.clear()
+    
+    def dispatch_due_publications(self, now: float = None) -> int:
+        """
+        Encola una tarea por partición de ingesta con todas las publicaciones
+        vencidas de sus vehículos. Retorna el número de vehículos despachados.
+        Sin workers en marcha las publicaciones se hacen en el hilo llamador.
+        """
+        due = self.scheduler.pop_due(now)
+        if not due:
+            return 0
         
-        if current_time - self.last_prediction_publish >= self.prediction_publish_interval:
-            self._publish_predictions()
-            self.last_prediction_publish = current_time
+        batches: Dict[int, Dict[str, List[str]]] = {}
+        for vehicle_id, kinds in due.items():
+            batches.setdefault(self.ingest.partition(vehicle_id), {})[vehicle_id] = kinds
+        for vehicles in batches.values():
+            if not self.ingest.submit("publish", next(iter(vehicles)), {"vehicles": vehicles}):
+                # Cola llena: reintentar en el siguiente ciclo
+                for vehicle_id, kinds in vehicles.items():
+                    self.scheduler.reschedule(vehicle_id, kinds, delay=PUBLISH_SCHEDULE["max_sleep_seconds"])
+        return len(due)
     
-    def _publish_predictions(self) -> None:
+    def _run_scheduled_publish(self, vehicles: Dict[str, List[str]]) -> None:
+        """Publica lo vencido de una tanda de vehículos (en el worker de su partición)"""
+        for vehicle_id, kinds in vehicles.items():
+            # Un vehículo volcado a disco o entregado a otra instancia no tiene
+            # datos nuevos aquí: se deja de seguir hasta su próximo mensaje
+            if self.registry.peek(vehicle_id) is None:
+                self.scheduler.forget(vehicle_id)
+                continue
+            
+            with self.registry.lease(vehicle_id) as vehicle:
+                # Filas retenidas por la unión de flujos de un vehículo que dejó de enviar
+                self._process_records(vehicle, vehicle.stream_join.flush())
+                wakeup = self._advance_idle(vehicle)
+                
+                # Sin datos nuevos desde el último envío no hay nada que publicar
+                published = False
+                if "predictions" in kinds and vehicle.last_data > vehicle.last_prediction_publish:
+                    vehicle.last_prediction_publish = time.time()
+                    self._publish_predictions(vehicle)
+                    published = True
+                if ("forecasts" in kinds and vehicle.last_data > vehicle.last_forecast_publish
+                        and not self.overload.defer_forecasts()):
+                    vehicle.last_forecast_publish = time.time()
+                    self._publish_forecasts(vehicle)
+                    published = True
+                
+                idle = vehicle.last_data <= min(vehicle.last_prediction_publish, vehicle.last_forecast_publish)
+                if not published and idle:
+                    # Vehículo inactivo y todo publicado: solo se despierta para
+                    # soltar filas retenidas por la unión de flujos o para sus
+                    # temporizadores; sin ninguno, se vuelve a seguir con su
+                    # próximo mensaje
+                    delays = [] if wakeup is None else [wakeup]
+                    if vehicle.stream_join.pending:
+                        delays.append(STREAM_JOIN["max_wait_seconds"])
+                    if delays:
+                        self.scheduler.reschedule(vehicle_id, kinds, delay=min(delays))
+                    else:
+                        self.scheduler.forget(vehicle_id)
+                    continue
+                self.scheduler.set_tier(vehicle_id, self._risk_tier(vehicle))
+                self.scheduler.reschedule(vehicle_id, kinds)
+    
+    def _advance_idle(self, vehicle: VehicleState) -> Optional[float]:
+        """
+        Avanza con el tiempo real el reloj de eventos de un vehículo que dejó
+        de enviar datos (caducidades, recordatorios e incidentes vencen igual).
+        Retorna los segundos hasta su próximo temporizador, o None si no tiene.
+        """
+        alerts = vehicle.alert_manager
+        if alerts.advance_idle() and INCIDENTS["enabled"]:
+            self._publish_incident_changes(vehicle.incidents.poll(alerts.event_time))
+        deadlines = [alerts.next_deadline()]
+        if INCIDENTS["enabled"]:
+            deadlines.append(vehicle.incidents.next_deadline())
+        deadlines = [deadline for deadline in deadlines if deadline is not None]
+        return alerts.idle_delay(min(deadlines)) if deadlines else None
+    
+    def _publish_predictions(self, vehicle: VehicleState) -> None:
         """Publica estado de desgaste y predicciones"""
         if not self.connected:
             return
         
         # Obtener estado de desgaste
-        wear_state = self.wear_analyzer.get_wear_state()
+        started = self.profiler.clock()
+        wear_state = vehicle.wear_analyzer.get_wear_state()
+        started = self.profiler.lap("wear", started)
         
-        # Evaluar alertas de desgaste
-        wear_alerts = self.alert_manager.evaluate_wear_state(wear_state)
-        for alert in wear_alerts:
-            self._publish_alert(alert)
+        # Evaluar alertas de desgaste (se publican desde _on_new_alert)
+        vehicle.alert_manager.evaluate_wear_state(wear_state)
+        self.profiler.lap("alerts", started)
         
         # Construir payload de predicción
+        started = self.profiler.clock()
         prediction_data = {
             "timestamp": time.time(),
+            "vehicle_id": vehicle.vehicle_id,
+            "threshold_profile": vehicle.thresholds.name,
             "wear_state": wear_state,
-            "alert_summary": self.alert_manager.get_alert_summary(),
-            "active_alerts": self.alert_manager.get_active_alerts(),
+            "alert_summary": vehicle.alert_manager.get_alert_summary(),
             "stats": {
                 "runtime_hours": wear_state.get("runtime_hours", 0),
                 "overall_health": wear_state.get("overall_health", 100)
             }
         }
+        # Con incidentes, las alertas sueltas ya van agrupadas en ellos
+        if INCIDENTS["enabled"]:
+            prediction_data["incidents"] = vehicle.incidents.get_open_incidents()
+        else:
+            prediction_data["active_alerts"] = vehicle.alert_manager.get_active_alerts()
         
         payload = json.dumps(prediction_data)
         self.client.publish(TOPICS["predictions_output"], payload, qos=1)
-        self.stats["predictions_published"] += 1
+        self.profiler.lap("publish", started)
+        self._count("predictions_published")
         
-        print(f"📊 [PREDICCIÓN] Salud general: {wear_state.get('overall_health', 100):.1f}%")
+        print(f"📊 [PREDICCIÓN] {vehicle.vehicle_id} Salud general: {wear_state.get('overall_health', 100):.1f}%")
         
         if self.on_prediction:
             self.on_prediction(prediction_data)
     
-    def _maybe_publish_forecasts(self) -> None:
-        """Publica pronósticos futuros si ha pasado el intervalo"""
-        current_time = time.time()
-        
-        if current_time - self.last_forecast_publish >= self.forecast_publish_interval:
-            self._publish_forecasts()
-            self.last_forecast_publish = current_time
-    
-    def _publish_forecasts(self) -> None:
+    def _publish_forecasts(self, vehicle: VehicleState) -> None:
         """Publica pronósticos de problemas futuros"""
         if not self.connected:
             return
         
-        # Obtener estado de desgaste actual para cada componente
-        wear_state = self.wear_analyzer.get_wear_state()
-        components = wear_state.get("components", {})
-        
-        # Generar pronósticos por componente
-        forecasts = {}
-        all_future_predictions = []
-        
-        for comp_name, comp_data in components.items():
-            health = comp_data.get("health_score", 100)
-            forecast = self.future_predictor.get_component_forecast(comp_name, health)
-            forecasts[comp_name] = forecast.to_dict()
-            all_future_predictions.extend(forecast.predictions)
+        # Generar pronósticos por componente (solo se recalculan los afectados)
+        started = self.profiler.clock()
+        wear_state = vehicle.wear_analyzer.get_wear_state()
+        started = self.profiler.lap("wear", started)
+        forecasts, all_future_predictions, predictions_dicts = self._build_forecasts(vehicle, wear_state)
         
         # Obtener resumen de predicciones
-        prediction_summary = self.future_predictor.get_summary()
+        prediction_summary = vehicle.future_predictor.get_summary()
+        started = self.profiler.lap("forecasts", started)
         
         # Construir payload de pronóstico
         forecast_data = {
             "timestamp": time.time(),
             "type": "future_forecast",
+            "vehicle_id": vehicle.vehicle_id,
             "component_forecasts": forecasts,
-            "all_predictions": [p.to_dict() for p in all_future_predictions],
+            "all_predictions": predictions_dicts,
             "summary": prediction_summary,
             "overall_health": wear_state.get("overall_health", 100)
         }
         
         # Calcular costes estimados
-        predictions_dicts = [p.to_dict() for p in all_future_predictions]
         cost_summary = self.cost_estimator.estimate_from_predictions(predictions_dicts)
         
         # Añadir costes al payload
         forecast_data["cost_estimate"] = cost_summary.to_dict()
+        started = self.profiler.lap("costs", started)
         
         # Publicar a topic de predicciones (con costes incluidos)
         payload = json.dumps(forecast_data)
         self.client.publish(TOPICS["predictions_output"], payload, qos=1)
-        self.stats["forecasts_published"] += 1
+        self.profiler.lap("publish", started)
+        self._count("forecasts_published")
         
-        # Mostrar predicciones importantes
+        # Las predicciones de riesgo alto/crítico se suman al incidente abierto de su componente
         high_risk = [p for p in all_future_predictions if p.risk_level.value in ["critical", "high"]]
+        if INCIDENTS["enabled"]:
+            for pred in high_risk:
+                self._publish_incident_changes(vehicle.incidents.add_prediction(pred))
+        
+        # Mostrar predicciones importantes
         if high_risk:
-            print(f"🔮 [PRONÓSTICO] {len(high_risk)} predicciones de riesgo alto/crítico detectadas:")
+            print(f"🔮 [PRONÓSTICO] {vehicle.vehicle_id}: {len(high_risk)} predicciones de riesgo alto/crítico detectadas:")
             for pred in high_risk[:3]:
                 time_str = f"~{pred.estimated_time_to_failure:.0f}h" if pred.estimated_time_to_failure else "indeterminado"
                 print(f"   ⚠️ {pred.component}: {pred.problem_type} - Tiempo estimado: {time_str}")
         else:
-            print(f"🔮 [PRONÓSTICO] Sin predicciones de alto riesgo. {len(all_future_predictions)} predicciones totales.")
+            print(f"🔮 [PRONÓSTICO] {vehicle.vehicle_id}: sin predicciones de alto riesgo. {len(all_future_predictions)} predicciones totales.")
         
         # Mostrar costes estimados
         if cost_summary.total_avg > 0:
@@ -294,6 +755,10 @@ class PredictiveEngine:
             self.client.connect(self.broker, self.port, 60)
             self.running = True
             self.stats["start_time"] = time.time()
+            self.ingest.start()
+            threading.Thread(target=self._scheduler_loop, name="brain-scheduler", daemon=True).start()
+            if self.cluster:
+                threading.Thread(target=self._cluster_loop, daemon=True).start()
             
             # Iniciar loop en thread separado
             threading.Thread(target=self.client.loop_forever, daemon=True).start()
@@ -313,39 +778,199 @@ class PredictiveEngine:
     def disconnect(self) -> None:
         """Desconecta del broker MQTT"""
         self.running = False
+        self._scheduler_wakeup.set()  # el planificador termina en su próxima vuelta
+        if self.cluster:
+            # Dejar de recibir entrada, terminar lo encolado y entregar todos
+            # los vehículos antes de anunciar la baja
+            for topic in self._input_topics():
+                self.client.unsubscribe(topic)
+            self.ingest.stop()
+            with self._held_lock:
+                dropped = sum(len(held) for held in self._held.values())
+                self._held.clear()
+            if dropped:
+                self._count("held_messages_dropped", dropped)
+            moved = self.registry.handoff(lambda vehicle_id: False)
+            print(f"🔁 [Cluster] {moved} vehículos entregados antes de salir")
+            self._publish_heartbeat(online=False).wait_for_publish(timeout=2)
+            self._rebalance_event.set()  # despierta el hilo de latidos para que termine
         self.client.disconnect()
+        self.ingest.stop()
+        if self.checkpoint_path:
+            self.save_checkpoint()
         print("[PredictiveBrain] Desconectado")
     
-    def get_current_predictions(self) -> Dict:
+    def _after_message(self) -> None:
+        """Tareas periódicas tras cada mensaje (ejecutado por los workers)"""
+        self._maybe_checkpoint()
+        self.overload.maybe_update(self.ingest.load)
+        self.profiler.maybe_dump()
+    
+    def set_profiling(self, enabled: bool, reset: bool = False) -> None:
+        """Activa o desactiva la instrumentación por etapas en caliente"""
+        if reset:
+            self.profiler.reset()
+        if enabled:
+            self.profiler.enable()
+        else:
+            self.profiler.disable()
+    
+    def _maybe_checkpoint(self) -> None:
+        """Guarda un checkpoint si ha pasado el intervalo"""
+        if not self.checkpoint_path:
+            return
+        
+        current_time = time.time()
+        if current_time - self.last_checkpoint < self.checkpoint_interval:
+            return
+        # Solo un worker guarda; los demás siguen procesando
+        if not self._checkpoint_lock.acquire(blocking=False):
+            return
+        try:
+            if current_time - self.last_checkpoint >= self.checkpoint_interval:
+                self.save_checkpoint()
+                self.last_checkpoint = current_time
+        finally:
+            self._checkpoint_lock.release()
+    
+    def save_checkpoint(self, path: str = None) -> bool:
+        """
+        Guarda de forma atómica el estado de desgaste, historial y alertas
+        de los vehículos en memoria (los inactivos ya están volcados en disco).
+        """
+        path = path or self.checkpoint_path
+        try:
+            # Pausa breve de los workers para un estado consistente entre vehículos
+            with self.ingest.exclusive():
+                snapshots = self.registry.snapshot_resident()
+                spill_marks = self.registry.reloaded_spills()
+            save_checkpoint(path, snapshots)
+            # Los volcados de vehículos recargados ya están en el checkpoint
+            self.registry.release_spills(spill_marks)
+            self._count("checkpoints_saved")
+            return True
+        except Exception as e:
+            print(f"✗ [PredictiveBrain] Error guardando checkpoint: {e}")
+            return False
+    
+    def restore_checkpoint(self, path: str = None) -> bool:
+        """Restaura el estado desde un checkpoint si existe"""
+        path = path or self.checkpoint_path
+        if not path or not os.path.exists(path):
+            return False
+        
+        try:
+            start = time.perf_counter()
+            snapshots = load_checkpoint(path)
+            self.registry.adopt_snapshots(snapshots)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            print(f"✓ [PredictiveBrain] Estado de {len(snapshots)} vehículos restaurado desde {path} ({elapsed_ms:.1f} ms)")
+            return True
+        except Exception as e:
+            print(f"✗ [PredictiveBrain] Error restaurando checkpoint: {e}")
+            return False
+    
+    def get_current_predictions(self, vehicle_id: str = None) -> Dict:
         """Retorna predicciones actuales sin publicar"""
-        wear_state = self.wear_analyzer.get_wear_state()
-        return {
-            "timestamp": time.time(),
-            "wear_state": wear_state,
-            "alert_summary": self.alert_manager.get_alert_summary(),
-            "active_alerts": self.alert_manager.get_active_alerts()
-        }
+        with self.registry.lease(vehicle_id or DEFAULT_VEHICLE_ID) as vehicle:
+            wear_state = vehicle.wear_analyzer.get_wear_state()
+            return {
+                "timestamp": time.time(),
+                "vehicle_id": vehicle.vehicle_id,
+                "wear_state": wear_state,
+                "alert_summary": vehicle.alert_manager.get_alert_summary(),
+                "active_alerts": vehicle.alert_manager.get_active_alerts()
+            }
     
-    def get_future_forecasts(self) -> Dict:
+    def get_future_forecasts(self, vehicle_id: str = None) -> Dict:
         """Retorna pronósticos futuros sin publicar"""
-        wear_state = self.wear_analyzer.get_wear_state()
+        with self.registry.lease(vehicle_id or DEFAULT_VEHICLE_ID) as vehicle:
+            wear_state = vehicle.wear_analyzer.get_wear_state()
+            forecasts, _, all_predictions = self._build_forecasts(vehicle, wear_state)
+            
+            return {
+                "timestamp": time.time(),
+                "vehicle_id": vehicle.vehicle_id,
+                "component_forecasts": forecasts,
+                "all_predictions": all_predictions,
+                "summary": vehicle.future_predictor.get_summary()
+            }
+    
+    def project_what_if(self, profiles: Sequence[Union[str, DrivingProfile]], hours: float = 200.0,
+                        vehicle_ids: List[str] = None, points: int = None) -> WhatIfResult:
+        """
+        Proyecta el desgaste de cada vehículo con cada perfil de conducción
+        durante `hours` horas, todas las combinaciones en un solo lote (ver
+        what_if.py). Los perfiles pueden ser rutas (p. ej. "data/extreme.csv")
+        o DrivingProfile. Sin vehicle_ids se proyectan los vehículos en memoria.
+        Los vehículos volcados o pendientes de restaurar se leen sin cargarlos
+        en memoria; un vehículo desconocido es un ValueError.
+        """
+        profiles = [p if isinstance(p, DrivingProfile) else DrivingProfile.load(p) for p in profiles]
+        if vehicle_ids is None:
+            vehicle_ids = [vehicle.vehicle_id for vehicle in self.registry.resident()]
+            if not vehicle_ids:
+                raise ValueError("No hay vehículos en memoria que proyectar")
+        states, thresholds = [], []
+        for vehicle_id in vehicle_ids:
+            state = self.registry.peek_wear_state(vehicle_id)
+            if state is None:
+                raise ValueError(f"Vehículo desconocido: {vehicle_id}")
+            states.append(state)
+            thresholds.append(self.threshold_profiles.for_vehicle(vehicle_id))
+        return project_wear(states, profiles, hours, points, vehicle_ids, thresholds=thresholds)
+    
+    def assign_threshold_profile(self, vehicle_id: str, profile_name: str) -> ThresholdProfile:
+        """
+        Asigna un perfil de umbrales a un vehículo. Un vehículo en memoria lo
+        aplica al momento conservando su desgaste; uno volcado a disco, al
+        recargarse. La asignación no se guarda en los checkpoints: para que
+        sea permanente hay que añadir el vehículo al fichero del perfil o a
+        THRESHOLD_PROFILES["vehicles"].
+        """
+        profile = self.threshold_profiles.assign(vehicle_id, profile_name)
+        vehicle = self.registry.peek(vehicle_id)
+        if vehicle is not None:
+            with self.registry.lease(vehicle_id) as vehicle:
+                vehicle.set_thresholds(profile)
+        print(f"✓ [PredictiveBrain] Perfil de umbrales {profile_name} asignado a {vehicle_id}")
+        return profile
+    
+    def _build_forecasts(self, vehicle: VehicleState,
+                         wear_state: Dict) -> Tuple[Dict[str, Dict], List[FuturePrediction], List[Dict]]:
+        """
+        Construye los pronósticos por componente reutilizando los que no han cambiado.
+        Un componente se recalcula solo si llegaron datos de sus métricas de entrada
+        o si cambió su salud; cada pronóstico se serializa una única vez y sus
+        predicciones serializadas se reutilizan en el payload y en el estimador de costes.
+        La salud se registra en el historial en cada ciclo, también al reutilizar.
+        """
         components = wear_state.get("components", {})
+        dirty = vehicle.future_predictor.pop_dirty_components()
         
         forecasts = {}
-        all_predictions = []
+        predictions = []
+        predictions_dicts = []
         
         for comp_name, comp_data in components.items():
             health = comp_data.get("health_score", 100)
-            forecast = self.future_predictor.get_component_forecast(comp_name, health)
-            forecasts[comp_name] = forecast.to_dict()
-            all_predictions.extend([p.to_dict() for p in forecast.predictions])
+            cached = vehicle.forecast_cache.get(comp_name)
+            
+            if cached is None or comp_name in dirty or cached["health"] != health:
+                forecast = vehicle.future_predictor.get_component_forecast(comp_name, health)
+                cached = {"health": health, "forecast": forecast, "data": forecast.to_dict()}
+                vehicle.forecast_cache[comp_name] = cached
+                self._count("forecasts_recomputed")
+            else:
+                # Una muestra por ciclo, como al recalcular: la tendencia depende de ello
+                vehicle.future_predictor.record_component_health(comp_name, health)
+                self._count("forecasts_reused")
+            
+            forecasts[comp_name] = cached["data"]
+            predictions.extend(cached["forecast"].predictions)
+            predictions_dicts.extend(cached["data"]["predictions"])
         
-        return {
-            "timestamp": time.time(),
-            "component_forecasts": forecasts,
-            "all_predictions": all_predictions,
-            "summary": self.future_predictor.get_summary()
-        }
+        return forecasts, predictions, predictions_dicts
     
     def get_stats(self) -> Dict:
         """Retorna estadísticas del motor"""
@@ -356,14 +981,23 @@ class PredictiveEngine:
         return {
             **self.stats,
             "uptime_seconds": uptime,
-            "connected": self.connected
+            "connected": self.connected,
+            "fleet": self.registry.get_stats(),
+            "threshold_profiles": self.threshold_profiles.names(),
+            "ingest": self.ingest.get_stats(),
+            "scheduler": self.scheduler.get_stats(),
+            "overload": self.overload.get_stats(),
+            "cluster": self.cluster.get_stats() if self.cluster else None,
+            "profile": self.profiler.get_stats()
         }
     
-    def reset_component_maintenance(self, component: str) -> bool:
+    def reset_component_maintenance(self, component: str, vehicle_id: str = None) -> bool:
         """Resetea el mantenimiento de un componente"""
         try:
-            self.wear_analyzer.reset_maintenance(component)
-            print(f"✓ [PredictiveBrain] Mantenimiento de {component} reseteado")
+            with self.registry.lease(vehicle_id or DEFAULT_VEHICLE_ID) as vehicle:
+                vehicle.wear_analyzer.reset_maintenance(component)
+                vehicle.forecast_cache.pop(component, None)
+            print(f"✓ [PredictiveBrain] Mantenimiento de {component} reseteado ({vehicle.vehicle_id})")
             return True
         except Exception as e:
             print(f"✗ [PredictiveBrain] Error reseteando mantenimiento: {e}")
@@ -387,7 +1021,8 @@ def run_predictive_engine(broker: str = "localhost", port: int = 1883,
         print("🧠 CEREBRO PREDICTIVO ACTIVO")
         print("="*50)
         print(f"Broker: {broker}:{port}")
-        print(f"Suscrito a: {TOPICS['obd_input']}, {TOPICS['sensors_input']}")
+        print(f"Suscrito a: {TOPICS['obd_input']}, {TOPICS['sensors_input']}, "
+              f"{TOPICS['fleet_obd_input']}, {TOPICS['fleet_sensors_input']}")
         print(f"Publicando en: {TOPICS['predictions_output']}, {TOPICS['alerts_output']}")
         print("="*50 + "\n")
         
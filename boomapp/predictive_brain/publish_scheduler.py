@@ -0,0 +1,159 @@
+"""
+Planificador de publicaciones periódicas del cerebro predictivo.
+Las predicciones y los pronósticos de cada vehículo se publican por
+temporizador, con independencia de qué mensajes lleguen, y con una cadencia
+según su nivel de riesgo: rápida para vehículos críticos y lenta para los sanos.
+
+Los vencimientos se guardan en un montículo (heap) con borrado perezoso:
+reprogramar o olvidar un vehículo solo invalida su entrada. pop_due() agrupa
+todo lo vencido por vehículo (predicciones y pronósticos en una sola tarea)
+para que el motor lo reparta en tandas a las particiones de ingesta.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import PUBLISH_SCHEDULE
+
+KINDS = ("predictions", "forecasts")
+
+
+class PublishScheduler:
+    """Vencimientos de publicación por vehículo con cadencia por nivel de riesgo"""
+
+    def __init__(self, tiers: Dict[str, Dict[str, float]] = None, default_tier: str = None,
+                 batch_size: int = None, clock: Callable[[], float] = time.monotonic):
+        self.tiers = tiers or PUBLISH_SCHEDULE["tiers"]
+        self.default_tier = default_tier or PUBLISH_SCHEDULE["default_tier"]
+        self.batch_size = batch_size or PUBLISH_SCHEDULE["batch_size"]
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._heap: List[Tuple[float, int, str, str]] = []   # (vence, secuencia, vehículo, tipo)
+        self._entries: Dict[Tuple[str, str], Tuple[float, int]] = {}  # entradas vigentes
+        self._tier: Dict[str, str] = {}                       # vehículos seguidos
+        self._seq = itertools.count()
+
+        self.batches = 0
+        self.tasks_dispatched = 0
+        self.max_lag = 0.0
+
+    def interval(self, vehicle_id: str, kind: str) -> float:
+        return self.tiers[self._tier.get(vehicle_id, self.default_tier)][kind]
+
+    def _push(self, vehicle_id: str, kind: str, due: float) -> None:
+        seq = next(self._seq)
+        self._entries[(vehicle_id, kind)] = (due, seq)
+        heapq.heappush(self._heap, (due, seq, vehicle_id, kind))
+
+    # Altas, bajas y cambios de nivel
+    def track(self, vehicle_id: str) -> bool:
+        """Empieza a seguir un vehículo (publicación inmediata); False si ya lo estaba"""
+        if vehicle_id in self._tier:
+            return False
+        with self._lock:
+            if vehicle_id in self._tier:
+                return False
+            self._tier[vehicle_id] = self.default_tier
+            now = self.clock()
+            for kind in KINDS:
+                self._push(vehicle_id, kind, now)
+            return True
+
+    def forget(self, vehicle_id: str) -> None:
+        """Deja de seguir un vehículo (sus entradas del heap quedan obsoletas)"""
+        with self._lock:
+            self._tier.pop(vehicle_id, None)
+            for kind in KINDS:
+                self._entries.pop((vehicle_id, kind), None)
+
+    def set_tier(self, vehicle_id: str, tier: str) -> None:
+        """
+        Cambia el nivel de riesgo de un vehículo seguido. Si la nueva cadencia
+        es más rápida, adelanta los vencimientos pendientes.
+        """
+        if tier not in self.tiers:
+            raise ValueError(f"Nivel de publicación desconocido: {tier}")
+        with self._lock:
+            previous = self._tier.get(vehicle_id)
+            if previous is None or previous == tier:
+                return
+            self._tier[vehicle_id] = tier
+            now = self.clock()
+            for kind in KINDS:
+                entry = self._entries.get((vehicle_id, kind))
+                if entry is None:
+                    continue  # en curso: se reprograma al terminar
+                due = min(entry[0], now + self.tiers[tier][kind])
+                if due < entry[0]:
+                    self._push(vehicle_id, kind, due)
+
+    def tier(self, vehicle_id: str) -> Optional[str]:
+        return self._tier.get(vehicle_id)
+
+    # Ciclo de publicación
+    def reschedule(self, vehicle_id: str, kinds: Iterable[str], delay: float = None) -> None:
+        """Programa el siguiente envío tras publicar (o reintentar) `kinds`"""
+        with self._lock:
+            if vehicle_id not in self._tier:
+                return
+            now = self.clock()
+            for kind in kinds:
+                self._push(vehicle_id, kind, now + (self.interval(vehicle_id, kind) if delay is None else delay))
+
+    def pop_due(self, now: float = None) -> Dict[str, List[str]]:
+        """
+        Extrae hasta `batch_size` tareas vencidas agrupadas por vehículo.
+        Las tareas quedan en curso hasta que se llame a reschedule().
+        """
+        now = self.clock() if now is None else now
+        due: Dict[str, List[str]] = {}
+        with self._lock:
+            popped = 0
+            while self._heap and self._heap[0][0] <= now and popped < self.batch_size:
+                when, seq, vehicle_id, kind = heapq.heappop(self._heap)
+                if self._entries.get((vehicle_id, kind)) != (when, seq):
+                    continue  # obsoleta
+                del self._entries[(vehicle_id, kind)]
+                due.setdefault(vehicle_id, []).append(kind)
+                self.max_lag = max(self.max_lag, now - when)
+                popped += 1
+            if due:
+                self.batches += 1
+                self.tasks_dispatched += popped
+        return due
+
+    def next_due(self) -> Optional[float]:
+        """Próximo vencimiento vigente (descarta entradas obsoletas de la cima)"""
+        with self._lock:
+            while self._heap:
+                when, seq, vehicle_id, kind = self._heap[0]
+                if self._entries.get((vehicle_id, kind)) == (when, seq):
+                    return when
+                heapq.heappop(self._heap)
+            return None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            by_tier = {tier: 0 for tier in self.tiers}
+            for tier in self._tier.values():
+                by_tier[tier] += 1
+            return {
+                "vehicles_tracked": len(self._tier),
+                "vehicles_by_tier": by_tier,
+                "pending_tasks": len(self._entries),
+                "heap_size": len(self._heap),
+                "batches": self.batches,
+                "tasks_dispatched": self.tasks_dispatched,
+                "avg_batch_tasks": round(self.tasks_dispatched / self.batches, 1) if self.batches else 0.0,
+                "max_lag_ms": round(self.max_lag * 1000, 1),
+            }
+
+    def __contains__(self, vehicle_id: str) -> bool:
+        return vehicle_id in self._tier
+
+    def __len__(self) -> int:
+        return len(self._tier)
@@ -0,0 +1,138 @@
+"""
+Limitación de alertas con cubos de tokens.
+El cooldown de AlertManager solo separa alertas del mismo componente y
+nivel: un sensor que oscila puede disparar ráfagas alternando niveles, y un
+vehículo averiado puede inundar el topic de alertas. Cada AlertManager (uno
+por vehículo) tiene un cubo por componente y otro para todo el vehículo:
+
+- Cada alerta gasta un token de ambos cubos.
+- Los cubos se rellenan a `refill_per_minute` tokens por minuto de tiempo de
+  evento, hasta `burst`.
+- Sin tokens la alerta no se emite: se suma al resumen de suprimidas, que
+  AlertManager entrega cada `summary_interval_seconds` (nada se pierde en
+  silencio).
+
+Los niveles de `bypass_levels` nunca se limitan.
+"""
+
+from typing import Dict, Optional
+
+from .config import ALERT_LEVELS, ALERT_RATE_LIMIT
+
+
+class TokenBucket:
+    """Cubo de tokens con relleno perezoso (se calcula al consultarlo)"""
+
+    __slots__ = ("burst", "rate", "tokens", "updated")
+
+    def __init__(self, burst: float, refill_per_minute: float, now: float):
+        self.burst = burst
+        self.rate = refill_per_minute / 60.0
+        self.tokens = float(burst)
+        self.updated = now
+
+    def refill(self, now: float) -> float:
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        return self.tokens
+
+
+class AlertRateLimiter:
+    """Cubos por componente y por vehículo, y resumen de alertas suprimidas"""
+
+    def __init__(self, config: Dict = None):
+        config = config or ALERT_RATE_LIMIT
+        self.enabled = config["enabled"]
+        self.component_limit = config["component"]
+        self.vehicle_limit = config["vehicle"]
+        self.bypass_levels = set(config["bypass_levels"])
+        self.summary_interval = config["summary_interval_seconds"]
+        self.vehicle_bucket: Optional[TokenBucket] = None
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.suppressed: Dict[str, Dict] = {}   # componente -> contadores desde el último resumen
+        self.suppressed_since: Optional[float] = None
+        self.stats = {"allowed": 0, "suppressed": 0, "summaries": 0}
+
+    def _bucket(self, component: str, now: float) -> TokenBucket:
+        bucket = self.buckets.get(component)
+        if bucket is None:
+            bucket = self.buckets[component] = TokenBucket(now=now, **self.component_limit)
+        return bucket
+
+    def allow(self, component: str, level: str, now: float, rule: str = None) -> bool:
+        """
+        Gasta un token del componente y del vehículo. Retorna False (y anota la
+        alerta en el resumen) si alguno de los dos está vacío.
+        """
+        if not self.enabled or level in self.bypass_levels:
+            return True
+        if self.vehicle_bucket is None:
+            self.vehicle_bucket = TokenBucket(now=now, **self.vehicle_limit)
+        bucket = self._bucket(component, now)
+        if bucket.refill(now) >= 1 and self.vehicle_bucket.refill(now) >= 1:
+            bucket.tokens -= 1
+            self.vehicle_bucket.tokens -= 1
+            self.stats["allowed"] += 1
+            return True
+        self._suppress(component, level, now, rule)
+        return False
+
+    def _suppress(self, component: str, level: str, now: float, rule: Optional[str]) -> None:
+        self.stats["suppressed"] += 1
+        if self.suppressed_since is None:
+            self.suppressed_since = now
+        entry = self.suppressed.get(component)
+        if entry is None:
+            entry = self.suppressed[component] = {
+                "count": 0, "max_level": level, "levels": {}, "rules": {},
+                "first": now, "last": now,
+            }
+        entry["count"] += 1
+        entry["levels"][level] = entry["levels"].get(level, 0) + 1
+        if rule:
+            entry["rules"][rule] = entry["rules"].get(rule, 0) + 1
+        if ALERT_LEVELS[level] > ALERT_LEVELS[entry["max_level"]]:
+            entry["max_level"] = level
+        entry["last"] = max(entry["last"], now)
+
+    @property
+    def pending(self) -> bool:
+        return bool(self.suppressed)
+
+    def take_summary(self, now: float) -> Optional[Dict]:
+        """Resumen de las alertas suprimidas desde el anterior (None si no hay)"""
+        if not self.suppressed:
+            return None
+        summary = {
+            "from": self.suppressed_since,
+            "to": now,
+            "suppressed": sum(entry["count"] for entry in self.suppressed.values()),
+            "by_component": self.suppressed,
+        }
+        self.suppressed = {}
+        self.suppressed_since = None
+        self.stats["summaries"] += 1
+        return summary
+
+    def get_checkpoint_state(self) -> Dict:
+        return {
+            "vehicle": ([self.vehicle_bucket.tokens, self.vehicle_bucket.updated]
+                        if self.vehicle_bucket is not None else None),
+            "components": {name: [b.tokens, b.updated] for name, b in self.buckets.items()},
+            "suppressed": self.suppressed,
+            "suppressed_since": self.suppressed_since,
+        }
+
+    def restore_checkpoint_state(self, state: Optional[Dict]) -> None:
+        if not state:
+            return
+        if state["vehicle"] is not None:
+            tokens, updated = state["vehicle"]
+            self.vehicle_bucket = TokenBucket(now=updated, **self.vehicle_limit)
+            self.vehicle_bucket.tokens = min(tokens, self.vehicle_bucket.burst)
+        for name, (tokens, updated) in state["components"].items():
+            bucket = self.buckets[name] = TokenBucket(now=updated, **self.component_limit)
+            bucket.tokens = min(tokens, bucket.burst)
+        self.suppressed = state["suppressed"]
+        self.suppressed_since = state["suppressed_since"]
@@ -0,0 +1,182 @@
+"""
+Agregados por niveles del historial de una métrica.
+Cada nivel (p. ej. 1 min, 1 h, 1 día) guarda min/max/suma/conteo por cubo de
+tiempo de evento y se actualiza en O(1) con cada muestra, de modo que la
+tendencia puede ajustarse sobre días de historial con unos pocos kilobytes
+por métrica.
+
+Los cubos se direccionan por número de cubo módulo la capacidad del nivel:
+un hueco sin datos no ocupa ranuras, una muestra desordenada cae en su cubo
+sin recorrer el nivel y las ranuras con un número de cubo fuera de la
+ventana retenida se consideran vacías.
+"""
+
+import math
+from array import array
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import ROLLUPS
+
+EMPTY = float("-inf")  # número de cubo de una ranura sin usar
+
+# Columnas de cada ranura (intercaladas en un único array) y de to_array()
+COLUMNS = ("bucket", "min", "max", "sum", "count")
+WIDTH = len(COLUMNS)
+
+
+class RollupTier:
+    """Nivel de agregación con `capacity` cubos de `resolution` segundos"""
+
+    def __init__(self, name: str, resolution: float, capacity: int):
+        self.name = name
+        self.resolution = resolution
+        self.capacity = capacity
+        self.latest: Optional[int] = None  # cubo más reciente
+        self.clear()
+
+    def add(self, value: float, timestamp: float) -> bool:
+        """Agrega una muestra; retorna False si su cubo ya salió de la ventana"""
+        bucket = math.floor(timestamp / self.resolution)
+        latest = self.latest
+        if latest is None or bucket > latest:
+            self.latest = bucket
+        elif bucket <= latest - self.capacity:
+            return False
+
+        cells = self._cells
+        base = (bucket % self.capacity) * WIDTH
+        if cells[base] != bucket:
+            cells[base:base + WIDTH] = array("d", (bucket, value, value, value, 1.0))
+            return True
+
+        if value < cells[base + 1]:
+            cells[base + 1] = value
+        if value > cells[base + 2]:
+            cells[base + 2] = value
+        cells[base + 3] += value
+        cells[base + 4] += 1
+        return True
+
+    def _table(self) -> np.ndarray:
+        """Vista numpy (sin copia) de las ranuras, una fila por ranura"""
+        return np.frombuffer(self._cells).reshape(self.capacity, WIDTH)
+
+    def to_array(self) -> np.ndarray:
+        """Cubos retenidos en orden temporal, matriz (n, 5) con las columnas de COLUMNS"""
+        table = self._table()
+        if self.latest is None:
+            return table[:0].copy()
+        rows = table[table[:, 0] > self.latest - self.capacity]
+        return rows[np.argsort(rows[:, 0])]
+
+    def buckets(self) -> List[dict]:
+        """Cubos retenidos en orden temporal"""
+        return [
+            {
+                "start": bucket * self.resolution,
+                "min": low,
+                "max": high,
+                "mean": total / count,
+                "count": int(count),
+            }
+            for bucket, low, high, total, count in self.to_array().tolist()
+        ]
+
+    def means(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Centro de cada cubo (segundos) y su media, en orden temporal"""
+        rows = self.to_array()
+        return (rows[:, 0] + 0.5) * self.resolution, rows[:, 3] / rows[:, 4]
+
+    def clear(self) -> None:
+        self.latest = None
+        self._cells = array("d", (EMPTY, 0.0, 0.0, 0.0, 0.0)) * self.capacity
+
+    def load_array(self, rows: np.ndarray) -> None:
+        """Reemplaza el contenido con filas de to_array()"""
+        rows = np.asarray(rows, dtype=np.float64).reshape(-1, WIDTH)
+        if len(rows) == 0:
+            self.clear()
+            return
+        self.latest = int(rows[:, 0].max())
+        rows = rows[rows[:, 0] > self.latest - self.capacity]
+        table = np.zeros((self.capacity, WIDTH))
+        table[:, 0] = EMPTY
+        table[rows[:, 0].astype(np.int64) % self.capacity] = rows
+        self._cells = array("d", table.tobytes())
+
+    def load_samples(self, values: np.ndarray, timestamps: np.ndarray) -> None:
+        """Reconstruye el nivel a partir de muestras crudas (vectorizado)"""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            self.clear()
+            return
+        buckets = np.floor(np.asarray(timestamps, dtype=np.float64) / self.resolution).astype(np.int64)
+        order = np.argsort(buckets, kind="stable")
+        buckets, values = buckets[order], values[order]
+        starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+        ids = buckets[starts]
+        counts = np.diff(np.append(starts, len(values)))
+        self.load_array(np.column_stack((
+            ids,
+            np.minimum.reduceat(values, starts),
+            np.maximum.reduceat(values, starts),
+            np.add.reduceat(values, starts),
+            counts,
+        )))
+
+    @property
+    def nbytes(self) -> int:
+        return self.capacity * 8 * WIDTH
+
+    def __len__(self) -> int:
+        return len(self.to_array())
+
+
+class RollupSeries:
+    """Niveles de agregación de una métrica, alimentados muestra a muestra"""
+
+    def __init__(self, tiers: Sequence[Tuple[str, float, int]] = None):
+        tiers = ROLLUPS["tiers"] if tiers is None else tiers
+        self.tiers = [RollupTier(name, resolution, capacity) for name, resolution, capacity in tiers]
+        self._by_name = {tier.name: tier for tier in self.tiers}
+
+    def add(self, value: float, timestamp: float) -> None:
+        for tier in self.tiers:
+            tier.add(value, timestamp)
+
+    def tier(self, name: str) -> Optional[RollupTier]:
+        return self._by_name.get(name)
+
+    def load_samples(self, values: Sequence[float], timestamps: Sequence[float]) -> None:
+        for tier in self.tiers:
+            tier.load_samples(values, timestamps)
+
+    def trend_per_hour(self, tiers: Sequence[str] = None, min_buckets: int = None) -> Optional[float]:
+        """
+        Pendiente (unidades por hora) de las medias por cubo del primer nivel
+        de `tiers` con al menos `min_buckets` cubos. None si ninguno los tiene.
+        """
+        tiers = ROLLUPS["trend_tiers"] if tiers is None else tiers
+        min_buckets = ROLLUPS["trend_min_buckets"] if min_buckets is None else min_buckets
+        for name in tiers:
+            tier = self._by_name.get(name)
+            if tier is None:
+                continue
+            centers, means = tier.means()
+            if len(means) < max(2, min_buckets):
+                continue
+            hours = (centers - centers.mean()) / 3600
+            return float(np.dot(hours, means - means.mean()) / np.dot(hours, hours))
+        return None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(tier.nbytes for tier in self.tiers)
+
+
+def estimate_rollup_bytes(tiers: Sequence[Tuple[str, float, int]] = None) -> int:
+    """Memoria fija de los agregados de una métrica"""
+    tiers = ROLLUPS["tiers"] if tiers is None else tiers
+    return sum(capacity for _, _, capacity in tiers) * 8 * WIDTH
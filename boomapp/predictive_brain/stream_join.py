@@ -0,0 +1,164 @@
+"""
+Unión por tiempo de evento de los flujos OBD y de sensores de un vehículo.
+Los dos tipos de mensaje llegan por topics distintos y a ritmos distintos.
+En lugar de que cada etapa consulte el último mensaje del otro flujo (que
+puede ser de hace un rato), cada mensaje se retiene en un buffer acotado
+hasta poder emparejarlo con el mensaje del otro flujo más cercano en tiempo
+de evento, dentro de STREAM_JOIN["tolerance_seconds"].
+
+Cada mensaje produce una fila fusionada (FusedRecord) con sus campos y las
+métricas escalares del mensaje emparejado; desgaste, alertas y predicciones
+leen todos la misma fila. Las filas se emiten en orden de tiempo de evento
+(con empate, OBD antes que sensores).
+
+Un mensaje se emite cuando:
+- el otro flujo ya tiene un mensaje en o después de su tiempo de evento
+  (no puede llegar una pareja más cercana), o nunca ha enviado nada;
+- su flujo o el otro se separan más de `max_delay_seconds` en tiempo de
+  evento (el otro flujo está parado o muy retrasado);
+- el buffer de su flujo supera `max_pending` mensajes;
+- lleva más de `max_wait_seconds` en cola en tiempo real (ver flush()).
+"""
+
+import bisect
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import STREAM_JOIN
+
+SOURCES = ("obd", "sensors")
+
+
+@dataclass
+class FusedRecord:
+    """Fila alineada: un mensaje y el del otro flujo más cercano en el tiempo"""
+    source: str                      # flujo del mensaje que origina la fila
+    timestamp: float                 # tiempo de evento del mensaje
+    values: Dict                     # campos del mensaje + métricas del emparejado
+    offset: Optional[float] = None   # tiempo del emparejado - timestamp (None = sin pareja)
+
+    @property
+    def matched(self) -> bool:
+        return self.offset is not None
+
+
+class _Stream:
+    """Mensajes de un flujo: en cola para emitir y recientes para emparejar"""
+
+    def __init__(self, recent_size: int):
+        self.recent_size = recent_size
+        self.pending: List[Tuple] = []   # (timestamp, secuencia, payload, llegada), ordenados
+        self.times: List[float] = []     # recientes (incluye los pendientes), ordenados
+        self.payloads: List[Dict] = []
+        self.latest: Optional[float] = None
+
+    def add(self, timestamp: float, sequence: int, payload: Dict, arrival: float) -> None:
+        bisect.insort(self.pending, (timestamp, sequence, payload, arrival))
+        index = bisect.bisect_right(self.times, timestamp)
+        self.times.insert(index, timestamp)
+        self.payloads.insert(index, payload)
+        excess = len(self.times) - self.recent_size
+        if excess > 0:
+            del self.times[:excess]
+            del self.payloads[:excess]
+        if self.latest is None or timestamp > self.latest:
+            self.latest = timestamp
+
+    def nearest(self, timestamp: float, tolerance: float) -> Tuple[Optional[Dict], Optional[float]]:
+        """Mensaje reciente más cercano dentro de la tolerancia (con empate, el anterior)"""
+        index = bisect.bisect_left(self.times, timestamp)
+        best, best_offset = None, None
+        for candidate in (index - 1, index):
+            if 0 <= candidate < len(self.times):
+                offset = self.times[candidate] - timestamp
+                if abs(offset) <= tolerance and (best_offset is None or abs(offset) < abs(best_offset)):
+                    best, best_offset = self.payloads[candidate], offset
+        return best, best_offset
+
+
+class StreamJoiner:
+    """Buffers acotados por flujo que emiten filas OBD/sensores alineadas"""
+
+    def __init__(self, config: Dict = None, clock: Callable[[], float] = time.monotonic):
+        config = config or STREAM_JOIN
+        self.tolerance = config["tolerance_seconds"]
+        self.max_delay = config["max_delay_seconds"]
+        self.max_wait = config["max_wait_seconds"]
+        self.max_pending = config["max_pending"]
+        self.clock = clock
+        self.streams = {source: _Stream(config["recent_size"]) for source in SOURCES}
+        self._sequence = 0
+        self.stats = {"matched": 0, "unmatched": 0, "forced": 0}
+
+    def push(self, source: str, payload: Dict, event_time: float) -> List[FusedRecord]:
+        """Añade un mensaje ("obd" o "sensors") y retorna las filas ya listas"""
+        now = self.clock()
+        self._sequence += 1
+        self.streams[source].add(event_time, self._sequence, payload, now)
+        return self._drain(now)
+
+    def flush(self, force: bool = False) -> List[FusedRecord]:
+        """
+        Emite los mensajes que llevan más de max_wait_seconds en cola (un
+        vehículo que deja de enviar no debe retener sus últimas filas); con
+        force, todos.
+        """
+        return self._drain(self.clock(), force)
+
+    @property
+    def pending(self) -> int:
+        return sum(len(stream.pending) for stream in self.streams.values())
+
+    def _drain(self, now: float, force: bool = False) -> List[FusedRecord]:
+        records = []
+        while True:
+            heads = [(stream.pending[0][0], i) for i, stream in enumerate(self.streams.values()) if stream.pending]
+            if not heads:
+                return records
+            _, index = min(heads)
+            source = SOURCES[index]
+            own, other = self.streams[source], self.streams[SOURCES[1 - index]]
+            timestamp, _, payload, arrival = own.pending[0]
+
+            ready = (other.latest is None or other.latest >= timestamp
+                     or own.latest - timestamp > self.max_delay
+                     or timestamp - other.latest > self.max_delay)
+            if not ready:
+                if force or now - arrival >= self.max_wait or len(own.pending) > self.max_pending \
+                        or len(other.pending) > self.max_pending:
+                    self.stats["forced"] += 1
+                else:
+                    return records
+            own.pending.pop(0)
+            records.append(self._fuse(source, timestamp, payload, other))
+
+    def _fuse(self, source: str, timestamp: float, payload: Dict, other: _Stream) -> FusedRecord:
+        partner, offset = other.nearest(timestamp, self.tolerance)
+        if partner is None:
+            self.stats["unmatched"] += 1
+            return FusedRecord(source, timestamp, payload)
+        self.stats["matched"] += 1
+        # Del emparejado solo se toman sus métricas escalares; las del mensaje mandan
+        values = {
+            key: value for key, value in partner.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and key != "timestamp"
+        }
+        values.update(payload)
+        return FusedRecord(source, timestamp, values, offset)
+
+    def get_checkpoint_state(self) -> Dict:
+        """Mensajes aún en cola (los recientes ya emitidos no se guardan)"""
+        return {
+            source: [[timestamp, payload] for timestamp, _, payload, _ in stream.pending]
+            for source, stream in self.streams.items()
+        }
+
+    def restore_checkpoint_state(self, state: Optional[Dict]) -> None:
+        if not state:
+            return
+        now = self.clock()
+        for source, messages in state.items():
+            for timestamp, payload in messages:
+                self._sequence += 1
+                self.streams[source].add(timestamp, self._sequence, payload, now)
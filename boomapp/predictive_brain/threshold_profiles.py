@@ -0,0 +1,201 @@
+"""
+Perfiles de umbrales por modelo de vehículo.
+config.THRESHOLDS es un único conjunto de límites y no sirve igual para una
+furgoneta diésel que para un deportivo. Cada perfil es un fichero JSON del
+directorio THRESHOLD_PROFILES["directory"]:
+
+    {
+        "name": "diesel_van",
+        "vehicles": ["van-01", "van-02"],
+        "thresholds": {"engine": {"rpm_max": 4200, "rpm_critical": 4800}}
+    }
+
+Las claves ausentes se heredan de THRESHOLDS, que es el perfil "default".
+Los vehículos sin perfil asignado usan THRESHOLD_PROFILES["default_profile"].
+
+Cada perfil se compila al cargarse, para que el camino caliente no haga
+búsquedas en dicts anidados:
+- ThresholdProfile: un atributo plano por umbral (rpm_max,
+  brake_vibration_warning, ...) que leen WearAnalyzer, FuturePredictor y
+  WearBackfill, más sus reglas de alerta (RuleSet) y sus señales con
+  histéresis.
+- ThresholdTable: matriz (perfiles, umbrales) de la que FleetWearKernel toma
+  por fila los umbrales de cada vehículo (ThresholdRows tiene los mismos
+  atributos, como columnas).
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .config import THRESHOLDS, THRESHOLD_PROFILES
+from .alert_rules import RuleSet, build_default_rules, DEFAULT_RULES
+from .hysteresis import build_signal_specs
+
+DEFAULT_PROFILE_NAME = "default"
+PROFILE_SUFFIX = ".json"
+
+# Umbral compilado: (atributo, componente de THRESHOLDS, clave)
+FIELDS = (
+    ("rpm_max", "engine", "rpm_max"),
+    ("rpm_critical", "engine", "rpm_critical"),
+    ("coolant_temp_warning", "engine", "coolant_temp_warning"),
+    ("coolant_temp_critical", "engine", "coolant_temp_critical"),
+    ("brake_vibration_warning", "brakes", "vibration_warning"),
+    ("brake_vibration_critical", "brakes", "vibration_critical"),
+    ("rpm_speed_ratio_warning", "transmission", "rpm_speed_ratio_warning"),
+    ("battery_temp_min", "battery", "temp_min"),
+    ("battery_temp_max", "battery", "temp_max"),
+    ("tire_pressure_min", "tires", "pressure_min"),
+    ("tire_pressure_max", "tires", "pressure_max"),
+    ("tire_vibration_warning", "tires", "vibration_warning"),
+    ("fuel_level_warning", "fuel", "level_warning"),
+    ("fuel_level_critical", "fuel", "level_critical"),
+)
+FIELD_NAMES = tuple(name for name, _, _ in FIELDS)
+FIELD_INDEX = {name: index for index, name in enumerate(FIELD_NAMES)}
+
+
+def merge_thresholds(overrides: Dict, base: Dict = None) -> Dict:
+    """THRESHOLDS (o `base`) con los umbrales de `overrides` sustituidos"""
+    base = base or THRESHOLDS
+    merged = {component: dict(values) for component, values in base.items()}
+    for component, values in overrides.items():
+        if component not in merged:
+            raise ValueError(f"Componente de umbrales desconocido: {component}")
+        for key, value in values.items():
+            if key not in merged[component]:
+                raise ValueError(f"Umbral desconocido: {component}.{key}")
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                raise ValueError(f"Umbral no numérico: {component}.{key} = {value!r}")
+            merged[component][key] = value
+    return merged
+
+
+class ThresholdProfile:
+    """Umbrales de un perfil como atributos planos, con sus reglas y señales"""
+
+    __slots__ = FIELD_NAMES + ("name", "thresholds", "vector", "rules", "signal_specs")
+
+    def __init__(self, name: str, thresholds: Dict = None, rules: RuleSet = None):
+        self.name = name
+        self.thresholds = merge_thresholds(thresholds or {})
+        for attribute, component, key in FIELDS:
+            setattr(self, attribute, self.thresholds[component][key])
+        self.vector = np.array([float(getattr(self, attribute)) for attribute in FIELD_NAMES])
+        self.rules = rules if rules is not None else RuleSet(build_default_rules(self.thresholds))
+        self.signal_specs = build_signal_specs(self.rules.rules)
+
+    def to_dict(self) -> Dict:
+        return {"name": self.name, "thresholds": self.thresholds}
+
+    def __repr__(self) -> str:
+        return f"ThresholdProfile({self.name!r})"
+
+
+DEFAULT_PROFILE = ThresholdProfile(DEFAULT_PROFILE_NAME, rules=DEFAULT_RULES)
+
+
+class ThresholdRows:
+    """Umbrales de varias filas: los atributos de ThresholdProfile como columnas"""
+
+    __slots__ = FIELD_NAMES
+
+
+class ThresholdTable:
+    """Matriz (perfiles, umbrales) para tomar los umbrales de cada fila de un lote"""
+
+    def __init__(self, profiles: Sequence[ThresholdProfile]):
+        self.names = [profile.name for profile in profiles]
+        self.values = np.array([profile.vector for profile in profiles]).reshape(len(profiles), len(FIELD_NAMES))
+
+    def gather(self, indices: np.ndarray) -> ThresholdRows:
+        """Umbrales de cada fila según el índice de perfil de la fila"""
+        values = self.values[indices]
+        rows = ThresholdRows()
+        for column, name in enumerate(FIELD_NAMES):
+            setattr(rows, name, values[:, column])
+        return rows
+
+
+class ThresholdProfiles:
+    """
+    Perfiles cargados y su asignación a vehículos.
+    El índice de cada perfil (su fila en `table`) no cambia al recargarlo.
+    """
+
+    def __init__(self, directory: str = None, config: Dict = None):
+        config = config or THRESHOLD_PROFILES
+        self.profiles: Dict[str, ThresholdProfile] = {}
+        self.indices: Dict[str, int] = {}
+        self.assignments: Dict[str, str] = {}   # vehicle_id -> perfil
+        self.table: ThresholdTable = None
+        self.add(DEFAULT_PROFILE)
+
+        directory = config["directory"] if directory is None else directory
+        if directory:
+            self.load_directory(directory)
+        for vehicle_id, name in config["vehicles"].items():
+            self.assign(vehicle_id, name)
+        self.default_name = config["default_profile"]
+        self.get(self.default_name)
+
+    def add(self, profile: ThresholdProfile, vehicles: Sequence[str] = ()) -> ThresholdProfile:
+        """Registra (o sustituye) un perfil y le asigna vehículos"""
+        if profile.name not in self.indices:
+            self.indices[profile.name] = len(self.indices)
+        self.profiles[profile.name] = profile
+        self.table = ThresholdTable(sorted(self.profiles.values(), key=lambda p: self.indices[p.name]))
+        for vehicle_id in vehicles:
+            self.assignments[vehicle_id] = profile.name
+        return profile
+
+    def load_file(self, path: str) -> ThresholdProfile:
+        """Carga un perfil JSON; sin "name" se usa el nombre del fichero"""
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            name = data.get("name") or os.path.splitext(os.path.basename(path))[0]
+            profile = ThresholdProfile(name, data.get("thresholds", {}))
+        except (ValueError, AttributeError) as e:
+            raise ValueError(f"Perfil de umbrales inválido {path}: {e}") from e
+        return self.add(profile, data.get("vehicles", []))
+
+    def load_directory(self, directory: str) -> List[ThresholdProfile]:
+        """Carga los *.json del directorio en orden alfabético (sin directorio, ninguno)"""
+        if not os.path.isdir(directory):
+            return []
+        return [
+            self.load_file(os.path.join(directory, name))
+            for name in sorted(os.listdir(directory))
+            if name.endswith(PROFILE_SUFFIX) and not name.startswith(".")
+        ]
+
+    def get(self, name: str) -> ThresholdProfile:
+        profile = self.profiles.get(name)
+        if profile is None:
+            raise ValueError(f"Perfil de umbrales desconocido: {name}")
+        return profile
+
+    def assign(self, vehicle_id: str, name: str) -> ThresholdProfile:
+        profile = self.get(name)
+        self.assignments[vehicle_id] = name
+        return profile
+
+    def for_vehicle(self, vehicle_id: Optional[str]) -> ThresholdProfile:
+        return self.profiles[self.assignments.get(vehicle_id, self.default_name)]
+
+    def index_for_vehicle(self, vehicle_id: Optional[str]) -> int:
+        """Fila de `table` con los umbrales del vehículo"""
+        return self.indices[self.assignments.get(vehicle_id, self.default_name)]
+
+    def names(self) -> List[str]:
+        return sorted(self.profiles, key=self.indices.get)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.profiles
+
+    def __len__(self) -> int:
+        return len(self.profiles)
@@ -0,0 +1,164 @@
+"""
+Rueda de temporizadores jerárquica.
+Programa, cancela y consulta temporizadores en O(1); la memoria solo crece con
+los temporizadores vivos (las ranuras son dicts dispersos que se crean al
+usarse y se eliminan al vaciarse).
+
+Cada nivel tiene `slots` ranuras y cubre `slots` veces el rango del anterior.
+Un temporizador se guarda en el nivel del dígito (en base `slots`) más alto en
+el que su tick difiere del tick actual; al llegar a ese dígito baja en cascada
+al nivel inferior hasta disparar en el nivel 0. advance() salta directamente
+a la siguiente ranura ocupada, así que grandes saltos de tiempo (p. ej. al
+reproducir historial) no recorren tick a tick.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+@dataclass
+class Timer:
+    key: Hashable
+    deadline: float
+    kind: str = ""
+    payload: Any = None
+
+
+class TimingWheel:
+    """Rueda jerárquica de temporizadores guiada por un reloj externo"""
+
+    def __init__(self, tick: float = 1.0, slots: int = 64, levels: int = 4, start: float = 0.0):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.current_tick = math.floor(start / tick)
+
+        # _wheels[nivel][ranura] = {clave: Timer}
+        self._wheels: List[Dict[int, Dict[Hashable, Timer]]] = [{} for _ in range(levels)]
+        self._overflow: Dict[Hashable, Timer] = {}  # más allá del horizonte de la rueda
+        self._location: Dict[Hashable, Tuple[int, int]] = {}  # clave -> (nivel, ranura); -1 = overflow
+        self._timers: Dict[Hashable, Timer] = {}
+
+    # Operaciones O(1)
+    def schedule(self, key: Hashable, deadline: float, kind: str = "", payload: Any = None) -> Timer:
+        """Programa (o reprograma) el temporizador de una clave"""
+        self.cancel(key)
+        timer = Timer(key, deadline, kind, payload)
+        self._timers[key] = timer
+        self._place(timer)
+        return timer
+
+    def cancel(self, key: Hashable) -> Optional[Timer]:
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return None
+        level, slot = self._location.pop(key)
+        if level < 0:
+            del self._overflow[key]
+        else:
+            bucket = self._wheels[level][slot]
+            del bucket[key]
+            if not bucket:
+                del self._wheels[level][slot]
+        return timer
+
+    def get(self, key: Hashable) -> Optional[Timer]:
+        return self._timers.get(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def timers(self) -> List[Timer]:
+        return list(self._timers.values())
+
+    def _place(self, timer: Timer) -> None:
+        target = max(math.ceil(timer.deadline / self.tick), self.current_tick)
+        for level in range(self.levels - 1, -1, -1):
+            scale = self.slots ** level
+            if target // scale != self.current_tick // scale:
+                break
+        else:
+            level = 0  # vence en el tick actual
+
+        if (target // self.slots ** level) - (self.current_tick // self.slots ** level) >= self.slots:
+            self._overflow[timer.key] = timer
+            self._location[timer.key] = (-1, 0)
+            return
+
+        slot = (target // self.slots ** level) % self.slots
+        self._wheels[level].setdefault(slot, {})[timer.key] = timer
+        self._location[timer.key] = (level, slot)
+
+    # Avance del reloj
+    def _next_event_tick(self) -> Optional[int]:
+        """Siguiente tick en el que hay que disparar o bajar en cascada una ranura"""
+        best = None
+        for level, wheel in enumerate(self._wheels):
+            if not wheel:
+                continue
+            scale = self.slots ** level
+            digit = self.current_tick // scale
+            for slot in wheel:
+                offset = (slot - digit) % self.slots
+                if level > 0 and offset == 0:
+                    offset = self.slots
+                candidate = (digit + offset) * scale
+                if best is None or candidate < best:
+                    best = candidate
+        if self._overflow:
+            # Un temporizador entra en la rueda cuando su dígito superior queda
+            # a menos de `slots` del actual
+            scale = self.slots ** (self.levels - 1)
+            for timer in self._overflow.values():
+                digit = math.ceil(timer.deadline / self.tick) // scale
+                candidate = max((digit - self.slots + 1) * scale, (self.current_tick // scale + 1) * scale)
+                if best is None or candidate < best:
+                    best = candidate
+        return best
+
+    def advance(self, now: float) -> List[Timer]:
+        """Avanza el reloj hasta `now` y retorna los temporizadores vencidos en orden"""
+        target = math.floor(now / self.tick)
+        fired: List[Timer] = []
+
+        # Lo que ya vencía en el tick actual (programado con plazo pasado)
+        fired.extend(self._fire_slot(self.current_tick))
+
+        while self._timers:
+            next_tick = self._next_event_tick()
+            if next_tick is None or next_tick > target:
+                break
+            self.current_tick = next_tick
+            self._cascade(next_tick)
+            fired.extend(self._fire_slot(next_tick))
+
+        self.current_tick = max(self.current_tick, target)
+        return fired
+
+    def _cascade(self, tick: int) -> None:
+        if self._overflow and tick % self.slots ** (self.levels - 1) == 0:
+            pending, self._overflow = list(self._overflow.values()), {}
+            for timer in pending:
+                self._place(timer)
+        for level in range(self.levels - 1, 0, -1):
+            scale = self.slots ** level
+            if tick % scale:
+                continue
+            bucket = self._wheels[level].pop((tick // scale) % self.slots, None)
+            if bucket:
+                for timer in bucket.values():
+                    self._place(timer)
+
+    def _fire_slot(self, tick: int) -> List[Timer]:
+        bucket = self._wheels[0].get(tick % self.slots)
+        if not bucket:
+            return []
+        due = [timer for timer in bucket.values() if math.ceil(timer.deadline / self.tick) <= tick]
+        for timer in due:
+            self.cancel(timer.key)
+        due.sort(key=lambda timer: timer.deadline)
+        return due
@@ -0,0 +1,410 @@
+"""
+Registro de estado por vehículo para el cerebro predictivo.
+Cada vehículo tiene sus propios StreamJoiner, WearAnalyzer, AlertManager,
+IncidentCorrelator y FuturePredictor, creados al recibir su primer mensaje
+con los umbrales de su perfil (threshold_profiles). Los vehículos
+inactivos se vuelcan a disco con política LRU cuando se supera el
+presupuesto de memoria y se recargan de forma transparente al volver a
+recibir datos.
+"""
+
+import copy
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+from .config import FLEET, HYSTERESIS
+from .wear_models import WearAnalyzer, VehicleWearState
+from .alert_manager import AlertManager
+from .future_predictor import FuturePredictor
+from .stream_join import StreamJoiner
+from .hysteresis import SignalBank
+from .incidents import IncidentCorrelator
+from .threshold_profiles import ThresholdProfile, ThresholdProfiles, DEFAULT_PROFILE
+from .rollups import estimate_rollup_bytes
+from .checkpoint import (VehicleSnapshot, snapshot_vehicle, restore_vehicle,
+                         save_checkpoint, load_checkpoint)
+
+SPILL_SUFFIX = ".npz"
+
+
+class VehicleState:
+    """Estado de análisis y de publicación de un vehículo"""
+
+    def __init__(self, vehicle_id: str, history_size: int = 1000, thresholds: ThresholdProfile = None):
+        self.vehicle_id = vehicle_id
+        self.thresholds = thresholds or DEFAULT_PROFILE
+        self.stream_join = StreamJoiner()
+        # Señales con histéresis compartidas por alertas y predictor (las
+        # actualiza PredictiveEngine una vez por fila fusionada)
+        self.signals = SignalBank(self.thresholds.signal_specs) if HYSTERESIS["enabled"] else None
+        self.wear_analyzer = WearAnalyzer(thresholds=self.thresholds)
+        self.alert_manager = AlertManager(vehicle_id=vehicle_id, rules=self.thresholds.rules,
+                                          signals=self.signals)
+        self.future_predictor = FuturePredictor(history_size=history_size, signals=self.signals,
+                                                thresholds=self.thresholds)
+        # Alertas agrupadas en incidentes (lo único que se publica)
+        self.incidents = IncidentCorrelator(vehicle_id)
+
+        # Caché de pronósticos por componente (ver PredictiveEngine._build_forecasts)
+        self.forecast_cache: Dict[str, Dict] = {}
+
+        # Control de publicación
+        self.last_prediction_publish = 0
+        self.last_forecast_publish = 0
+        self.last_seen = time.time()
+        self.last_data = 0.0  # último mensaje procesado (para no republicar sin cambios)
+        self.leases = 0  # usuarios del estado; no se vuelca mientras > 0
+        self.lock = threading.RLock()
+
+    def snapshot(self) -> VehicleSnapshot:
+        snapshot = snapshot_vehicle(self.wear_analyzer, self.future_predictor, self.alert_manager,
+                                    self.stream_join, self.signals, self.incidents)
+        # Para quedarse con el más reciente si hay un checkpoint y un volcado
+        snapshot.scalars["taken_at"] = time.time()
+        return snapshot
+
+    def restore(self, snapshot: VehicleSnapshot) -> None:
+        restore_vehicle(snapshot, self.wear_analyzer, self.future_predictor, self.alert_manager,
+                        self.stream_join, self.signals, self.incidents)
+        self.forecast_cache.clear()
+
+    def set_thresholds(self, thresholds: ThresholdProfile) -> None:
+        """
+        Cambia el perfil de umbrales conservando el desgaste acumulado. Las
+        señales se reconstruyen con los nuevos umbrales y conservan su estado.
+        """
+        if thresholds is self.thresholds:
+            return
+        self.thresholds = thresholds
+        if self.signals is not None:
+            signals = SignalBank(thresholds.signal_specs)
+            signals.restore_checkpoint_state(self.signals.get_checkpoint_state())
+            self.signals = signals
+        self.wear_analyzer.thresholds = thresholds
+        self.alert_manager.set_rules(thresholds.rules, self.signals)
+        self.future_predictor.set_thresholds(thresholds, self.signals)
+        self.forecast_cache.clear()
+
+
+def estimate_vehicle_bytes(history_size: int = 1000) -> int:
+    """
+    Estimación de memoria de un vehículo residente.
+    Cada muestra de DataBuffer ocupa dos floats de Python en deques (~64 bytes);
+    hay 9 métricas de historial y 5 de salud (la mitad de tamaño), cada una
+    con sus agregados de tamaño fijo.
+    """
+    samples = 9 * history_size + 5 * (history_size // 2)
+    return samples * 64 + 14 * estimate_rollup_bytes() + 16 * 1024  # + objetos y alertas
+
+
+def _taken_at(snapshot: VehicleSnapshot) -> float:
+    """Momento del snapshot (0 en los guardados antes de registrarlo)"""
+    return snapshot.scalars.get("taken_at", 0.0)
+
+
+class VehicleRegistry:
+    """
+    Registro LRU de vehículos.
+    - get(): crea el estado en el primer mensaje o lo recarga si estaba en disco
+    - Al superar max_resident vehículos en memoria vuelca el menos usado
+    - lease(): reserva un vehículo mientras se procesa para que no se vuelque
+    Los volcados se eligen con el lock del registro y se escriben fuera de él,
+    para que un worker que escribe a disco no detenga a los demás.
+    El fichero de volcado de un vehículo recargado se conserva hasta que un
+    checkpoint lo incluye (ver release_spills): el checkpoint anterior no lo
+    tenía, y sin el fichero una caída perdería su estado.
+    Es seguro usarlo desde varios workers de ingesta.
+    """
+
+    def __init__(self, memory_budget_mb: float = None, spill_dir: str = None,
+                 history_size: int = 1000,
+                 on_create: Optional[Callable[[VehicleState], None]] = None,
+                 threshold_profiles: ThresholdProfiles = None):
+        self.history_size = history_size
+        self.threshold_profiles = threshold_profiles
+        self.memory_budget_mb = memory_budget_mb if memory_budget_mb is not None else FLEET["memory_budget_mb"]
+        self.max_resident = max(1, int(self.memory_budget_mb * 1024 * 1024 // estimate_vehicle_bytes(history_size)))
+        self.spill_dir = spill_dir if spill_dir is not None else FLEET["spill_dir"]
+        self.on_create = on_create
+
+        self._resident: "OrderedDict[str, VehicleState]" = OrderedDict()
+        self._pending: Dict[str, VehicleSnapshot] = {}  # restaurados, aún sin materializar
+        self._spilled = set(self._scan_spill_dir())
+        # Recargados cuyo fichero de volcado sigue en disco -> marca de la recarga
+        self._reloaded: Dict[str, int] = {}
+        # Sacados de memoria cuyo volcado se está escribiendo -> (marca, estado)
+        self._spilling: Dict[str, Tuple[int, VehicleState]] = {}
+        self._reload_seq = itertools.count()
+        self._lock = threading.RLock()
+
+        self.stats = {
+            "vehicles_created": 0,
+            "vehicles_spilled": 0,
+            "vehicles_reloaded": 0,
+            "vehicles_handed_off": 0,
+        }
+
+    def _spill_path(self, vehicle_id: str) -> str:
+        return os.path.join(self.spill_dir, quote(vehicle_id, safe="") + SPILL_SUFFIX)
+
+    def _scan_spill_dir(self) -> List[str]:
+        if not self.spill_dir or not os.path.isdir(self.spill_dir):
+            return []
+        return [
+            unquote(name[:-len(SPILL_SUFFIX)])
+            for name in os.listdir(self.spill_dir)
+            if name.endswith(SPILL_SUFFIX) and not name.startswith(".")
+        ]
+
+    def get(self, vehicle_id: str) -> VehicleState:
+        """Retorna el estado del vehículo, creándolo o recargándolo si hace falta"""
+        with self._lock:
+            vehicle = self._get(vehicle_id)
+            victims = self._evict_excess()
+        self._write_spills(victims)
+        return vehicle
+
+    def _get(self, vehicle_id: str) -> VehicleState:
+        vehicle = self._resident.get(vehicle_id)
+        if vehicle is not None:
+            self._resident.move_to_end(vehicle_id)
+        elif vehicle_id in self._spilling:
+            # Aún escribiéndose su volcado: vuelve a memoria tal cual
+            _, vehicle = self._spilling.pop(vehicle_id)
+            self._resident[vehicle_id] = vehicle
+        else:
+            vehicle = self._materialize(vehicle_id)
+            self._resident[vehicle_id] = vehicle
+
+        vehicle.last_seen = time.time()
+        return vehicle
+
+    @contextmanager
+    def lease(self, vehicle_id: str):
+        """
+        Estado del vehículo en uso exclusivo durante el bloque: no se vuelca a
+        disco y nadie más lo modifica.
+        """
+        with self._lock:
+            vehicle = self._get(vehicle_id)
+            vehicle.leases += 1
+        try:
+            with vehicle.lock:
+                yield vehicle
+        finally:
+            with self._lock:
+                vehicle.leases -= 1
+                victims = self._evict_excess()
+            self._write_spills(victims)
+
+    def peek(self, vehicle_id: str) -> Optional[VehicleState]:
+        """Estado residente del vehículo sin alterar el orden LRU"""
+        return self._resident.get(vehicle_id)
+
+    def _materialize(self, vehicle_id: str) -> VehicleState:
+        thresholds = self.threshold_profiles.for_vehicle(vehicle_id) if self.threshold_profiles else None
+        vehicle = VehicleState(vehicle_id, self.history_size, thresholds)
+        if self.on_create:
+            self.on_create(vehicle)
+
+        snapshot = self._pending.pop(vehicle_id, None)
+        if self.spill_dir:
+            # El directorio puede ser compartido: otra instancia del clúster
+            # pudo volcar el vehículo después de nuestro checkpoint, o
+            # recogerlo antes que nosotros
+            self._spilled.discard(vehicle_id)
+            spilled = self._load_spill(vehicle_id)
+            if spilled is not None:
+                self._reloaded[vehicle_id] = next(self._reload_seq)
+                if snapshot is None or _taken_at(spilled) >= _taken_at(snapshot):
+                    snapshot = spilled
+                    self.stats["vehicles_reloaded"] += 1
+
+        if snapshot is not None:
+            vehicle.restore(snapshot)
+        else:
+            self.stats["vehicles_created"] += 1
+        return vehicle
+
+    def _load_spill(self, vehicle_id: str) -> Optional[VehicleSnapshot]:
+        path = self._spill_path(vehicle_id)
+        if not os.path.exists(path):
+            return None
+        return load_checkpoint(path).get(vehicle_id)
+
+    def _evict_excess(self) -> List[Tuple[str, int, VehicleState]]:
+        """Saca de memoria los que exceden el presupuesto (con self._lock tomado)"""
+        excess = len(self._resident) - self.max_resident
+        if excess <= 0:
+            return []
+        # Menos usados primero; los reservados por un worker se saltan
+        idle = [vid for vid, vehicle in self._resident.items() if vehicle.leases == 0]
+        return [victim for victim in map(self._detach, idle[:excess]) if victim is not None]
+
+    def _detach(self, vehicle_id: str) -> Optional[Tuple[str, int, VehicleState]]:
+        """
+        Saca un vehículo de memoria para volcarlo (con self._lock tomado).
+        La escritura la hace _write_spills() fuera del lock del registro.
+        """
+        vehicle = self._resident.get(vehicle_id)
+        if vehicle is None or vehicle.leases:
+            return None
+        del self._resident[vehicle_id]
+        self._reloaded.pop(vehicle_id, None)
+        if not self.spill_dir:
+            # Sin directorio de volcado el estado se descarta (solo pruebas)
+            return None
+        mark = next(self._reload_seq)
+        self._spilling[vehicle_id] = (mark, vehicle)
+        return vehicle_id, mark, vehicle
+
+    def _write_spills(self, victims: List[Tuple[str, int, VehicleState]]) -> None:
+        """
+        Escribe los volcados sin el lock del registro. El lock del vehículo
+        ordena las escrituras de un mismo vehículo y espera a un lease que lo
+        haya recuperado mientras tanto.
+        """
+        for vehicle_id, mark, vehicle in victims:
+            with vehicle.lock:
+                save_checkpoint(self._spill_path(vehicle_id), {vehicle_id: vehicle.snapshot()})
+                with self._lock:
+                    if self._spilling.get(vehicle_id, (None,))[0] == mark:
+                        del self._spilling[vehicle_id]
+                        self._spilled.add(vehicle_id)
+                        self.stats["vehicles_spilled"] += 1
+                    elif vehicle_id not in self._spilling:
+                        # Recuperado durante la escritura: como un recargado,
+                        # el fichero se conserva hasta el próximo checkpoint
+                        self._reloaded[vehicle_id] = next(self._reload_seq)
+
+    def spill(self, vehicle_id: str) -> bool:
+        """Vuelca un vehículo residente a disco y lo libera de memoria"""
+        with self._lock:
+            if vehicle_id not in self._resident or self._resident[vehicle_id].leases:
+                return False
+            victim = self._detach(vehicle_id)
+        if victim is not None:
+            self._write_spills([victim])
+        return True
+
+    def handoff(self, keep: Callable[[str], bool]) -> int:
+        """
+        Entrega a disco los vehículos para los que keep() es falso (p. ej. los
+        que pasan a otra instancia del clúster). Los snapshots pendientes solo
+        se escriben si son más recientes que el volcado que haya en disco.
+        """
+        with self._lock:
+            leaving = [vid for vid in self._resident if not keep(vid) and not self._resident[vid].leases]
+            victims = [victim for victim in map(self._detach, leaving) if victim is not None]
+            pending = [(vid, self._pending.pop(vid)) for vid in list(self._pending) if not keep(vid)]
+
+        self._write_spills(victims)
+        for vehicle_id, snapshot in pending:
+            if not self.spill_dir:
+                continue
+            spilled = self._load_spill(vehicle_id)
+            if spilled is None or _taken_at(snapshot) > _taken_at(spilled):
+                save_checkpoint(self._spill_path(vehicle_id), {vehicle_id: snapshot})
+
+        with self._lock:
+            moved = len(leaving) + len(pending)
+            self._spilled = {vid for vid in self._spilled if keep(vid)}
+            self.stats["vehicles_handed_off"] += moved
+            return moved
+
+    def adopt_snapshots(self, snapshots: Dict[str, VehicleSnapshot]) -> None:
+        """
+        Registra snapshots restaurados; se materializan en su primer uso.
+        Si para entonces hay un volcado en disco (nuestro o de otra instancia
+        del clúster) se usa el más reciente de los dos.
+        """
+        with self._lock:
+            for vehicle_id, snapshot in snapshots.items():
+                self._spilled.discard(vehicle_id)
+                self._resident.pop(vehicle_id, None)
+                self._pending[vehicle_id] = snapshot
+
+    def snapshot_resident(self) -> Dict[str, VehicleSnapshot]:
+        """Snapshots de los vehículos en memoria (incluidos los pendientes)"""
+        with self._lock:
+            snapshots = dict(self._pending)
+            snapshots.update({vid: vehicle.snapshot() for vid, (_, vehicle) in self._spilling.items()})
+            snapshots.update({vid: vehicle.snapshot() for vid, vehicle in self._resident.items()})
+            return snapshots
+
+    def peek_wear_state(self, vehicle_id: str) -> Optional[VehicleWearState]:
+        """
+        Copia del estado de desgaste sin materializar el vehículo: del estado
+        en memoria, del snapshot pendiente o del volcado en disco (el más
+        reciente). None si el vehículo no existe.
+        """
+        with self._lock:
+            vehicle = self._resident.get(vehicle_id)
+            if vehicle is None and vehicle_id in self._spilling:
+                vehicle = self._spilling[vehicle_id][1]
+            snapshot = self._pending.get(vehicle_id)
+        if vehicle is not None:
+            with vehicle.lock:
+                return copy.deepcopy(vehicle.wear_analyzer.state)
+
+        spilled = self._load_spill(vehicle_id) if self.spill_dir else None
+        if spilled is not None and (snapshot is None or _taken_at(spilled) >= _taken_at(snapshot)):
+            snapshot = spilled
+        if snapshot is None:
+            return None
+        analyzer = WearAnalyzer()
+        analyzer.restore_checkpoint_state(snapshot.scalars["wear"])
+        return analyzer.state
+
+    def reloaded_spills(self) -> Dict[str, int]:
+        """Marcas de los ficheros de volcado conservados (tomarlas junto con snapshot_resident)"""
+        with self._lock:
+            return dict(self._reloaded)
+
+    def release_spills(self, marks: Dict[str, int]) -> int:
+        """
+        Borra los ficheros de volcado ya cubiertos por un checkpoint guardado.
+        Se conserva el de un vehículo que volvió a volcarse o recargarse
+        después de tomar las marcas.
+        """
+        with self._lock:
+            released = 0
+            for vehicle_id, mark in marks.items():
+                if self._reloaded.get(vehicle_id) != mark:
+                    continue
+                del self._reloaded[vehicle_id]
+                path = self._spill_path(vehicle_id)
+                if os.path.exists(path):
+                    os.remove(path)
+                released += 1
+            return released
+
+    def resident(self) -> Iterator[VehicleState]:
+        with self._lock:
+            return iter(list(self._resident.values()))
+
+    def vehicle_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._resident) + list(self._pending) + sorted(self._spilled | set(self._spilling))
+
+    def __contains__(self, vehicle_id: str) -> bool:
+        return (vehicle_id in self._resident or vehicle_id in self._pending
+                or vehicle_id in self._spilled or vehicle_id in self._spilling)
+
+    def __len__(self) -> int:
+        return len(self._resident) + len(self._pending) + len(self._spilled) + len(self._spilling)
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "vehicles_resident": len(self._resident),
+            "vehicles_pending_restore": len(self._pending),
+            "vehicles_on_disk": len(self._spilled),
+            "max_resident": self.max_resident,
+        }
@@ -0,0 +1,208 @@
+"""
+Análisis espectral de vibración para frenos y neumáticos.
+Los mensajes de sensores pueden traer una ventana cruda de vibración
+("vibration_samples", con "vibration_sample_rate" opcional). Las ventanas se
+encolan y se procesan por lotes: todas las de igual longitud y frecuencia de
+muestreo pasan juntas por un único espectro de Welch vectorizado con NumPy.
+
+Con el espectro de cada ventana se siguen:
+- La energía por bandas (VIBRATION["bands"]) con medias móviles rápida y lenta;
+  su cociente indica si la energía de la banda está creciendo.
+- La frecuencia de pico.
+- La firma de rueda: fracción de la energía alrededor del primer y segundo
+  orden de giro de la rueda (frecuencia calculada con la velocidad). Si la
+  firma aparece al frenar, apunta a discos de freno alabeados; si aparece a
+  velocidad de crucero, apunta a una rueda desequilibrada.
+
+El estado persistente son unas pocas medias móviles (memoria constante).
+"""
+
+import math
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .config import VIBRATION
+
+
+class VibrationAnalyzer:
+    """Espectros por lotes de ventanas de vibración y firmas de frenos/ruedas"""
+
+    def __init__(self, config: Dict = None):
+        self.config = config or VIBRATION
+        self.bands = dict(self.config["bands"])
+
+        self.pending: List[tuple] = []  # (muestras, fs, timestamp, velocidad, frenando)
+        self.recent: deque = deque(maxlen=self.config["history_size"])
+        self.windows_processed = 0
+        self.band_fast = {band: 0.0 for band in self.bands}
+        self.band_slow = {band: 0.0 for band in self.bands}
+        self.peak_frequency = 0.0
+        # Firma de rueda: media móvil de evidencia (0-1) y ventanas evaluadas
+        self.scores = {"disc_warp": 0.0, "wheel_imbalance": 0.0}
+        self.windows = {"disc_warp": 0, "wheel_imbalance": 0}
+
+    def add_window(self, samples: Sequence[float], timestamp: float, sample_rate: float = None,
+                   speed: float = 0.0, braking: bool = False) -> None:
+        """Encola una ventana cruda; se procesa al llenarse el lote o al consultar"""
+        samples = np.asarray(samples, dtype=np.float64)
+        if len(samples) < self.config["min_window"]:
+            return
+        fs = float(sample_rate or self.config["sample_rate_hz"])
+        self.pending.append((samples, fs, timestamp, speed, braking))
+        if len(self.pending) >= self.config["batch_size"]:
+            self.process_pending()
+
+    def process_pending(self) -> int:
+        """Procesa las ventanas encoladas; retorna cuántas"""
+        if not self.pending:
+            return 0
+        pending, self.pending = self.pending, []
+        groups: Dict[tuple, List[int]] = {}
+        for i, (samples, fs, _, _, _) in enumerate(pending):
+            groups.setdefault((len(samples), fs), []).append(i)
+
+        summaries: List[Optional[Dict]] = [None] * len(pending)
+        for (_, fs), indices in groups.items():
+            windows = np.stack([pending[i][0] for i in indices])
+            freqs, psd = welch_psd(windows, fs, self.config["segment_size"], self.config["segment_overlap"])
+            speeds = np.array([pending[i][3] for i in indices], dtype=np.float64)
+            for row, summary in enumerate(self._summarize(freqs, psd, speeds)):
+                summaries[indices[row]] = summary
+
+        # Las medias móviles se actualizan en orden de llegada
+        for (_, _, timestamp, speed, braking), summary in zip(pending, summaries):
+            summary["timestamp"] = timestamp
+            summary["braking"] = braking
+            self._track(summary, speed, braking)
+            self.recent.append(summary)
+        return len(pending)
+
+    def _summarize(self, freqs: np.ndarray, psd: np.ndarray, speeds: np.ndarray) -> List[Dict]:
+        """Energía por bandas, pico y fracción en órdenes de rueda de cada ventana"""
+        df = freqs[1] - freqs[0]
+        band_energy = {
+            band: psd[:, (freqs >= low) & (freqs < high)].sum(axis=1) * df
+            for band, (low, high) in self.bands.items()
+        }
+        above_dc = freqs >= self.config["min_frequency_hz"]
+        total = psd[:, above_dc].sum(axis=1) * df
+        peak = freqs[above_dc][np.argmax(psd[:, above_dc], axis=1)]
+
+        # Frecuencia de giro de la rueda (Hz) a partir de la velocidad (km/h)
+        wheel_hz = speeds / 3.6 / (math.pi * self.config["wheel_diameter_m"])
+        # Al menos un bin de resolución a cada lado del orden
+        tolerance = np.maximum(self.config["order_tolerance"] * wheel_hz, df)[:, None]
+        near_order = np.zeros(psd.shape, dtype=bool)
+        for order in (1, 2):
+            near_order |= np.abs(freqs[None, :] - order * wheel_hz[:, None]) <= tolerance
+        order_energy = np.where(near_order & above_dc, psd, 0.0).sum(axis=1) * df
+        order_fraction = np.divide(order_energy, total, out=np.zeros_like(total), where=total > 0)
+
+        return [
+            {
+                "rms": float(math.sqrt(total[i])),
+                "peak_frequency_hz": float(peak[i]),
+                "wheel_frequency_hz": float(wheel_hz[i]),
+                "wheel_order_fraction": float(order_fraction[i]),
+                "band_energy": {band: float(energy[i]) for band, energy in band_energy.items()},
+            }
+            for i in range(len(psd))
+        ]
+
+    def _track(self, summary: Dict, speed: float, braking: bool) -> None:
+        fast, slow = self.config["fast_alpha"], self.config["slow_alpha"]
+        first = self.windows_processed == 0
+        self.windows_processed += 1
+        for band, energy in summary["band_energy"].items():
+            if first:
+                self.band_fast[band] = self.band_slow[band] = energy
+            else:
+                self.band_fast[band] += fast * (energy - self.band_fast[band])
+                self.band_slow[band] += slow * (energy - self.band_slow[band])
+        if first:
+            self.peak_frequency = summary["peak_frequency_hz"]
+        else:
+            self.peak_frequency += fast * (summary["peak_frequency_hz"] - self.peak_frequency)
+
+        if speed < self.config["min_speed_kmh"]:
+            return
+        signature = "disc_warp" if braking else "wheel_imbalance"
+        evidence = float(summary["wheel_order_fraction"] >= self.config["order_energy_ratio"])
+        self.scores[signature] += self.config["score_alpha"] * (evidence - self.scores[signature])
+        self.windows[signature] += 1
+
+    def band_growth(self) -> Dict[str, float]:
+        """Energía reciente frente a la de largo plazo por banda (1 = estable)"""
+        return {
+            band: self.band_fast[band] / self.band_slow[band] if self.band_slow[band] > 0 else 1.0
+            for band in self.bands
+        }
+
+    def signatures(self) -> List[Dict]:
+        """Firmas espectrales vigentes (alabeo de disco, desequilibrio de rueda)"""
+        self.process_pending()
+        growth = self.band_growth()
+        found = []
+        for name, score in self.scores.items():
+            if self.windows[name] < self.config["min_windows"] or score < self.config["score_threshold"]:
+                continue
+            found.append({
+                "signature": name,
+                "score": score,
+                "windows": self.windows[name],
+                "peak_frequency_hz": self.peak_frequency,
+                "band_growth": growth,
+            })
+        return found
+
+    def get_summary(self) -> Dict:
+        self.process_pending()
+        return {
+            "windows_processed": self.windows_processed,
+            "peak_frequency_hz": round(self.peak_frequency, 2),
+            "band_energy": {band: round(energy, 4) for band, energy in self.band_fast.items()},
+            "band_growth": {band: round(ratio, 3) for band, ratio in self.band_growth().items()},
+            "signature_scores": {name: round(score, 3) for name, score in self.scores.items()},
+        }
+
+    def get_checkpoint_state(self) -> Dict:
+        """Medias móviles y contadores (las ventanas recientes no se guardan)"""
+        self.process_pending()
+        return {
+            "windows_processed": self.windows_processed,
+            "band_fast": dict(self.band_fast),
+            "band_slow": dict(self.band_slow),
+            "peak_frequency": self.peak_frequency,
+            "scores": dict(self.scores),
+            "windows": dict(self.windows),
+        }
+
+    def restore_checkpoint_state(self, state: Optional[Dict]) -> None:
+        if not state:
+            return
+        self.windows_processed = state["windows_processed"]
+        for key in ("band_fast", "band_slow", "scores", "windows"):
+            target = getattr(self, key)
+            target.update({name: value for name, value in state[key].items() if name in target})
+        self.peak_frequency = state["peak_frequency"]
+
+
+def welch_psd(windows: np.ndarray, sample_rate: float, segment_size: int,
+              overlap: float = 0.5) -> tuple:
+    """
+    Densidad espectral de Welch de varias ventanas a la vez.
+    `windows` es (n, muestras); retorna (frecuencias, psd (n, frecuencias)).
+    """
+    nperseg = min(segment_size, windows.shape[1])
+    step = max(1, int(nperseg * (1 - overlap)))
+    segments = np.lib.stride_tricks.sliding_window_view(windows, nperseg, axis=1)[:, ::step]
+    segments = segments - segments.mean(axis=2, keepdims=True)
+
+    taper = np.hanning(nperseg)
+    spectra = np.fft.rfft(segments * taper, axis=2)
+    psd = (spectra.real ** 2 + spectra.imag ** 2).mean(axis=1) / (sample_rate * np.dot(taper, taper))
+    # Espectro de un lado: duplicar todo salvo DC (y Nyquist si nperseg es par)
+    psd[:, 1:nperseg // 2 + (nperseg % 2)] *= 2
+    return np.fft.rfftfreq(nperseg, 1 / sample_rate), psd
@@ -6,7 +6,9 @@ Calcula el desgaste acumulado basado en patrones de uso.
 import time
 from dataclasses import dataclass, field
 from typing import Dict, Optional
-from .config import THRESHOLDS, WEAR_WEIGHTS, MAINTENANCE_INTERVALS
+from .config import WEAR_WEIGHTS, MAINTENANCE_INTERVALS
+from .threshold_profiles import ThresholdProfile, DEFAULT_PROFILE
+from .event_clock import EventClock, resolve_event_time
 
 
 @dataclass
@@ -71,6 +73,10 @@ class VehicleWearState:
             "overall_health": self._calculate_overall_health()
         }
     
+    @property
+    def overall_health(self) -> float:
+        return self._calculate_overall_health()
+    
     def _calculate_overall_health(self) -> float:
         components = [self.engine, self.brakes, self.transmission, self.tires, self.battery]
         return round(sum(c.health_score for c in components) / len(components), 2)
@@ -80,11 +86,19 @@ class WearAnalyzer:
     """
     Analizador de desgaste vehicular.
     Procesa datos de sensores y calcula el desgaste de componentes.
+    Todo el cálculo se guía por el tiempo de evento de los mensajes. Cada
+    flujo (OBD y sensores) mide el tiempo transcurrido con su propio reloj.
+    Los mensajes de sensores llegan fusionados con el OBD alineado en el
+    tiempo (ver stream_join), del que toman la velocidad.
+    Los umbrales son los del perfil compilado del vehículo (threshold_profiles).
     """
     
-    def __init__(self):
+    def __init__(self, max_out_of_order: float = None, thresholds: ThresholdProfile = None):
         self.state = VehicleWearState()
-        self.last_update = time.time()
+        self.thresholds = thresholds or DEFAULT_PROFILE
+        self.clock = EventClock(max_out_of_order)
+        self.sensor_clock = EventClock(max_out_of_order)
+        self.last_update: Optional[float] = None  # último tiempo de evento OBD
         self.last_obd_data: Dict = {}
         self.last_sensor_data: Dict = {}
         
@@ -95,10 +109,21 @@ class WearAnalyzer:
         self.state.tires.hours_until_maintenance = MAINTENANCE_INTERVALS["tire_rotation"]
         self.state.battery.hours_until_maintenance = MAINTENANCE_INTERVALS["coolant_check"]
     
-    def process_obd_data(self, obd_data: Dict) -> None:
-        """Procesa datos OBD y actualiza estado de desgaste"""
-        current_time = time.time()
-        delta_seconds = current_time - self.last_update
+    def process_obd_data(self, obd_data: Dict, timestamp: float = None) -> bool:
+        """
+        Procesa datos OBD y actualiza estado de desgaste.
+        Retorna False si el mensaje llegó fuera de la tolerancia de desorden.
+        Un mensaje atrasado pero aceptado no se compara con el OBD anterior ni
+        lo sustituye: ese OBD es más reciente que él.
+        """
+        event_time = resolve_event_time(obd_data, timestamp)
+        if not self.clock.accept(event_time):
+            return False
+        in_order = self.clock.is_in_order(event_time)
+        
+        if self.last_update is None:
+            self.state.start_time = event_time
+        delta_seconds = self.clock.advance(event_time)
         delta_hours = delta_seconds / 3600
         
         rpm = obd_data.get("rpm", 0)
@@ -116,7 +141,7 @@ class WearAnalyzer:
         self._analyze_transmission(rpm, speed, throttle, delta_seconds)
         
         # Detectar frenado brusco
-        if self.last_obd_data:
+        if in_order and self.last_obd_data:
             prev_speed = self.last_obd_data.get("speed", 0)
             if prev_speed - speed > 20:  # Reducción brusca de velocidad
                 self.state.hard_braking_count += 1
@@ -124,46 +149,56 @@ class WearAnalyzer:
         # Actualizar contadores de mantenimiento
         self._update_maintenance_counters(delta_hours)
         
-        self.last_obd_data = obd_data.copy()
-        self.last_update = current_time
+        if in_order:
+            self.last_obd_data = obd_data.copy()
+        self.last_update = self.clock.watermark
+        return True
     
-    def process_sensor_data(self, sensor_data: Dict) -> None:
-        """Procesa datos de sensores ambientales"""
-        current_time = time.time()
-        delta_seconds = current_time - self.last_update
+    def process_sensor_data(self, sensor_data: Dict, timestamp: float = None) -> bool:
+        """
+        Procesa datos de sensores ambientales (fila fusionada con el OBD
+        alineado; sin pareja la velocidad cuenta como 0).
+        Retorna False si el mensaje llegó fuera de la tolerancia de desorden.
+        """
+        event_time = resolve_event_time(sensor_data, timestamp)
+        if not self.sensor_clock.accept(event_time):
+            return False
+        delta_seconds = self.sensor_clock.advance(event_time)
         
         temperature = sensor_data.get("temperature", 25)
         pressure = sensor_data.get("pressure", 101)
         vibration = sensor_data.get("vibration", 0)
+        speed = sensor_data.get("speed", 0)
         
         # Análisis de frenos (vibración)
         self._analyze_brakes(vibration, delta_seconds)
         
         # Análisis de neumáticos
-        self._analyze_tires(pressure, vibration, delta_seconds)
+        self._analyze_tires(pressure, vibration, speed, delta_seconds)
         
         # Análisis de batería (temperatura ambiente)
         self._analyze_battery(temperature)
         
         self.last_sensor_data = sensor_data.copy()
+        return True
     
     def _analyze_engine(self, rpm: float, coolant_temp: float, throttle: float, delta_s: float) -> None:
         """Analiza desgaste del motor"""
-        thresholds = THRESHOLDS["engine"]
+        t = self.thresholds
         stress = 0.0
         
         # RPM alto
-        if rpm > thresholds["rpm_max"]:
+        if rpm > t.rpm_max:
             self.state.high_rpm_seconds += delta_s
             stress += 0.5
-        if rpm > thresholds["rpm_critical"]:
+        if rpm > t.rpm_critical:
             stress += 0.5
         
         # Sobrecalentamiento
-        if coolant_temp > thresholds["coolant_temp_warning"]:
+        if coolant_temp > t.coolant_temp_warning:
             self.state.overheating_seconds += delta_s
             stress += 0.3
-        if coolant_temp > thresholds["coolant_temp_critical"]:
+        if coolant_temp > t.coolant_temp_critical:
             stress += 0.7
         
         # Aceleración agresiva
@@ -178,13 +213,13 @@ class WearAnalyzer:
     
     def _analyze_brakes(self, vibration: float, delta_s: float) -> None:
         """Analiza desgaste de frenos"""
-        thresholds = THRESHOLDS["brakes"]
+        t = self.thresholds
         stress = 0.0
         
-        if vibration > thresholds["vibration_warning"]:
+        if vibration > t.brake_vibration_warning:
             self.state.high_vibration_seconds += delta_s
             stress += 0.4
-        if vibration > thresholds["vibration_critical"]:
+        if vibration > t.brake_vibration_critical:
             stress += 0.6
         
         # Factor de frenados bruscos
@@ -202,7 +237,7 @@ class WearAnalyzer:
         # Ratio RPM/velocidad anómalo (indica estrés en transmisión)
         if speed > 0:
             ratio = rpm / speed
-            if ratio > THRESHOLDS["transmission"]["rpm_speed_ratio_warning"]:
+            if ratio > self.thresholds.rpm_speed_ratio_warning:
                 stress += 0.5
         
         # Alta carga (throttle alto + RPM alto)
@@ -214,22 +249,21 @@ class WearAnalyzer:
         self.state.transmission.wear_percentage = min(100, wear_rate)
         self.state.transmission.health_score = max(0, 100 - self.state.transmission.wear_percentage)
     
-    def _analyze_tires(self, pressure: float, vibration: float, delta_s: float) -> None:
+    def _analyze_tires(self, pressure: float, vibration: float, speed: float, delta_s: float) -> None:
         """Analiza desgaste de neumáticos"""
-        thresholds = THRESHOLDS["tires"]
+        t = self.thresholds
         stress = 0.0
         
         # Presión anómala
-        if pressure < thresholds["pressure_min"] or pressure > thresholds["pressure_max"]:
+        if pressure < t.tire_pressure_min or pressure > t.tire_pressure_max:
             self.state.pressure_anomaly_seconds += delta_s
             stress += 0.4
         
         # Vibración alta
-        if vibration > thresholds["vibration_warning"]:
+        if vibration > t.tire_vibration_warning:
             stress += 0.3
         
-        # Velocidad alta (del último OBD)
-        speed = self.last_obd_data.get("speed", 0)
+        # Velocidad alta (del OBD alineado con la lectura)
         if speed > 120:
             stress += 0.3
         
@@ -240,10 +274,10 @@ class WearAnalyzer:
     
     def _analyze_battery(self, ambient_temp: float) -> None:
         """Analiza estado de batería"""
-        thresholds = THRESHOLDS["battery"]
+        t = self.thresholds
         
         # Temperatura extrema afecta batería
-        if ambient_temp < thresholds["temp_min"] or ambient_temp > thresholds["temp_max"]:
+        if ambient_temp < t.battery_temp_min or ambient_temp > t.battery_temp_max:
             self.state.battery.accumulated_stress += 0.1
         
         wear_rate = self.state.battery.accumulated_stress / 1000
@@ -260,6 +294,58 @@ class WearAnalyzer:
         """Retorna estado actual de desgaste"""
         return self.state.to_dict()
     
+    def get_checkpoint_state(self) -> Dict:
+        """Estado interno completo para checkpoints"""
+        state = self.state
+        return {
+            "components": {
+                name: {
+                    "wear_percentage": comp.wear_percentage,
+                    "health_score": comp.health_score,
+                    "hours_until_maintenance": comp.hours_until_maintenance,
+                    "last_maintenance": comp.last_maintenance,
+                    "accumulated_stress": comp.accumulated_stress,
+                }
+                for name, comp in self._components().items()
+            },
+            "high_rpm_seconds": state.high_rpm_seconds,
+            "overheating_seconds": state.overheating_seconds,
+            "hard_braking_count": state.hard_braking_count,
+            "high_vibration_seconds": state.high_vibration_seconds,
+            "pressure_anomaly_seconds": state.pressure_anomaly_seconds,
+            "start_time": state.start_time,
+            "total_runtime_hours": state.total_runtime_hours,
+            "watermark": self.clock.watermark,
+            "sensor_watermark": self.sensor_clock.watermark,
+            "last_update": self.last_update,
+            "last_obd_data": self.last_obd_data,
+            "last_sensor_data": self.last_sensor_data,
+        }
+    
+    def restore_checkpoint_state(self, data: Dict) -> None:
+        """Restaura el estado guardado con get_checkpoint_state"""
+        for name, comp in self._components().items():
+            for key, value in data["components"].get(name, {}).items():
+                setattr(comp, key, value)
+        for key in ["high_rpm_seconds", "overheating_seconds", "hard_braking_count",
+                    "high_vibration_seconds", "pressure_anomaly_seconds",
+                    "start_time", "total_runtime_hours"]:
+            setattr(self.state, key, data[key])
+        self.clock.watermark = data["watermark"]
+        self.sensor_clock.watermark = data.get("sensor_watermark")
+        self.last_update = data["last_update"]
+        self.last_obd_data = dict(data["last_obd_data"])
+        self.last_sensor_data = dict(data["last_sensor_data"])
+    
+    def _components(self) -> Dict[str, ComponentWear]:
+        return {
+            "engine": self.state.engine,
+            "brakes": self.state.brakes,
+            "transmission": self.state.transmission,
+            "tires": self.state.tires,
+            "battery": self.state.battery,
+        }
+    
     def reset_maintenance(self, component: str) -> None:
         """Resetea contador de mantenimiento para un componente"""
         intervals = {
@@ -273,4 +359,4 @@ class WearAnalyzer:
         if hasattr(self.state, component):
             comp = getattr(self.state, component)
             comp.hours_until_maintenance = intervals.get(component, 500)
-            comp.last_maintenance = time.time()
+            comp.last_maintenance = self.last_update or time.time()
@@ -0,0 +1,308 @@
+"""
+Proyecciones what-if del desgaste.
+Responde a preguntas como "¿qué pasa con frenos y motor si este conductor
+sigue conduciendo como data/extreme.csv otras 200 horas?": parte del
+VehicleWearState actual de cada vehículo y repite en bucle un perfil de
+conducción (un CSV de telemetría como los de data/, una fila OBD + sensores
+cada `sample_interval` segundos).
+
+El estrés de cada fila se calcula con las mismas fórmulas que
+FleetWearKernel (obd_row_stress/sensor_row_stress). Como el perfil se
+repite, el estrés acumulado tras n filas (C ciclos completos y r filas más)
+tiene forma cerrada a partir de las sumas prefijas del perfil:
+
+    lineal:     C * suma(ciclo) + prefijo(r)
+    frenadas:   0.1 * (n * H0 + P * B * C(C-1)/2 + C * G(P) + r * C * B + G(r))
+
+con H0 las frenadas bruscas acumuladas del vehículo, B las del ciclo, P las
+filas del ciclo y G el prefijo de las frenadas acumuladas dentro del ciclo.
+Así todos los vehículos, perfiles y horizontes se proyectan con operaciones
+de arrays, sin simular fila a fila. La fila anterior a la primera del perfil
+es la última (el perfil se trata como un ciclo).
+
+El estrés depende de los umbrales del vehículo: los vehículos se agrupan por
+perfil de umbrales (threshold_profiles) y cada grupo usa su propia tabla.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+
+from .config import RUL, WHAT_IF
+from .wear_models import VehicleWearState
+from .threshold_profiles import ThresholdProfile, DEFAULT_PROFILE
+from .backfill import load_telemetry_columns
+from .fleet_wear import (COMPONENTS, BRAKES, WEAR_SCALE, DEFAULTS, COUNTERS, HIGH_RPM, OVERHEATING,
+                         HARD_BRAKING, HIGH_VIBRATION, PRESSURE_ANOMALY, RUNTIME, HARD_BRAKING_DROP,
+                         BRAKING_STRESS, obd_row_stress, sensor_row_stress)
+
+# Magnitudes acumuladas por fila del perfil (columnas de _ProfileTable.cumulative)
+QUANTITIES = ("engine", "brakes", "transmission", "tires", "battery", "high_rpm", "overheating",
+              "high_vibration", "pressure_anomaly", "hard_braking", "braking_sum", "seconds")
+QUANTITY = {name: index for index, name in enumerate(QUANTITIES)}
+
+
+@dataclass
+class DrivingProfile:
+    """Perfil de conducción que se repite en bucle"""
+    name: str
+    columns: Dict[str, np.ndarray]   # métricas por fila (valores por defecto ya aplicados)
+    dt: np.ndarray                   # segundos que representa cada fila
+
+    @classmethod
+    def load(cls, source: Union[str, Dict], name: str = None, sample_interval: float = None) -> "DrivingProfile":
+        """Carga un perfil desde un CSV, un Parquet o un dict de arrays (ver load_telemetry_columns)"""
+        sample_interval = sample_interval or WHAT_IF["sample_interval_seconds"]
+        columns = load_telemetry_columns(source, sample_interval)
+        ts = columns.pop("timestamp")
+        if not len(ts):
+            raise ValueError(f"Perfil de conducción vacío: {source}")
+        # Cada fila dura hasta la siguiente; la última, como el paso medio
+        dt = np.diff(ts, append=ts[-1] + (np.mean(np.diff(ts)) if len(ts) > 1 else sample_interval))
+        values = {}
+        for metric, default in DEFAULTS.items():
+            column = columns.get(metric)
+            values[metric] = (np.full(len(ts), default) if column is None
+                              else np.where(np.isnan(column), default, column))
+        if name is None:
+            name = source.rsplit("/", 1)[-1].rsplit(".", 1)[0] if isinstance(source, str) else "profile"
+        return cls(name, values, np.maximum(dt, 0.0))
+
+    @property
+    def cycle_seconds(self) -> float:
+        return float(self.dt.sum())
+
+    def __len__(self) -> int:
+        return len(self.dt)
+
+
+class _ProfileTable:
+    """Sumas prefijas por fila de varios perfiles, en arrays rellenados (perfiles, filas + 1)"""
+
+    def __init__(self, profiles: Sequence[DrivingProfile], thresholds: ThresholdProfile = DEFAULT_PROFILE):
+        lengths = np.array([len(profile) for profile in profiles])
+        self.rows = lengths
+        width = int(lengths.max()) + 1
+        self.cumulative = np.zeros((len(profiles), width, len(QUANTITIES)))
+
+        # Todas las filas de todos los perfiles en una sola pasada por las fórmulas
+        v = {metric: np.concatenate([p.columns[metric] for p in profiles]) for metric in DEFAULTS}
+        dt = np.concatenate([profile.dt for profile in profiles])
+        obd = obd_row_stress(v["rpm"], v["speed"], v["coolant_temp"], v["throttle"], thresholds)
+        sensor = sensor_row_stress(v["temperature"], v["pressure"], v["vibration"], v["speed"], thresholds)
+        # Velocidad del OBD anterior dentro del ciclo (la primera fila sigue a la última)
+        previous = np.concatenate([np.roll(p.columns["speed"], 1) for p in profiles])
+        hard_braking = (previous - v["speed"] > HARD_BRAKING_DROP).astype(float)
+
+        per_row = np.empty((len(dt), len(QUANTITIES)))
+        per_row[:, QUANTITY["engine"]] = obd["engine"] * dt
+        per_row[:, QUANTITY["transmission"]] = obd["transmission"] * dt
+        per_row[:, QUANTITY["brakes"]] = sensor["brakes"] * dt
+        per_row[:, QUANTITY["tires"]] = sensor["tires"] * dt
+        per_row[:, QUANTITY["battery"]] = sensor["battery"]
+        per_row[:, QUANTITY["high_rpm"]] = obd["high_rpm"] * dt
+        per_row[:, QUANTITY["overheating"]] = obd["overheating"] * dt
+        per_row[:, QUANTITY["high_vibration"]] = sensor["high_vibration"] * dt
+        per_row[:, QUANTITY["pressure_anomaly"]] = sensor["pressure_anomaly"] * dt
+        per_row[:, QUANTITY["hard_braking"]] = hard_braking
+        per_row[:, QUANTITY["seconds"]] = dt
+
+        start = 0
+        for index, length in enumerate(lengths):
+            block = per_row[start:start + length]
+            # Frenadas del ciclo vistas por cada fila de sensores (incluye la de su OBD)
+            block[:, QUANTITY["braking_sum"]] = np.cumsum(block[:, QUANTITY["hard_braking"]])
+            cumulative = self.cumulative[index]
+            cumulative[1:length + 1] = np.cumsum(block, axis=0)
+            cumulative[length + 1:] = cumulative[length]   # relleno: nunca se indexa más allá de P
+            start += length
+
+        self.cycle = self.cumulative[np.arange(len(profiles)), lengths]   # (perfiles, magnitudes)
+
+    def project(self, seconds: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Ciclos completos C, filas sueltas r y magnitudes acumuladas del
+        perfil tras `seconds` (perfiles, puntos).
+        """
+        n_profiles, width, _ = self.cumulative.shape
+        cycle_seconds = self.cycle[:, QUANTITY["seconds"]][:, None]
+        safe_cycle = np.where(cycle_seconds > 0, cycle_seconds, 1.0)
+        cycles = np.where(cycle_seconds > 0, np.floor(seconds / safe_cycle), 0.0)
+        remainder = seconds - cycles * cycle_seconds
+
+        # Filas completas del ciclo en curso: búsqueda en los segundos acumulados
+        # de todos los perfiles a la vez, desplazando cada perfil para que el
+        # array aplanado siga ordenado
+        elapsed = self.cumulative[:, :, QUANTITY["seconds"]]
+        shift = (np.arange(n_profiles) * (elapsed.max() + 1.0))[:, None]
+        flat = (elapsed + shift).ravel()
+        index = np.searchsorted(flat, (remainder + shift).ravel(), side="right").reshape(remainder.shape)
+        rows = np.minimum(index - 1 - np.arange(n_profiles)[:, None] * width, self.rows[:, None] - 1)
+        rows = np.maximum(rows, 0)
+
+        partial = self.cumulative[np.arange(n_profiles)[:, None], rows]    # (perfiles, puntos, magnitudes)
+        totals = cycles[:, :, None] * self.cycle[:, None, :] + partial
+        return {"cycles": cycles, "rows": rows, "totals": totals}
+
+
+@dataclass
+class WhatIfResult:
+    """Proyecciones de vehículos x perfiles en los puntos `hours`"""
+    vehicle_ids: List[str]
+    profiles: List[str]
+    hours: np.ndarray                    # (puntos,) horas desde ahora
+    health: np.ndarray                   # (vehículos, perfiles, puntos, componentes)
+    wear: np.ndarray                     # (vehículos, perfiles, puntos, componentes)
+    stress: np.ndarray                   # (vehículos, perfiles, componentes) al final
+    counters: np.ndarray                 # (vehículos, perfiles, COUNTERS) al final
+    hours_until_maintenance: np.ndarray  # (vehículos, perfiles, componentes) al final
+    hours_to_failure: np.ndarray         # (vehículos, perfiles, componentes); inf = no falla
+
+    def wear_state(self, vehicle: int, profile: int) -> VehicleWearState:
+        """Estado proyectado al final del horizonte (mismo formato que WearAnalyzer)"""
+        state = VehicleWearState()
+        for index, name in enumerate(COMPONENTS):
+            component = getattr(state, name)
+            component.accumulated_stress = float(self.stress[vehicle, profile, index])
+            component.wear_percentage = float(self.wear[vehicle, profile, -1, index])
+            component.health_score = float(self.health[vehicle, profile, -1, index])
+            component.hours_until_maintenance = float(self.hours_until_maintenance[vehicle, profile, index])
+        for index, name in enumerate(COUNTERS):
+            value = float(self.counters[vehicle, profile, index])
+            setattr(state, name, int(round(value)) if name == "hard_braking_count" else value)
+        return state
+
+    def scenario(self, vehicle: int, profile: int) -> Dict:
+        failure = self.hours_to_failure[vehicle, profile]
+        return {
+            "vehicle_id": self.vehicle_ids[vehicle],
+            "profile": self.profiles[profile],
+            "hours": float(self.hours[-1]),
+            "projected_state": self.wear_state(vehicle, profile).to_dict(),
+            "health_trajectory": {
+                name: [round(float(h), 2) for h in self.health[vehicle, profile, :, index]]
+                for index, name in enumerate(COMPONENTS)
+            },
+            "trajectory_hours": [round(float(h), 2) for h in self.hours],
+            "hours_to_failure": {
+                name: None if np.isinf(failure[index]) else round(float(failure[index]), 1)
+                for index, name in enumerate(COMPONENTS)
+            },
+        }
+
+    def to_dicts(self) -> List[Dict]:
+        return [self.scenario(v, p) for v in range(len(self.vehicle_ids)) for p in range(len(self.profiles))]
+
+
+def _state_arrays(states: Sequence[VehicleWearState]) -> Dict[str, np.ndarray]:
+    return {
+        "stress": np.array([[getattr(s, name).accumulated_stress for name in COMPONENTS] for s in states]),
+        "maintenance": np.array([[getattr(s, name).hours_until_maintenance for name in COMPONENTS] for s in states]),
+        "counters": np.array([[float(getattr(s, name)) for name in COUNTERS] for s in states]),
+    }
+
+
+def project_wear(states: Sequence[VehicleWearState], profiles: Sequence[DrivingProfile],
+                 hours: float, points: int = None, vehicle_ids: Sequence[str] = None,
+                 failure_health: float = None,
+                 thresholds: Union[ThresholdProfile, Sequence[ThresholdProfile], None] = None) -> WhatIfResult:
+    """
+    Proyecta cada estado con cada perfil durante `hours` horas. Retorna la
+    salud en `points` instantes equiespaciados (el último, el horizonte) y
+    las horas hasta que cada componente baja de `failure_health`.
+    `thresholds` es el perfil de umbrales de todos los vehículos o uno por
+    vehículo (por defecto, THRESHOLDS).
+    """
+    points = points or WHAT_IF["points"]
+    failure_health = RUL["failure_health"] if failure_health is None else failure_health
+    vehicle_ids = list(vehicle_ids) if vehicle_ids is not None else [str(i) for i in range(len(states))]
+    if thresholds is None or isinstance(thresholds, ThresholdProfile):
+        thresholds = [thresholds or DEFAULT_PROFILE] * len(states)
+    grid = np.linspace(0.0, hours, points + 1)[1:] if points > 1 else np.array([float(hours)])
+
+    # Una tabla de perfiles de conducción por perfil de umbrales
+    groups: Dict[str, List[int]] = {}
+    for index, profile in enumerate(thresholds):
+        groups.setdefault(profile.name, []).append(index)
+    arrays: Dict[str, np.ndarray] = {}
+    for members in groups.values():
+        table = _ProfileTable(profiles, thresholds[members[0]])
+        part = _project_group([states[i] for i in members], table, grid, failure_health)
+        for key, values in part.items():
+            if key not in arrays:
+                arrays[key] = np.empty((len(states),) + values.shape[1:])
+            arrays[key][members] = values
+
+    return WhatIfResult(
+        vehicle_ids=vehicle_ids,
+        profiles=[profile.name for profile in profiles],
+        hours=grid,
+        **arrays,
+    )
+
+
+def _project_group(states: Sequence[VehicleWearState], table: _ProfileTable, grid: np.ndarray,
+                   failure_health: float) -> Dict[str, np.ndarray]:
+    """Proyección de vehículos con los mismos umbrales (campos de WhatIfResult por vehículo)"""
+    n_profiles = len(table.rows)
+    initial = _state_arrays(states)
+    h0 = initial["counters"][:, HARD_BRAKING]                         # (vehículos,)
+
+    projected = table.project(np.broadcast_to(grid * 3600.0, (n_profiles, len(grid))))
+    totals, cycles, rows = projected["totals"], projected["cycles"], projected["rows"]
+    q = QUANTITY
+    period = table.rows[:, None].astype(float)                        # filas por ciclo P
+    n_rows = cycles * period + rows                                   # filas aplicadas n
+    braking_cycle = table.cycle[:, q["hard_braking"]][:, None]        # B
+
+    # Estrés añadido por el perfil (perfiles, puntos, componentes); totals ya
+    # trae C * G(P) + G(r) y el término de frenadas que depende de H0 se suma
+    # por vehículo
+    added = totals[:, :, [q[name] for name in COMPONENTS]].copy()
+    added[:, :, BRAKES] += BRAKING_STRESS * (
+        period * braking_cycle * cycles * (cycles - 1) / 2 + rows * cycles * braking_cycle
+        + totals[:, :, q["braking_sum"]]
+    )
+    stress = initial["stress"][:, None, None, :] + added[None]
+    stress[..., BRAKES] += BRAKING_STRESS * n_rows[None] * h0[:, None, None]
+    wear = np.minimum(100.0, stress / WEAR_SCALE)
+    health = np.maximum(0.0, 100.0 - wear)
+
+    # Contadores y mantenimiento al final del horizonte
+    end = totals[:, -1, :]                                            # (perfiles, magnitudes)
+    elapsed_hours = end[:, q["seconds"]] / 3600.0
+    counters = np.repeat(initial["counters"][:, None, :], n_profiles, axis=1)
+    for counter, quantity in ((HIGH_RPM, "high_rpm"), (OVERHEATING, "overheating"),
+                              (HARD_BRAKING, "hard_braking"), (HIGH_VIBRATION, "high_vibration"),
+                              (PRESSURE_ANOMALY, "pressure_anomaly")):
+        counters[:, :, counter] += end[:, q[quantity]]
+    counters[:, :, RUNTIME] += elapsed_hours
+    maintenance = np.maximum(0.0, initial["maintenance"][:, None, :] - elapsed_hours[None, :, None])
+
+    # Horas hasta el fallo, resolviendo s(c) = s0 + alpha*c + beta*c^2 en ciclos
+    # (beta solo es distinto de 0 en frenos, por las frenadas acumuladas)
+    target = (100.0 - failure_health) * WEAR_SCALE
+    remaining = np.maximum(0.0, target - initial["stress"])[:, None, :]             # (vehículos, 1, comp.)
+    alpha = np.repeat(table.cycle[:, [q[name] for name in COMPONENTS]][None], len(states), axis=0)
+    beta = np.zeros_like(alpha)
+    p_rows = table.rows.astype(float)[None, :]
+    braking = table.cycle[:, q["hard_braking"]][None, :]
+    alpha[..., BRAKES] += BRAKING_STRESS * (p_rows * h0[:, None] + table.cycle[:, q["braking_sum"]][None, :]
+                                            - p_rows * braking / 2)
+    beta[..., BRAKES] = BRAKING_STRESS * p_rows * braking / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quadratic = (-alpha + np.sqrt(alpha ** 2 + 4 * beta * remaining)) / (2 * beta)
+        linear = remaining / alpha
+    cycles_to_failure = np.where(beta > 0, quadratic, np.where(alpha > 0, linear, np.inf))
+    cycles_to_failure = np.where(remaining <= 0, 0.0, cycles_to_failure)
+    hours_to_failure = cycles_to_failure * table.cycle[:, q["seconds"]][None, :, None] / 3600.0
+
+    return {
+        "health": health,
+        "wear": wear,
+        "stress": stress[:, :, -1, :],
+        "counters": counters,
+        "hours_until_maintenance": maintenance,
+        "hours_to_failure": hours_to_failure,
+    }
@@ -23,6 +23,19 @@ def main():
     username = os.getenv("MQTT_USERNAME")
     password = os.getenv("MQTT_PASSWORD")
     use_tls = os.getenv("MQTT_USE_TLS", "false").lower() == "true"
+    cluster_group = os.getenv("BRAIN_CLUSTER_GROUP")
+    instance_id = os.getenv("BRAIN_INSTANCE_ID")
+    default_checkpoint = "checkpoints/brain_state.npz"
+    if cluster_group and instance_id:
+        default_checkpoint = f"checkpoints/brain_state-{instance_id}.npz"
+    checkpoint_path = os.getenv("BRAIN_CHECKPOINT_PATH", default_checkpoint)
+    checkpoint_interval = float(os.getenv("BRAIN_CHECKPOINT_INTERVAL", "60"))
+    memory_budget_mb = float(os.getenv("BRAIN_MEMORY_BUDGET_MB", "512"))
+    spill_dir = os.getenv("BRAIN_SPILL_DIR", "checkpoints/spill")
+    num_workers = int(os.getenv("BRAIN_INGEST_WORKERS", "4"))
+    profile = os.getenv("BRAIN_PROFILE", "false").lower() == "true"
+    profile_dump_interval = float(os.getenv("BRAIN_PROFILE_DUMP_SECONDS", "0"))
+    threshold_profiles_dir = os.getenv("BRAIN_THRESHOLD_PROFILES_DIR")
     
     # Crear e iniciar motor predictivo
     engine = PredictiveEngine(
@@ -30,15 +43,30 @@ def main():
         port=port,
         username=username,
         password=password,
-        use_tls=use_tls
+        use_tls=use_tls,
+        checkpoint_path=checkpoint_path,
+        checkpoint_interval=checkpoint_interval,
+        memory_budget_mb=memory_budget_mb,
+        spill_dir=spill_dir,
+        num_workers=num_workers,
+        cluster_group=cluster_group,
+        instance_id=instance_id,
+        profile=profile,
+        profile_dump_interval=profile_dump_interval,
+        threshold_profiles_dir=threshold_profiles_dir
     )
     
+    # Recuperar desgaste acumulado, historial y cooldowns del último arranque
+    engine.restore_checkpoint()
+    
     if engine.connect():
         print("\n" + "="*60)
         print("🧠 CEREBRO PREDICTIVO ACTIVO")
         print("="*60)
         print(f"Broker: {broker}:{port}")
         print(f"TLS: {'Sí' if use_tls else 'No'}")
+        if engine.cluster:
+            print(f"Clúster: {engine.cluster.group} (instancia {engine.cluster.instance_id})")
         print("-"*60)
         print("Topics de entrada:")
         print("  - boomapp/vehicle/obd")
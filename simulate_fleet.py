@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Generador de carga para el cerebro predictivo.
+Publica datos OBD y de sensores sintéticos de N vehículos en
+boomapp/vehicle/<vehicle_id>/obd y boomapp/vehicle/<vehicle_id>/sensors.
+
+Uso:
+    python simulate_fleet.py --vehicles 200 --rate 50 --duration 60
+"""
+
+import argparse
+import json
+import random
+import time
+
+import paho.mqtt.client as mqtt
+
+
+def make_obd(rng: random.Random) -> dict:
+    return {
+        "rpm": rng.uniform(800, 6500),
+        "speed": rng.uniform(0, 140),
+        "coolant_temp": rng.uniform(85, 112),
+        "throttle": rng.uniform(0, 100),
+        "fuel_level": rng.uniform(10, 100),
+        "timestamp": time.time(),
+    }
+
+
+def make_sensors(rng: random.Random) -> dict:
+    return {
+        "temperature": rng.uniform(20, 45),
+        "pressure": rng.uniform(95, 105),
+        "vibration": rng.uniform(0, 8),
+        "humidity": rng.uniform(30, 70),
+        "timestamp": time.time(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador de flota para BoomApp")
+    parser.add_argument("--broker", default="localhost")
+    parser.add_argument("--port", type=int, default=1883)
+    parser.add_argument("--vehicles", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=20, help="mensajes OBD por segundo (total)")
+    parser.add_argument("--duration", type=float, default=60, help="segundos")
+    args = parser.parse_args()
+
+    client = mqtt.Client(client_id=f"boomapp_fleet_sim_{random.randint(0, 99999)}")
+    client.connect(args.broker, args.port, 60)
+    client.loop_start()
+
+    rng = random.Random(42)
+    vehicle_ids = [f"veh-{i:04d}" for i in range(args.vehicles)]
+    interval = 1.0 / args.rate
+    sent = 0
+    start = time.time()
+
+    print(f"Publicando {args.vehicles} vehículos a {args.rate} msg/s durante {args.duration}s...")
+    try:
+        while time.time() - start < args.duration:
+            vehicle_id = vehicle_ids[sent % len(vehicle_ids)]
+            client.publish(f"boomapp/vehicle/{vehicle_id}/obd", json.dumps(make_obd(rng)))
+            client.publish(f"boomapp/vehicle/{vehicle_id}/sensors", json.dumps(make_sensors(rng)))
+            sent += 1
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.loop_stop()
+        client.disconnect()
+
+    print(f"✓ {sent} mensajes OBD y {sent} de sensores publicados")
+
+
+if __name__ == "__main__":
+    main()
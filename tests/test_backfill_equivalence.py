@@ -0,0 +1,92 @@
+"""
+El backfill vectorizado (WearBackfill) debe producir el mismo desgaste,
+pronósticos y contadores que el camino de streaming (StreamJoiner +
+WearAnalyzer + FuturePredictor) sobre la misma telemetría.
+"""
+
+import glob
+import json
+import os
+
+import numpy as np
+import pytest
+
+from boomapp.predictive_brain import WearAnalyzer, FuturePredictor
+from boomapp.predictive_brain.backfill import (
+    WearBackfill, load_telemetry_columns, OBD_COLUMNS, SENSOR_COLUMNS, COMPONENTS,
+)
+from boomapp.predictive_brain.stream_join import StreamJoiner
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+def _normalize(value):
+    """Sin marcas de tiempo de generación y con floats redondeados"""
+    if isinstance(value, dict):
+        return {key: _normalize(item) for key, item in value.items() if key != "timestamp"}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if isinstance(value, float):
+        return round(value, 6)
+    return value
+
+
+def _stream(columns):
+    wear, predictor, joiner = WearAnalyzer(), FuturePredictor(), StreamJoiner()
+
+    def apply(records):
+        for record in records:
+            if record.source == "obd":
+                wear.process_obd_data(record.values, record.timestamp)
+                predictor.record_obd_data(record.values, record.timestamp)
+            else:
+                wear.process_sensor_data(record.values, record.timestamp)
+                predictor.record_sensor_data(record.values, record.timestamp)
+
+    for i, timestamp in enumerate(columns["timestamp"]):
+        timestamp = float(timestamp)
+        apply(joiner.push("obd", {k: float(columns[k][i]) for k in OBD_COLUMNS if k in columns}, timestamp))
+        apply(joiner.push("sensors", {k: float(columns[k][i]) for k in SENSOR_COLUMNS if k in columns}, timestamp))
+    apply(joiner.flush(force=True))
+    forecasts = {c: predictor.get_component_forecast(c, getattr(wear.state, c).health_score) for c in COMPONENTS}
+    return wear, forecasts, predictor
+
+
+def _random_columns(rows=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "timestamp": np.cumsum(rng.uniform(0.1, 2, rows)),
+        "rpm": rng.uniform(700, 7500, rows),
+        "speed": rng.uniform(0, 180, rows),
+        "coolant_temp": rng.uniform(80, 115, rows),
+        "throttle": rng.uniform(0, 100, rows),
+        "temperature": rng.uniform(-20, 50, rows),
+        "pressure": rng.uniform(90, 115, rows),
+        "vibration": rng.uniform(0, 10, rows),
+    }
+
+
+SCENARIOS = sorted(glob.glob(os.path.join(DATA_DIR, "*.csv")))
+
+
+@pytest.mark.parametrize("source", SCENARIOS + ["random"], ids=lambda s: os.path.basename(s))
+def test_backfill_matches_streaming(source):
+    columns = _random_columns() if source == "random" else load_telemetry_columns(source)
+    result = WearBackfill().run(columns)
+    wear, forecasts, predictor = _stream(columns)
+
+    batch = _normalize([
+        result.wear_state.to_dict(),
+        {name: forecast.to_dict() for name, forecast in result.forecasts.items()},
+        result.wear_analyzer.state.high_rpm_seconds,
+        result.wear_analyzer.state.brakes.accumulated_stress,
+        result.future_predictor.event_counters,
+    ])
+    streaming = _normalize([
+        wear.state.to_dict(),
+        {name: forecast.to_dict() for name, forecast in forecasts.items()},
+        wear.state.high_rpm_seconds,
+        wear.state.brakes.accumulated_stress,
+        predictor.event_counters,
+    ])
+    assert json.dumps(batch, sort_keys=True) == json.dumps(streaming, sort_keys=True)
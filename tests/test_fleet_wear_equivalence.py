@@ -0,0 +1,109 @@
+"""
+FleetWearKernel debe reproducir exactamente el estado de WearAnalyzer mensaje
+a mensaje, con lotes que mezclan vehículos, mensajes fuera de orden, campos
+ausentes y perfiles de umbrales distintos.
+"""
+
+import json
+
+import numpy as np
+
+from boomapp.predictive_brain.fleet_wear import FleetWearKernel, OBD
+from boomapp.predictive_brain.threshold_profiles import ThresholdProfile, ThresholdProfiles
+from boomapp.predictive_brain.wear_models import WearAnalyzer
+
+OBD_FIELDS = ["rpm", "speed", "coolant_temp", "throttle"]
+SENSOR_FIELDS = ["temperature", "pressure", "vibration", "speed"]
+
+
+def _telemetry(vehicles=50, rows=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    vehicle_ids = [f"v{i}" for i in rng.integers(0, vehicles, rows)]
+    kinds = rng.integers(0, 2, rows)
+    clock, timestamps = {}, []
+    for vehicle_id in vehicle_ids:
+        # Saltos negativos: mensajes fuera de orden
+        clock[vehicle_id] = clock.get(vehicle_id, 1000.0) + rng.uniform(-3, 6)
+        timestamps.append(clock[vehicle_id])
+    columns = {
+        "rpm": rng.uniform(0, 7500, rows), "speed": rng.uniform(0, 180, rows),
+        "coolant_temp": rng.uniform(50, 115, rows), "throttle": rng.uniform(0, 100, rows),
+        "temperature": rng.uniform(-20, 50, rows), "pressure": rng.uniform(90, 115, rows),
+        "vibration": rng.uniform(0, 10, rows),
+    }
+    columns["throttle"][rng.random(rows) < 0.1] = np.nan  # campo ausente
+    return vehicle_ids, kinds, timestamps, columns
+
+
+def _compare(kernel, analyzers):
+    mismatches = []
+    for vehicle_id, analyzer in analyzers.items():
+        expected, actual = analyzer.state, kernel.wear_state(vehicle_id)
+        same = (
+            json.dumps(expected.to_dict(), sort_keys=True) == json.dumps(actual.to_dict(), sort_keys=True)
+            and [expected.high_rpm_seconds, expected.hard_braking_count, expected.pressure_anomaly_seconds,
+                 expected.brakes.accumulated_stress, expected.start_time]
+            == [actual.high_rpm_seconds, actual.hard_braking_count, actual.pressure_anomaly_seconds,
+                actual.brakes.accumulated_stress, actual.start_time]
+        )
+        if not same:
+            mismatches.append(vehicle_id)
+    return mismatches
+
+
+def _run(kernel, analyzer_for, vehicle_ids, kinds, timestamps, columns, batch=1000):
+    accepted = np.concatenate([
+        kernel.apply_batch(vehicle_ids[start:start + batch], kinds[start:start + batch],
+                           timestamps[start:start + batch],
+                           {name: values[start:start + batch] for name, values in columns.items()})
+        for start in range(0, len(vehicle_ids), batch)
+    ])
+    analyzers, expected = {}, []
+    for i, vehicle_id in enumerate(vehicle_ids):
+        analyzer = analyzers.get(vehicle_id)
+        if analyzer is None:
+            analyzer = analyzers[vehicle_id] = analyzer_for(vehicle_id)
+        if kinds[i] == OBD:
+            data = {k: float(columns[k][i]) for k in OBD_FIELDS if not np.isnan(columns[k][i])}
+            expected.append(analyzer.process_obd_data(data, timestamps[i]))
+        else:
+            data = {k: float(columns[k][i]) for k in SENSOR_FIELDS}
+            expected.append(analyzer.process_sensor_data(data, timestamps[i]))
+    return accepted, np.array(expected), analyzers
+
+
+def test_kernel_matches_wear_analyzer():
+    kernel = FleetWearKernel(capacity=8)  # obliga a crecer los arrays
+    accepted, expected, analyzers = _run(kernel, lambda vehicle_id: WearAnalyzer(), *_telemetry())
+    assert (accepted == expected).all()
+    assert _compare(kernel, analyzers) == []
+
+
+def test_kernel_matches_wear_analyzer_with_threshold_profiles():
+    profiles = ThresholdProfiles(directory="")
+    profiles.add(ThresholdProfile("strict", {"engine": {"rpm_max": 4000, "coolant_temp_warning": 95},
+                                             "brakes": {"vibration_warning": 3.0}}))
+    profiles.add(ThresholdProfile("lenient", {"tires": {"pressure_min": 80, "pressure_max": 130}}))
+    names = profiles.names()
+    for i in range(50):
+        profiles.assign(f"v{i}", names[i % len(names)])
+
+    kernel = FleetWearKernel(capacity=8, threshold_profiles=profiles)
+    accepted, expected, analyzers = _run(
+        kernel, lambda vehicle_id: WearAnalyzer(thresholds=profiles.for_vehicle(vehicle_id)), *_telemetry(seed=1))
+    assert (accepted == expected).all()
+    assert _compare(kernel, analyzers) == []
+
+
+def test_late_obd_does_not_count_hard_braking():
+    # 100 → 90 km/h en orden; llega atrasado un 60 (t=1005) que no debe
+    # compararse con el de t=1010 ni servir de referencia al de t=1015
+    rows = [(1000.0, 100.0), (1010.0, 90.0), (1005.0, 60.0), (1015.0, 85.0)]
+    analyzer = WearAnalyzer(max_out_of_order=30)
+    kernel = FleetWearKernel(capacity=1, max_out_of_order=30)
+    for ts, speed in rows:
+        assert analyzer.process_obd_data({"rpm": 2000.0, "speed": speed}, ts)
+        kernel.apply_batch(["v0"], [OBD], [ts], {"rpm": [2000.0], "speed": [speed]})
+    assert analyzer.state.hard_braking_count == 0
+    assert kernel.wear_state("v0").hard_braking_count == 0
+    assert analyzer.last_obd_data["speed"] == 85.0